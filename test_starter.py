@@ -9,6 +9,14 @@ import os
 from pathlib import Path
 import tempfile
 import shutil
+import sys
+import time
+import queue
+import socket
+
+import psutil
+
+import universal_STARTER_GUI as gui
 
 
 class TestGitIntegration(unittest.TestCase):
@@ -170,5 +178,1362 @@ class TestGitManagerMethods(unittest.TestCase):
         self.assertIn("test-branch", result.stdout)
 
 
+class TestVenvCloner(unittest.TestCase):
+    """Test VenvCloner relocation and linking."""
+
+    def setUp(self):
+        """Create a real venv to clone."""
+        self.test_dir = tempfile.mkdtemp()
+        self.src = Path(self.test_dir) / "src_env"
+        subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(self.src)],
+                       capture_output=True)
+        site_dirs = list(self.src.glob("lib*/python*/site-packages")) or list(self.src.glob("Lib/site-packages"))
+        self.site = site_dirs[0]
+        (self.site / "pkg.py").write_text("VALUE = 1\n")
+        (self.site / "paths.pth").write_text(str(self.site / "extra") + "\n")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_clone_relocates_paths(self):
+        """Test that pyvenv.cfg, activate scripts and .pth files point to the clone."""
+        dst = Path(self.test_dir) / "dst_env"
+        progress = []
+        stats = gui.VenvCloner(str(self.src), str(dst)).clone(lambda d, t: progress.append((d, t)))
+
+        self.assertEqual(progress[-1][0], progress[-1][1])
+        self.assertGreater(stats["rewritten"], 0)
+        bin_dir = "Scripts" if os.name == "nt" else "bin"
+        activate = (dst / bin_dir / "activate").read_text()
+        self.assertIn(str(dst), activate)
+        self.assertNotIn(str(self.src), activate)
+        pth = next(dst.rglob("paths.pth")).read_text()
+        self.assertTrue(pth.startswith(str(dst)))
+
+    def test_clone_shares_site_packages(self):
+        """Test that site-packages files are linked, not copied, when possible."""
+        dst = Path(self.test_dir) / "dst_env"
+        stats = gui.VenvCloner(str(self.src), str(dst)).clone()
+        cloned = next(dst.rglob("pkg.py"))
+        self.assertEqual(cloned.read_text(), "VALUE = 1\n")
+        if stats["hardlinked"]:
+            self.assertTrue(os.path.samefile(cloned, self.site / "pkg.py"))
+
+    def test_clone_refuses_existing_destination(self):
+        """Test that an existing destination is never overwritten."""
+        dst = Path(self.test_dir) / "dst_env"
+        dst.mkdir()
+        with self.assertRaises(FileExistsError):
+            gui.VenvCloner(str(self.src), str(dst)).clone()
+
+
+    def test_relocate_after_rename(self):
+        """Test that a renamed venv no longer references its old path."""
+        dst = Path(self.test_dir) / "renamed_env"
+        os.rename(self.src, dst)
+        rewritten = gui.VenvCloner.relocate(str(dst), str(self.src))
+        self.assertGreater(rewritten, 0)
+        bin_dir = "Scripts" if os.name == "nt" else "bin"
+        self.assertNotIn(str(self.src), (dst / bin_dir / "activate").read_text())
+        self.assertNotIn(str(self.src), (dst / "pyvenv.cfg").read_text())
+
+
+class TestTreeRemover(unittest.TestCase):
+    """Test parallel tree removal."""
+
+    def setUp(self):
+        """Create a nested tree with a few files."""
+        self.test_dir = tempfile.mkdtemp()
+        self.tree = Path(self.test_dir) / "tree"
+        for i in range(5):
+            sub = self.tree / f"pkg{i}" / "sub"
+            sub.mkdir(parents=True)
+            for j in range(10):
+                (sub / f"f{j}.py").write_text("x" * 100)
+        os.symlink(self.test_dir, self.tree / "outside_link")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_remove_reports_progress(self):
+        """Test that the tree is removed and progress reaches the totals."""
+        progress = []
+        stats = gui.TreeRemover(str(self.tree), workers=4).remove(lambda *a: progress.append(a))
+        self.assertFalse(self.tree.exists())
+        self.assertEqual(stats["files"], 51)
+        self.assertGreaterEqual(stats["bytes"], 5000)
+        done_files, total_files, done_bytes, total_bytes = progress[-1]
+        self.assertEqual(done_files, total_files)
+        self.assertEqual(done_bytes, total_bytes)
+
+    def test_remove_does_not_follow_symlinks(self):
+        """Test that symlinked directories are unlinked, not emptied."""
+        keep = Path(self.test_dir) / "keep.txt"
+        keep.write_text("keep")
+        gui.TreeRemover(str(self.tree)).remove()
+        self.assertTrue(keep.exists())
+
+
+    def test_trash_leftovers_hidden_and_purged(self):
+        """Test that environments left in the trash are not listed and are purged."""
+        cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.addCleanup(os.chdir, cwd)
+        for path in (".venvs/live", ".venvs/.trash/old-1700000000000", ".venvs/.trash-other-1700000000000"):
+            os.makedirs(os.path.join(path, "bin"))
+            Path(path, "pyvenv.cfg").write_text("home = /usr/bin\n")
+        window = gui.EnvManagerWindow.__new__(gui.EnvManagerWindow)
+        window._is_valid_venv = lambda path: (path / "pyvenv.cfg").exists()
+        self.assertEqual([name for name, _ in window.list_venvs()], [".venvs/live"])
+        self.assertEqual(len(gui.EnvManagerWindow.trash_leftovers()), 2)
+        self.assertEqual(gui.EnvManagerWindow.purge_trash(), 2)
+        self.assertEqual(gui.EnvManagerWindow.trash_leftovers(), [])
+        self.assertTrue(Path(".venvs/live").exists())
+
+    def test_fresh_trash_claimed_before_purge(self):
+        """Test that an environment just moved to the trash is left to its own deletion worker."""
+        cwd = os.getcwd()
+        os.chdir(self.test_dir)
+        self.addCleanup(os.chdir, cwd)
+        os.makedirs(".venvs/doomed/bin")
+        window = gui.EnvManagerWindow.__new__(gui.EnvManagerWindow)
+        trash_path = window._move_to_trash(".venvs/doomed")
+        self.addCleanup(gui.EnvManagerWindow._trash_active.discard, trash_path)
+        self.assertIn(trash_path, gui.EnvManagerWindow._trash_active)
+        self.assertEqual(gui.EnvManagerWindow.purge_trash(), 0)
+        self.assertTrue(os.path.isdir(trash_path))
+
+
+class TestEnvProvisioner(unittest.TestCase):
+    """Test fast environment provisioning."""
+
+    def setUp(self):
+        """Set up a private .venvs directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.base = Path(self.test_dir) / ".venvs"
+        self.provisioner = gui.EnvProvisioner(base_dir=str(self.base))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_create_without_pip(self):
+        """Test that a bare environment is created and timed."""
+        path = self.base / "bare"
+        strategy = self.provisioner.create(str(path), with_pip=False)
+        self.assertIn(strategy, ("uv", "venv"))
+        self.assertTrue(os.path.exists(gui.EnvProvisioner.python_path(str(path))))
+        self.assertTrue(self.provisioner.timings)
+        self.assertIn("Tempo totale", self.provisioner.format_timings())
+
+    def test_create_from_template(self):
+        """Test that environments materialized from a template are relocated."""
+        source = self.base / "source"
+        self.provisioner.create(str(source), with_pip=False)
+        self.provisioner.save_template("base", str(source))
+        self.assertEqual(self.provisioner.list_templates(), ["base"])
+
+        path = self.base / "from_template"
+        strategy = self.provisioner.create(str(path), template="base")
+        self.assertEqual(strategy, "template")
+        self.assertIn(str(path.absolute()), (path / "pyvenv.cfg").read_text())
+        result = subprocess.run([gui.EnvProvisioner.python_path(str(path)), "-c", "import sys; print(sys.prefix)"],
+                                capture_output=True, text=True)
+        self.assertEqual(Path(result.stdout.strip()).resolve(), path.resolve())
+
+    def test_uv_install_reads_wheelhouse(self):
+        """Test that uv installs look up the shared wheelhouse like pip does."""
+        commands = []
+        self.provisioner.find_uv = lambda: "uv"
+        self.provisioner._run = lambda step, command: commands.append(command)
+        self.provisioner.offline = True
+        self.provisioner.install(str(self.base / "env"), ["requests"])
+        command = commands[0]
+        self.assertEqual(command[command.index("--find-links") + 1], str(self.provisioner.wheelhouse))
+        self.assertIn("--offline", command)
+        self.assertEqual(command[-1], "requests")
+
+    def test_create_refuses_existing_destination(self):
+        """Test that an existing environment is never overwritten."""
+        path = self.base / "existing"
+        path.mkdir(parents=True)
+        with self.assertRaises(FileExistsError):
+            self.provisioner.create(str(path))
+
+
+class TestWheelInstallPipeline(unittest.TestCase):
+    """Test the resolve/fetch/install pipeline."""
+
+    def setUp(self):
+        """Set up a private wheelhouse."""
+        self.test_dir = tempfile.mkdtemp()
+        self.wheelhouse = Path(self.test_dir) / "wheelhouse"
+        self.req_file = Path(self.test_dir) / "requirements.txt"
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_satisfied_requirements_resolve_to_nothing(self):
+        """Test that already installed requirements are not fetched again."""
+        self.req_file.write_text("packaging\n")
+        progress = []
+        pipeline = gui.WheelInstallPipeline([sys.executable], wheelhouse=str(self.wheelhouse),
+                                            progress_callback=lambda d, t: progress.append((d, t)))
+        self.assertTrue(pipeline.run(str(self.req_file)))
+        self.assertEqual(progress[-1], (1, 1))
+        self.assertIn("resolve", pipeline.timings)
+
+    def test_cached_wheels_index(self):
+        """Test that wheelhouse files are indexed by canonical name and version."""
+        self.wheelhouse.mkdir()
+        (self.wheelhouse / "Charset_Normalizer-3.3.2-py3-none-any.whl").write_bytes(b"")
+        (self.wheelhouse / "not-a-wheel.tar.gz").write_bytes(b"")
+        pipeline = gui.WheelInstallPipeline([sys.executable], wheelhouse=str(self.wheelhouse))
+        self.assertEqual(list(pipeline.cached_wheels()), [("charset-normalizer", "3.3.2")])
+
+    def test_fallback_to_plain_pip(self):
+        """Test that a failing resolution falls back to a plain pip install."""
+        self.req_file.write_text("packaging\n")
+        q = gui.queue.Queue()
+        broken_python = [sys.executable, "-c", "import sys; sys.exit(3)"]
+        gui.run_install_pipeline(broken_python, str(self.req_file), q)
+        lines = []
+        while True:
+            line = q.get_nowait()
+            if line is None:
+                break
+            lines.append(line)
+        self.assertTrue(any("pip install standard" in line for line in lines))
+        self.assertTrue(lines[-1].startswith("[ERROR]"))
+
+    def test_progress_reset_on_failure(self):
+        """Test that the progress bar is completed only when the install succeeded."""
+        class Bar:
+            value = None
+
+            def set(self, value):
+                self.value = value
+
+        class FakeApp:
+            install_progress_bar = Bar()
+
+            def after(self, ms, func):
+                func()
+
+        app = FakeApp()
+        for outcome, expected in (("[ERROR] Installazione fallita", 0), ("[SUCCESS] ok", 1.0)):
+            q = gui.queue.Queue()
+            for line in ("PROGRESS:40", "[ERROR] pipeline", outcome, None):
+                q.put(line)
+            gui.monitor_install_queue(q, app)
+            self.assertEqual(app.install_progress_bar.value, expected)
+
+
+class TestRequirementsPlanner(unittest.TestCase):
+    """Test the requirements diff against the installed set."""
+
+    def setUp(self):
+        """Snapshot the interpreter running the tests."""
+        self.planner = gui.RequirementsPlanner([sys.executable])
+        self.snapshot = self.planner.snapshot()
+
+    def test_snapshot_is_cached(self):
+        """Test that the snapshot is reused while site-packages is unchanged."""
+        self.assertIn("packaging", self.snapshot["dists"])
+        self.assertIs(self.planner.snapshot(), self.snapshot)
+
+    def test_plan_categories(self):
+        """Test classification of requirement lines."""
+        installed = self.snapshot["dists"]["packaging"]["version"]
+        content = "\n".join([
+            "--index-url https://example.invalid/simple",
+            "# comment",
+            "packaging>=1.0",
+            "psutil==0.0.1",
+            "surely-not-installed-package-xyz",
+            "windows-only-pkg; sys_platform == 'not-a-platform'",
+            "packaging<1.0",
+        ])
+        plan = self.planner.plan(content, self.snapshot)
+        self.assertEqual(plan["satisfied"], [("packaging>=1.0", f"installato {installed}")])
+        self.assertEqual([line for line, _ in plan["upgrade"]], ["psutil==0.0.1"])
+        self.assertEqual([line for line, _ in plan["install"]], ["surely-not-installed-package-xyz"])
+        self.assertEqual([line for line, _ in plan["skipped"]], ["windows-only-pkg; sys_platform == 'not-a-platform'"])
+        self.assertEqual([line for line, _ in plan["conflicts"]], ["packaging<1.0"])
+
+        delta = gui.RequirementsPlanner.delta_requirements(plan)
+        self.assertEqual(delta.splitlines(), ["--index-url https://example.invalid/simple",
+                                              "surely-not-installed-package-xyz", "psutil==0.0.1"])
+
+    def test_pin_conflicting_with_installed_dependents(self):
+        """Test that exact pins excluded by installed packages are reported."""
+        snapshot = {
+            "env": self.snapshot["env"],
+            "paths": [],
+            "dists": {
+                "pandas": {"name": "pandas", "version": "2.2.0", "requires": ["numpy>=1.22"]},
+                "numpy": {"name": "numpy", "version": "1.26.4", "requires": []},
+            },
+        }
+        plan = self.planner.plan("numpy==1.20.0\n", snapshot)
+        self.assertEqual(len(plan["conflicts"]), 1)
+        self.assertIn("pandas", plan["conflicts"][0][1])
+        self.assertEqual(gui.RequirementsPlanner.delta_requirements(plan), "")
+
+    def test_marker_split_pins(self):
+        """Test that pins split by python_version are not reported as conflicting."""
+        content = ('surely-not-installed-package-xyz==1.0; python_version < "3.0"\n'
+                   'surely-not-installed-package-xyz==2.0; python_version >= "3.0"\n')
+        plan = self.planner.plan(content, self.snapshot)
+        self.assertEqual(plan["conflicts"], [])
+        self.assertEqual(len(plan["skipped"]), 1)
+        self.assertEqual(gui.RequirementsPlanner.delta_requirements(plan),
+                         'surely-not-installed-package-xyz==2.0; python_version >= "3.0"\n')
+
+
+class TestSitePackagesInspector(unittest.TestCase):
+    """Test on-disk metadata inspection."""
+
+    def setUp(self):
+        """Build a fake environment prefix with a few distributions."""
+        self.test_dir = tempfile.mkdtemp()
+        self.prefix = Path(self.test_dir) / "env"
+        self.site = self.prefix / "lib" / "python3.11" / "site-packages"
+        self.site.mkdir(parents=True)
+        self._dist_info("requests", "2.31.0", ["idna<4,>=2.5", "PySocks!=1.5.7; extra == 'socks'"], 1500)
+        self._dist_info("idna", "3.6", [], 300)
+        egg = self.site / "legacy_pkg.egg-info"
+        egg.mkdir()
+        (egg / "PKG-INFO").write_text("Metadata-Version: 1.1\nName: legacy-pkg\nVersion: 0.1\n\nBody\n")
+        (egg / "requires.txt").write_text("requests\n\n[dev]\npytest\n")
+
+    def _dist_info(self, name, version, requires, size):
+        """Create a *.dist-info directory."""
+        dist = self.site / f"{name}-{version}.dist-info"
+        dist.mkdir()
+        headers = [f"Name: {name}", f"Version: {version}", "Summary: test"] + [f"Requires-Dist: {r}" for r in requires]
+        (dist / "METADATA").write_text("\n".join(headers) + "\n\nLong description\nName: ignored\n")
+        (dist / "RECORD").write_text(f"{name}/__init__.py,sha256=x,{size}\n{dist.name}/RECORD,,\n")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_packages_and_edges(self):
+        """Test versions, sizes and dependency edges read from disk."""
+        site_packages = gui.find_site_packages(str(self.prefix))
+        self.assertEqual(site_packages, [str(self.site)])
+        packages = {p["key"]: p for p in gui.SitePackagesInspector(site_packages).packages()}
+        self.assertEqual(sorted(packages), ["idna", "legacy-pkg", "requests"])
+        self.assertEqual(packages["requests"]["version"], "2.31.0")
+        self.assertEqual(packages["requests"]["size"], 1500)
+        self.assertEqual(packages["requests"]["requires"], ["idna"])
+        self.assertEqual(packages["idna"]["required_by"], ["requests"])
+        self.assertEqual(packages["requests"]["required_by"], ["legacy-pkg"])
+
+    def test_cache_invalidated_by_mtime(self):
+        """Test that a new distribution is seen once site-packages changes."""
+        inspector = gui.SitePackagesInspector([str(self.site)])
+        self.assertEqual(len(inspector.packages()), 3)
+        self._dist_info("six", "1.16.0", [], 10)
+        stat = os.stat(self.site)
+        os.utime(self.site, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertEqual(len(inspector.packages()), 4)
+
+    def test_resolve_conda_prefix(self):
+        """Test resolving a conda environment from the installation layout."""
+        root = Path(self.test_dir) / "miniconda"
+        (root / "condabin").mkdir(parents=True)
+        conda = root / "condabin" / "conda"
+        conda.write_text("#!/bin/sh\n")
+        conda.chmod(0o755)
+        (root / "conda-meta").mkdir()
+        (root / "envs" / "work" / "conda-meta").mkdir(parents=True)
+        self.assertEqual(gui.resolve_conda_prefix("work", str(conda)), str((root / "envs" / "work").resolve()))
+        self.assertEqual(gui.resolve_conda_prefix("base", str(conda)), str(root.resolve()))
+        self.assertIsNone(gui.resolve_conda_prefix("missing-env-xyz", str(conda)))
+
+
+class TestEnvActivator(unittest.TestCase):
+    """Test the activated environment computed without conda run."""
+
+    def setUp(self):
+        """Build a fake conda installation with one environment."""
+        self.test_dir = tempfile.mkdtemp()
+        root = Path(self.test_dir) / "miniconda"
+        (root / "condabin").mkdir(parents=True)
+        self.conda = root / "condabin" / "conda"
+        self.conda.write_text("#!/bin/sh\n")
+        self.conda.chmod(0o755)
+        (root / "conda-meta").mkdir()
+        self.prefix = (root / "envs" / "work").resolve()
+        (self.prefix / "conda-meta").mkdir(parents=True)
+        (self.prefix / "bin").mkdir()
+        (self.prefix / "bin" / "python").write_text("")
+        (self.prefix / "conda-meta" / "state").write_text('{"env_vars": {"APP_MODE": "dev"}}')
+        gui.EnvActivator._cache.clear()
+        gui.EnvActivator._snapshots.clear()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    @unittest.skipIf(os.name == "nt", "Unix layout")
+    def test_conda_environment(self):
+        """Test interpreter path, PATH order and conda variables."""
+        activator = gui.EnvActivator("conda", "work", conda_exe=str(self.conda))
+        self.assertEqual(activator.python_executable(), str(self.prefix / "bin" / "python"))
+        env = activator.environment({"PATH": "/usr/bin", "PYTHONHOME": "/x"})
+        self.assertEqual(env["PATH"].split(os.pathsep), [str(self.prefix / "bin"), "/usr/bin"])
+        self.assertEqual(env["CONDA_PREFIX"], str(self.prefix))
+        self.assertEqual(env["CONDA_DEFAULT_ENV"], "work")
+        self.assertEqual(env["APP_MODE"], "dev")
+        self.assertEqual(env["PYTHONUNBUFFERED"], "1")
+        self.assertNotIn("PYTHONHOME", env)
+
+    @unittest.skipIf(os.name == "nt", "Unix layout")
+    def test_venv_replaces_previous_env(self):
+        """Test that the bin dir of the environment the GUI runs in is dropped."""
+        venv = Path(self.test_dir) / "venv"
+        activator = gui.EnvActivator("venv", path=str(venv))
+        env = activator.environment({"PATH": os.pathsep.join(["/old/env/bin", "/usr/bin"]),
+                                     "CONDA_PREFIX": "/old/env"})
+        self.assertEqual(env["PATH"].split(os.pathsep), [str(venv / "bin"), "/usr/bin"])
+        self.assertEqual(env["VIRTUAL_ENV"], str(venv))
+        self.assertNotIn("CONDA_PREFIX", env)
+
+    @unittest.skipIf(os.name == "nt", "Unix layout")
+    def test_activation_snapshot_cached_on_disk(self):
+        """Test that activate.d scripts are sourced once and re-run only when they change."""
+        activate_d = self.prefix / "etc" / "conda" / "activate.d"
+        activate_d.mkdir(parents=True)
+        script = activate_d / "vars.sh"
+        script.write_text("export HOOK_VAR=one\n")
+        cache_dir = os.path.join(self.test_dir, "cache")
+        activator = gui.EnvActivator("conda", "work", conda_exe=str(self.conda), cache_dir=cache_dir)
+        self.assertEqual(activator.environment()["HOOK_VAR"], "one")
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        gui.EnvActivator._snapshots.clear()
+        script.write_text("export HOOK_VAR=two\n")
+        stat = os.stat(script)
+        os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertEqual(activator.snapshot()["HOOK_VAR"], "two")
+
+    @unittest.skipIf(os.name == "nt", "Unix layout")
+    def test_activation_snapshot_keeps_only_changes(self):
+        """Test that PATH extensions are stored as a delta applied on the current environment."""
+        activate_d = self.prefix / "etc" / "conda" / "activate.d"
+        activate_d.mkdir(parents=True)
+        (activate_d / "path.sh").write_text('export PATH="/hook/bin:$PATH"\nexport HOOK_VAR=one\n')
+        activator = gui.EnvActivator("conda", "work", conda_exe=str(self.conda),
+                                     cache_dir=os.path.join(self.test_dir, "cache"))
+        self.assertIsNone(activator.snapshot(compute=False))
+        snapshot = activator.snapshot()
+        self.assertEqual(snapshot["PATH"], ["/hook/bin" + os.pathsep, ""])
+        self.assertNotIn("HOME", snapshot)
+        env = activator.environment({"PATH": "/launcher/bin", "HOME": "/new/home"})
+        self.assertEqual(env["PATH"].split(os.pathsep), ["/hook/bin", str(self.prefix / "bin"), "/launcher/bin"])
+        self.assertEqual(env["HOME"], "/new/home")
+        self.assertEqual(env["HOOK_VAR"], "one")
+
+    def test_env_overrides(self):
+        """Test parsing and applying per-file overrides."""
+        overrides = gui.parse_env_overrides("# comment\nPORT=8001\nURL=http://localhost:$PORT/x\n-DEBUG\n")
+        self.assertEqual(overrides, {"PORT": "8001", "URL": "http://localhost:$PORT/x", "DEBUG": None})
+        env = gui.apply_env_overrides({"DEBUG": "1", "HOME": "/h"}, overrides)
+        self.assertEqual(env, {"HOME": "/h", "PORT": "8001", "URL": "http://localhost:8001/x"})
+        self.assertEqual(gui.parse_env_overrides(gui.format_env_overrides(overrides)), overrides)
+        with self.assertRaises(ValueError):
+            gui.parse_env_overrides("not a variable")
+
+class TestLocalhostScanner(unittest.TestCase):
+    """Test the localhost listening-socket scanner."""
+
+    def test_scan_finds_own_socket(self):
+        """Test that a socket of this process is indexed once with its metadata cached."""
+        import socket
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        try:
+            port = server.getsockname()[1]
+            scanner = gui.LocalhostScanner()
+            try:
+                rows = scanner.scan()
+            except psutil.AccessDenied:
+                self.skipTest("net_connections not permitted")
+            self.assertIn(os.getpid(), rows)
+            self.assertIn(port, rows[os.getpid()]["ports"])
+            meta = scanner.metadata(os.getpid())
+            self.assertIs(scanner.metadata(os.getpid()), meta)
+        finally:
+            server.close()
+
+    def test_decode_proc_net_address(self):
+        """Test decoding of /proc/net/tcp{,6} addresses."""
+        if sys.byteorder != "little":
+            self.skipTest("Sample addresses are little-endian")
+        self.assertEqual(gui.LocalhostScanner.decode_address("0100007F"), "127.0.0.1")
+        self.assertEqual(gui.LocalhostScanner.decode_address("00000000000000000000000001000000"), "::1")
+        self.assertEqual(gui.LocalhostScanner.decode_address("0000000000000000FFFF00000100007F"), "::ffff:127.0.0.1")
+
+    @unittest.skipUnless(os.path.exists("/proc/net/tcp6"), "Linux procfs")
+    def test_procfs_matches_psutil_ipv6(self):
+        """Test that the /proc fast path sees IPv6 loopback sockets like psutil does."""
+        import socket
+        server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        try:
+            server.bind(("::1", 0))
+        except OSError:
+            self.skipTest("IPv6 not available")
+        server.listen()
+        try:
+            port = server.getsockname()[1]
+            fast = gui.LocalhostScanner(use_procfs=True).scan()
+            self.assertIn(port, fast[os.getpid()]["ports"])
+            self.assertIn("::1", fast[os.getpid()]["addresses"])
+            try:
+                slow = gui.LocalhostScanner(use_procfs=False).scan()
+            except psutil.AccessDenied:
+                return
+            self.assertEqual(fast[os.getpid()]["ports"], slow[os.getpid()]["ports"])
+        finally:
+            server.close()
+
+    def test_port_preflight(self):
+        """Test that a taken expected port is reported with its owner and a free one is not."""
+        import socket
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        try:
+            taken = server.getsockname()[1]
+            free = gui.find_free_port()
+            try:
+                owners = gui.listening_port_owners(gui.LocalhostScanner())
+            except psutil.AccessDenied:
+                self.skipTest("net_connections not permitted")
+            conflicts = gui.find_port_conflicts([taken, free], owners)
+            self.assertEqual(list(conflicts), [taken])
+            self.assertEqual(conflicts[taken]["pid"], os.getpid())
+        finally:
+            server.close()
+
+    def test_conflict_resolution_off_gui_thread(self):
+        """Test that owners are terminated in background and a free port launch is not learned."""
+        app = gui.App.__new__(gui.App)
+        app._activator_key = None
+        entry = {"name": "svc.py", "path": "svc.py", "ports": [8000]}
+        app.files = [entry]
+        scheduled = queue.Queue()
+        app.after = lambda ms, func, *args: scheduled.put((func, args))
+        app.update_file_status = lambda index: None
+        launched = []
+        app._start_instance = lambda file_entry, slot, free_port=None: launched.append(free_port)
+        owner = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        self.addCleanup(owner.kill)
+        owners = {8000: {"pid": owner.pid, "name": "python"}}
+
+        app.ask_port_conflict = lambda file_entry, conflicts, name: False
+        app._start_slots(entry, app._instances(entry), dict(owners))
+        self.assertEqual(len(launched), 1)
+        self.assertIsNotNone(launched[0])
+
+        launched.clear()
+        app.ask_port_conflict = lambda file_entry, conflicts, name: True
+        app._start_slots(entry, app._instances(entry), dict(owners))
+        self.assertEqual(launched, [])  # Waiting for the termination
+        func, args = scheduled.get(timeout=5)
+        self.assertIsNotNone(owner.poll())
+        func(*args)
+        self.assertEqual(launched, [None])
+
+    def test_start_all_scans_replica_ports(self):
+        """Test that Start all runs the preflight scan for replicas known only by base_port."""
+        app = gui.App.__new__(gui.App)
+        app.files = [{"name": "api.py", "path": "api.py", "replicas": 2, "base_port": 9000}]
+        scans = []
+        app.run_in_background = lambda func, callback: scans.append(func)
+        app.start_file = lambda index, owners=None: self.fail("started before the scan")
+        app.start_all()
+        self.assertEqual(scans, [app.scan_port_owners])
+
+    def test_learn_ports_in_background(self):
+        """Test that port learning scans in a worker and stores the result on the GUI thread."""
+        app = gui.App.__new__(gui.App)
+        app._learning_ports = False
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        self.addCleanup(process.wait)
+        self.addCleanup(process.kill)
+        entry = {"name": "svc.py", "path": "svc.py", "learn_until": time.time() + 30,
+                 "instances": [{"instance": 0, "process": process, "status": "running", "port": None}]}
+        app.files = [entry]
+        jobs, saved = [], []
+        app.run_in_background = lambda func, callback: jobs.append((func, callback))
+        app.save_config = lambda: saved.append(True)
+        app.learn_ports()
+        app.learn_ports()  # A scan is already running
+        self.assertEqual(len(jobs), 1)
+        func, callback = jobs[0]
+        self.assertEqual(func(), [[]])
+        callback([[8123]])
+        self.assertEqual(entry["learned_ports"], [8123])
+        self.assertEqual(saved, [True])
+        self.assertFalse(app._learning_ports)
+
+    def test_process_tree_pids(self):
+        """Test that children are included in the process tree."""
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            self.assertIn(child.pid, gui.process_tree_pids(os.getpid()))
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_diff(self):
+        """Test added/changed/removed detection between scans."""
+        old = {1: {"ports": [80]}, 2: {"ports": [81]}}
+        new = {1: {"ports": [80, 8080]}, 3: {"ports": [90]}}
+        added, changed, removed = gui.LocalhostScanner.diff(old, new)
+        self.assertEqual(list(added), [3])
+        self.assertEqual(list(changed), [1])
+        self.assertEqual(removed, [2])
+
+
+class TestProcessStopper(unittest.TestCase):
+    """Test stopping whole process trees."""
+
+    CHILD = ("import signal, time\n"
+             "signal.signal(signal.SIGINT, signal.SIG_IGN)\n"
+             "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+             "time.sleep(60)\n")
+
+    @unittest.skipIf(os.name == "nt", "POSIX signals")
+    def test_stop_tree_escalates(self):
+        """Test that a grandchild ignoring SIGINT/SIGTERM is killed and the time is bounded."""
+        parent_code = (f"import subprocess, sys, time\n"
+                       f"subprocess.Popen([sys.executable, '-c', {self.CHILD!r}])\n"
+                       f"time.sleep(60)\n")
+        process = subprocess.Popen([sys.executable, "-c", parent_code], **gui.new_session_kwargs())
+        try:
+            deadline = time.time() + 10
+            while len(gui.process_tree_pids(process.pid)) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+            grandchild = (gui.process_tree_pids(process.pid) - {process.pid}).pop()
+            time.sleep(0.3)  # Let the grandchild install its signal handlers
+            start = time.time()
+            reaped = gui.ProcessStopper(interrupt_grace=0.3, terminate_grace=0.3).stop([process.pid])
+            self.assertLess(time.time() - start, 5)
+            self.assertEqual(reaped[process.pid], "SIGINT")
+            self.assertEqual(reaped[grandchild], "SIGKILL")
+        finally:
+            process.kill()
+            process.wait()
+
+    @unittest.skipIf(os.name == "nt", "POSIX signals")
+    def test_group_signalled_once(self):
+        """Test that a session leader receives each signal once, not once per tree member and group."""
+        counts_file = Path(tempfile.mkdtemp()) / "signals"
+        self.addCleanup(shutil.rmtree, counts_file.parent, True)
+        code = ("import signal, sys, time\n"
+                "received = []\n"
+                "def handler(sig, frame):\n"
+                "    received.append(sig)\n"
+                f"    open({str(counts_file)!r}, 'a').write(f'{{sig}}\\n')\n"
+                "signal.signal(signal.SIGINT, handler)\n"
+                "print('ready', flush=True)\n"
+                "while not received:\n"
+                "    time.sleep(0.05)\n"
+                "time.sleep(0.5)\n")
+        process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True,
+                                   **gui.new_session_kwargs())
+        try:
+            process.stdout.readline()
+            reaped = gui.ProcessStopper(interrupt_grace=3).stop([process.pid])
+            self.assertEqual(reaped[process.pid], "SIGINT")
+            self.assertEqual(counts_file.read_text().split(), [str(int(gui.signal.SIGINT))])
+        finally:
+            process.kill()
+            process.wait()
+
+
+class TestResourceLimits(unittest.TestCase):
+    """Test per-file resource settings."""
+
+    def test_cpu_list_and_description(self):
+        """Test CPU list parsing/formatting and the widget summary."""
+        self.assertEqual(gui.parse_cpu_list("0-3, 6"), [0, 1, 2, 3, 6])
+        self.assertEqual(gui.format_cpu_list([6, 0, 1, 2, 3]), "0-3,6")
+        limits = gui.ResourceLimits({"cpu_affinity": "0-1", "nice": 5, "memory_mb": 512})
+        self.assertEqual(limits.describe(), "CPU 0-1 · nice 5 · mem 512.0 MB")
+        self.assertTrue(gui.ResourceLimits({}).is_empty())
+        with self.assertRaises(ValueError):
+            gui.ResourceLimits({"ionice": "fast"})
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "Linux")
+    def test_limits_applied_to_child(self):
+        """Test that affinity, nice and the open-files limit reach the launched process."""
+        limits = gui.ResourceLimits({"cpu_affinity": [0], "nice": 7, "max_open_files": 64})
+        code = ("import os, resource, time; time.sleep(0.5); print(sorted(os.sched_getaffinity(0)), "
+                "os.getpriority(os.PRIO_PROCESS, 0), resource.getrlimit(resource.RLIMIT_NOFILE)[0])")
+        process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True,
+                                   preexec_fn=limits.preexec_fn())
+        self.assertEqual(limits.apply_after_launch(process.pid), [])
+        output = process.communicate()[0].split()
+        self.assertEqual(output[0], "[0]")
+        self.assertGreaterEqual(int(output[1]), 7)
+        self.assertEqual(output[2], "64")
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "Linux")
+    def test_failures_are_warnings(self):
+        """Test that unavailable CPUs and a refused priority are reported without aborting the launch."""
+        missing = max(os.sched_getaffinity(0)) + 1
+        limits = gui.ResourceLimits({"cpu_affinity": [missing], "nice": -20 if os.geteuid() else 0})
+        self.assertIsNone(limits.preexec_fn())
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.5)"])
+        self.addCleanup(process.wait)
+        warnings = limits.apply_after_launch(process.pid)
+        self.assertIn(f"CPU {missing} non disponibili", warnings[0])
+        if os.geteuid():
+            self.assertTrue(any(w.startswith("nice -20") for w in warnings))
+
+
+class TestInstanceTemplates(unittest.TestCase):
+    """Test {instance}/{port} templating of replicated files."""
+
+    def test_expand_and_ports(self):
+        """Test template expansion and the per-instance port."""
+        self.assertEqual(gui.expand_instance_template("--port={port} --id {instance}", 2, 8002),
+                         "--port=8002 --id 2")
+        self.assertEqual(gui.expand_instance_template("{port}", 0, None), "{port}")
+        self.assertEqual(gui.App.instance_port({"base_port": 9000}, 3), 9003)
+        self.assertEqual(gui.App.instance_port({"ports": [8000, 8080]}, 1), 8001)
+        self.assertIsNone(gui.App.instance_port({}, 1))
+        self.assertTrue(gui.uses_port_template({"env": {"PORT": "{port}", "DEBUG": None}}))
+        self.assertFalse(gui.uses_port_template({"args": ["--id", "{instance}"]}))
+
+
+class TestLaunchSettings(unittest.TestCase):
+    """Test per-file launch settings and profiles."""
+
+    def test_profile_overrides(self):
+        """Test that a profile overrides args/cwd/flags and merges env."""
+        entry = {"args": ["--port", "8000"], "env": {"A": "1", "B": "2"},
+                 "profiles": {"bench": {"interpreter_flags": ["-O"], "env": {"B": "3"}}}}
+        base = gui.resolve_launch_settings(entry, "default")
+        self.assertEqual(base, {"args": ["--port", "8000"], "cwd": None, "interpreter_flags": [],
+                                "env": {"A": "1", "B": "2"}})
+        bench = gui.resolve_launch_settings(entry, "bench")
+        self.assertEqual(bench["interpreter_flags"], ["-O"])
+        self.assertEqual(bench["args"], ["--port", "8000"])
+        self.assertEqual(bench["env"], {"A": "1", "B": "3"})
+        self.assertEqual(gui.resolve_launch_settings(entry, "prod"), base)
+        self.assertEqual(entry["env"], {"A": "1", "B": "2"})
+
+
+class TestLaunchTypes(unittest.TestCase):
+    """Test launch types and argv construction."""
+
+    def setUp(self):
+        """Set up a fake venv with a console script."""
+        self.test_dir = tempfile.mkdtemp()
+        bin_dir = os.path.join(self.test_dir, "Scripts" if os.name == "nt" else "bin")
+        os.makedirs(bin_dir)
+        self.tool = os.path.join(bin_dir, "mytool")
+        with open(self.tool, "w") as f:
+            f.write("#!/usr/bin/env python\nprint('hi')\n")
+        os.chmod(self.tool, 0o755)
+        self.app = gui.App.__new__(gui.App)
+        self.app.env_type, self.app.env_name, self.app.env_path = "venv", None, self.test_dir
+        self.app.conda_exe = None
+        self.app._activator_key, self.app._activator = None, None
+        self.python = os.path.join(bin_dir, "python.exe" if os.name == "nt" else "python")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_parse_launch_spec(self):
+        """Test that typed command lines are split into type, target and args."""
+        self.assertEqual(gui.parse_launch_spec("-m http.server 8000"), ("module", "http.server", ["8000"]))
+        self.assertEqual(gui.parse_launch_spec("app.py --name 'a b'"), ("script", "app.py", ["--name", "a b"]))
+        self.assertEqual(gui.parse_launch_spec("uvicorn app:app"), ("command", "uvicorn", ["app:app"]))
+        for text in ("", "-m"):
+            with self.assertRaises(ValueError):
+                gui.parse_launch_spec(text)
+
+    def test_build_command(self):
+        """Test the argv of each launch type, without any shell joining."""
+        app = self.app
+        self.assertEqual(app.build_command("pkg.mod", ["a b"], ["-O"], "module"),
+                         [self.python, "-O", "-m", "pkg.mod", "a b"])
+        self.assertEqual(app.build_command("mytool", ["--x"], [], "entry_point"), [self.tool, "--x"])
+        if os.name != "nt":
+            self.assertEqual(app.build_command("mytool", [], ["-X", "importtime"], "entry_point"),
+                             [self.python, "-X", "importtime", self.tool])
+        with self.assertRaises(FileNotFoundError):
+            app.build_command("missing-tool", [], [], "entry_point")
+        self.assertEqual(app.build_command("app.py", ["$HOME"]), [self.python, "app.py", "$HOME"])
+
+    def test_terminal_command_keeps_argv(self):
+        """Test that the terminal command never joins the arguments into a shell string."""
+        command = [sys.executable, "-c", "print('a b')", "x; rm -rf y"]
+        terminal = self.app.build_terminal_command(command)
+        self.assertEqual(terminal[-len(command):], command)
+        self.assertNotIn("sh", terminal[:1])
+
+
+class TestLogParsing(unittest.TestCase):
+    """Test structured log parsing and the columnar log buffer."""
+
+    LINES = [
+        '{"timestamp": "2024-05-01T12:00:00Z", "level": "warning", "logger": "app.db", "msg": "slow"}\n',
+        'time=2024-05-01T12:00:00Z level=error logger=app msg="boom"\n',
+        '2024-05-01 12:00:00,500 - app.worker - INFO - job done\n',
+        '2024-05-01 12:00:00 [DEBUG] app.cache: miss\n',
+        'CRITICAL:app.core:disk full\n',
+        'INFO:     127.0.0.1:54321 - "GET /items HTTP/1.1" 200 OK\n',
+    ]
+
+    def test_formats(self):
+        """Test that each supported format yields level, timestamp and logger."""
+        expected = [(30, 1714564800.0, "app.db"), (40, 1714564800.0, "app"), (20, None, "app.worker"),
+                    (10, None, "app.cache"), (50, None, "app.core"), (20, None, "uvicorn.access")]
+        for line, (level, timestamp, logger) in zip(self.LINES, expected):
+            parsed = gui.LogLineParser().parse(line)
+            self.assertEqual((parsed[0], parsed[2]), (level, logger), line)
+            if timestamp:
+                self.assertEqual(parsed[1], timestamp)
+        self.assertEqual(gui.LogLineParser().parse("hello\n"), (0, None, None))
+
+    def test_continuation_lines_inherit_level(self):
+        """Test that traceback lines keep the level of the record they belong to."""
+        parser = gui.LogLineParser()
+        parser.parse("ERROR:app:failed\n")
+        self.assertEqual(parser.parse("Traceback (most recent call last):\n")[0], 40)
+        self.assertEqual(parser.parse("INFO:app:recovered\n")[0], 20)
+
+    def test_buffer_filters(self):
+        """Test level and service filtering on the columnar buffer, including ring overwrite."""
+        buffer = gui.LogBuffer(capacity=4)
+        for i, (service, level) in enumerate([("api", 20), ("api#1", 40), ("worker", 40), ("api", 10), ("api", 50)]):
+            buffer.append(service, f"line{i}\n", level)
+        self.assertIsNone(buffer.get(0))
+        self.assertEqual(buffer.select(40), ["line1\n", "line2\n", "line4\n"])
+        self.assertEqual(buffer.select(0, ["api"]), ["line1\n", "line3\n", "line4\n"])
+        self.assertEqual(buffer.select(0, ["worker"], limit=1), ["line2\n"])
+
+    def test_launcher_lines_pass_level_filter(self):
+        """Test that the launcher's own notices survive any level filter."""
+        buffer = gui.LogBuffer(capacity=4)
+        buffer.append("api", "debug\n", 10)
+        seq = buffer.append(gui.App.LOG_SELF_SERVICE, "Avviato api\n", gui.LEVEL_ALWAYS)
+        self.assertTrue(buffer.matches(seq, gui.LOG_LEVELS["CRITICAL"]))
+        self.assertEqual(buffer.select(gui.LOG_LEVELS["ERROR"]), ["Avviato api\n"])
+
+    def test_parser_throughput(self):
+        """Test that parsing keeps up with chatty services."""
+        parser = gui.LogLineParser()
+        lines = self.LINES * 5000
+        start = time.perf_counter()
+        for line in lines:
+            parser.parse(line)
+        rate = len(lines) / (time.perf_counter() - start)
+        # Mixed formats defeat the last-format shortcut; a single format runs much faster
+        self.assertGreater(rate, 20000)
+
+    def test_read_process_output(self):
+        """Test that a process's lines are parsed into the global buffer."""
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import sys; print('WARNING:svc:careful'); print('ERROR:svc:bad', file=sys.stderr)"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        done = queue.Queue()
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, True)
+        base_dir, gui.log_archive.base_dir = gui.log_archive.base_dir, archive_dir
+        try:
+            gui.read_process_output(process, done, "parsed-service")
+        finally:
+            gui.log_archive.base_dir = base_dir
+        process.wait()
+        lines = gui.log_buffer.select(40, ["parsed-service"])
+        self.assertEqual(lines, ["[parsed-service ERR] ERROR:svc:bad\n"])
+
+
+class TestLogArchive(unittest.TestCase):
+    """Test the segmented on-disk log archive."""
+
+    def setUp(self):
+        """Fill an archive with small gzip segments."""
+        self.test_dir = tempfile.mkdtemp()
+        self.archive = gui.LogArchive(self.test_dir, compression="gzip", segment_bytes=4096, index_every=512)
+        writer = self.archive.writer("api.py#1")
+        self.start = 1700000000.0
+        for i in range(1000):
+            writer.append(f"request {i}\n", 40 if i % 100 == 0 else 20, self.start + i)
+        self.archive.close_writer("api.py#1")
+        deadline = time.time() + 5
+        while any(p.endswith(".log") for _, p in self.archive.segments("api.py#1")) and time.time() < deadline:
+            time.sleep(0.05)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_segments_compressed_and_indexed(self):
+        """Test that closed segments are compressed and keep their sparse index."""
+        segments = self.archive.segments("api.py#1")
+        self.assertGreater(len(segments), 5)
+        self.assertTrue(all(path.endswith(".log.gz") for _, path in segments))
+        self.assertEqual(segments[0][0], self.start)
+        self.assertGreater(gui.LogArchive.index_offset(segments[0][1], self.start + 100), 0)
+
+    def test_tail_seek_search(self):
+        """Test tail, seek to a time and search across segments."""
+        self.assertEqual([r[2] for r in self.archive.tail("api.py#1", 3)], ["request 997", "request 998", "request 999"])
+        records = self.archive.read("api.py#1", since=self.start + 500.5)
+        self.assertEqual(next(records)[2], "request 501")
+        found = self.archive.search("api.py#1", "request", since=self.start + 250, until=self.start + 650, min_level=40)
+        self.assertEqual([r[2] for r in found], ["request 300", "request 400", "request 500", "request 600"])
+        self.assertEqual(len(self.archive.search("api.py#1", r"request 9\d\d$", regex=True, limit=10)), 10)
+
+    def test_same_millisecond_segments(self):
+        """Test that a segment opened in the same millisecond as another gets its own file."""
+        for text in ("first", "second"):
+            writer = self.archive.writer("worker.py")
+            writer.append(text, 20, self.start)
+            self.archive.close_writer("worker.py")
+        deadline = time.time() + 5
+        while any(p.endswith(".log") for _, p in self.archive.segments("worker.py")) and time.time() < deadline:
+            time.sleep(0.05)
+        segments = self.archive.segments("worker.py")
+        self.assertEqual(len(segments), 2)
+        self.assertEqual({start for start, _ in segments}, {self.start})
+        self.assertEqual([r[2] for r in self.archive.read("worker.py")], ["first", "second"])
+
+    def test_parse_time_spec(self):
+        """Test relative and absolute time specifications."""
+        self.assertEqual(gui.parse_time_spec("15m", now=1000.0), 100.0)
+        self.assertEqual(gui.parse_time_spec("2h", now=10000.0), 2800.0)
+        self.assertEqual(gui.parse_time_spec("2024-05-01T12:00:00+00:00"), 1714564800.0)
+        with self.assertRaises(ValueError):
+            gui.parse_time_spec("yesterday")
+
+
+class TestAccessMetrics(unittest.TestCase):
+    """Test access log metrics: parsing, histogram and rolling rates."""
+
+    def test_parse_access_log(self):
+        """Test status and latency extraction from common access log formats."""
+        cases = {
+            'INFO:     127.0.0.1:54321 - "GET /items HTTP/1.1" 200 OK': (200, None),
+            '127.0.0.1 - - [01/May/2024 12:00:00] "POST /x HTTP/1.1" 500 -': (500, None),
+            '10.0.0.1 - - [01/May/2024:12:00:00 +0000] "GET / HTTP/1.1" 200 512 "-" "curl" 0.012': (200, 0.012),
+            '{"status": 201, "duration_ms": 12.5, "msg": "request"}': (201, 0.0125),
+            'level=info status=404 duration=850us': (404, 0.00085),
+            'INFO:app:started': None,
+            '{"level": "info", "msg": "no status"}': None,
+        }
+        for line, expected in cases.items():
+            result = gui.parse_access_log(line)
+            if expected is None or expected[1] is None:
+                self.assertEqual(result, expected, line)
+            else:
+                self.assertEqual(result[0], expected[0], line)
+                self.assertAlmostEqual(result[1], expected[1], places=9, msg=line)
+
+    def test_histogram_percentiles(self):
+        """Test that percentiles are within the histogram precision, in fixed memory."""
+        histogram = gui.LatencyHistogram()
+        size = len(histogram.counts)
+        for i in range(1, 10001):
+            histogram.record(i / 1000.0)  # 1 ms .. 10 s
+        self.assertEqual(len(histogram.counts), size)
+        for measured, exact in zip(histogram.percentiles(), (5.0, 9.5, 9.9)):
+            self.assertLess(abs(measured - exact) / exact, 0.04)
+        self.assertEqual(gui.LatencyHistogram().percentiles(), [None, None, None])
+
+    def test_rolling_rate(self):
+        """Test requests/s, error rate and expiry of old seconds."""
+        metrics = gui.ServiceMetrics(window=60, period=30, rate_window=10)
+        start = 1000.0
+        for i in range(200):
+            metrics.record(503 if i % 10 == 0 else 200, 0.02, start + i / 20)  # 20 req/s for 10 s
+        summary = gui.ServiceMetrics.summary([metrics], start + 10.5)
+        self.assertAlmostEqual(summary["rps"], 20.0)
+        self.assertAlmostEqual(summary["error_rate"], 0.1)
+        self.assertAlmostEqual(summary["p50"], 0.02, delta=0.001)
+        later = gui.ServiceMetrics.summary([metrics], start + 100)
+        self.assertEqual(later["rps"], 0.0)
+        self.assertEqual(later["samples"], 0)
+
+
+class TestLoadTester(unittest.TestCase):
+    """Test the asyncio HTTP/1.1 load generator against a local server."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Start a keep-alive HTTP server answering plain, chunked and 500 responses."""
+        import http.server
+        import threading
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/chunked":
+                    self.send_response(200)
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    self.wfile.write(b"5\r\nhello\r\n0\r\n\r\n")
+                    return
+                status = 500 if self.path == "/error" else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.port = cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_keep_alive_pool(self):
+        """Test that each worker reuses one connection, also with chunked bodies."""
+        for path in ("/", "/chunked"):
+            tester = gui.LoadTester("127.0.0.1", self.port, path, concurrency=4, total_requests=40, pid=os.getpid())
+            report = tester.run()
+            self.assertEqual(report["requests"], 40, path)
+            self.assertEqual(report["statuses"], {200: 40})
+            self.assertEqual(report["connections"], 4)
+            self.assertEqual(report["error_rate"], 0.0)
+            self.assertIsNotNone(report["p99"])
+
+    def test_errors(self):
+        """Test that 5xx responses and refused connections count as errors."""
+        report = gui.LoadTester("127.0.0.1", self.port, "/error", concurrency=2, total_requests=10).run()
+        self.assertEqual(report["statuses"], {500: 10})
+        self.assertEqual(report["error_rate"], 1.0)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            free_port = s.getsockname()[1]
+        report = gui.LoadTester("127.0.0.1", free_port, concurrency=2, duration=0.3).run()
+        self.assertEqual(report["requests"], 0)
+        self.assertIn("ConnectionRefusedError", report["errors"])
+
+    def test_host_header(self):
+        """Test that IPv6 targets get a bracketed Host header."""
+        self.assertIn(b"\r\nHost: [::1]:8000\r\n", gui.LoadTester("::1", 8000).request)
+        self.assertIn(b"\r\nHost: 127.0.0.1:8000\r\n", gui.LoadTester("127.0.0.1", 8000).request)
+
+
+class TestServiceProfiler(unittest.TestCase):
+    """Test the profiling wrapper and the stack profile model."""
+
+    SERVICE = "\n".join([
+        "import sys, time",
+        "def busy():",
+        "    return sum(i * i for i in range(20000))",
+        "end = time.time() + 1.0",
+        "while time.time() < end:",
+        "    busy()",
+        "print(sys.argv[1:])",
+    ])
+
+    def setUp(self):
+        """Write a CPU-bound service script."""
+        self.test_dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.test_dir, "service.py")
+        with open(self.script, "w") as f:
+            f.write(self.SERVICE)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_collapsed_stacks(self):
+        """Test top functions and flame tree from collapsed stacks."""
+        profile = gui.StackProfile.from_collapsed("main;handler;parse 6\nmain;handler 2\nmain;idle 2\nbad line\n")
+        self.assertEqual(profile.total, 10)
+        top = profile.top_functions(2)
+        self.assertEqual((top[0]["name"], top[0]["self"], top[0]["total"]), ("parse", 6, 6))
+        self.assertEqual((top[1]["name"], top[1]["total"]), ("handler", 8))
+        tree = profile.flame_tree()
+        self.assertEqual(tree["children"]["main"]["children"]["handler"]["value"], 8)
+
+    def test_wrapper_modes(self):
+        """Test that the wrapper runs the script with its arguments and writes a profile."""
+        for mode in ("sampler", "cprofile"):
+            output = os.path.join(self.test_dir, "out.prof" if mode == "cprofile" else "out.txt")
+            command = gui.ServiceProfiler.wrap_command([sys.executable], [], "script", self.script, ["a b"],
+                                                       mode, 0.5, output)
+            result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+            self.assertEqual(result.stdout.strip(), "['a b']", result.stderr)
+            names = [f["name"] for f in gui.StackProfile.load(output).top_functions(10)]
+            self.assertTrue(any(name.startswith(("busy", "<genexpr>")) for name in names), (mode, names))
+
+    def test_relaunch_keeps_unwrappable_instance(self):
+        """Test that a file the wrapper cannot run is never stopped for a profile relaunch."""
+        app = gui.App.__new__(gui.App)
+        app.files = [{"name": "server", "path": "node server.js", "type": "command"}]
+        stopped = []
+        app._stop_instance = lambda file_entry, slot: stopped.append(slot)
+        slot = {"instance": 0, "process": None, "status": "running"}
+        app._profile_relaunch(0, slot, "server", "sampler", 1, os.path.join(self.test_dir, "out.txt"))
+        self.assertEqual(stopped, [])
+        self.assertNotIn("profile", slot)
+
+
+class TestMemoryTrace(unittest.TestCase):
+    """Test the tracemalloc launch mode and its local report endpoint."""
+
+    def setUp(self):
+        """Start a report endpoint and write a leaking service."""
+        self.test_dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.test_dir, "leaky.py")
+        with open(self.script, "w") as f:
+            f.write("import time\ncache = []\nwhile True:\n    cache.append(bytearray(20000))\n    time.sleep(0.01)\n")
+        self.server = gui.MemoryTraceServer()
+
+    def tearDown(self):
+        """Stop the endpoint and clean up."""
+        self.server.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def launch(self, config, token=None):
+        command = gui.python_wrapper_command(gui.TRACEMALLOC_WRAPPER_SCRIPT, [sys.executable], [], "script",
+                                             self.script, [], config)
+        self.assertNotIn(self.server.token, " ".join(command))
+        env = dict(os.environ, **self.server.environment())
+        if token is not None:
+            env[self.server.TOKEN_ENV] = token
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        self.addCleanup(process.wait)
+        self.addCleanup(process.kill)
+        return process
+
+    def test_growth_reported(self):
+        """Test that the leaking line is reported as the top growing allocation site."""
+        self.launch(self.server.config("leaky", interval=0.3))
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            history = self.server.history.get("leaky", ())
+            if len(history) >= 3:
+                break
+            time.sleep(0.1)
+        report = self.server.report("leaky")
+        self.assertIsNotNone(report)
+        self.assertEqual(report["top"][0]["site"], f"{self.script}:4")
+        self.assertGreater(report["top"][0]["size_diff"], 0)
+        self.assertGreater(self.server.growth_rate("leaky"), 0)
+
+    def test_token_required(self):
+        """Test that reports without the launcher token are ignored."""
+        self.launch(self.server.config("intruder", interval=0.2), token="wrong")
+        time.sleep(1.0)
+        self.assertIsNone(self.server.report("intruder"))
+
+
+class TestHotReload(unittest.TestCase):
+    """Test the source watcher and the restart of the affected services."""
+
+    def setUp(self):
+        """Create a service folder and a headless app."""
+        self.test_dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.test_dir, "service.py")
+        with open(self.script, "w") as f:
+            f.write("import time\nwhile True:\n    time.sleep(0.1)\n")
+        self.app = gui.App.__new__(gui.App)
+        self.app._activator_key = None
+        self.app.active_profile = "default"
+        self.app.stop_grace = {"interrupt": 2.0, "terminate": 3.0}
+        self.app._reload_watcher, self.app._reload_key = None, ((), ())
+        self.app.files = [{"name": "service.py", "path": self.script, "hot_reload": True},
+                          {"name": "other.py", "path": "/elsewhere/other.py", "hot_reload": True}]
+        self.scheduled = queue.Queue()
+        self.app.after = lambda ms, func, *args: self.scheduled.put((func, args))
+        self.app.update_file_status = lambda index: None
+        self.started = []
+
+        def start_file(index, instances=None, done=None):
+            self.started.append((index, instances))
+            if done:
+                done()
+        self.app.start_file = start_file
+
+    def tearDown(self):
+        """Clean up."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def watch(self, backend):
+        changes = queue.Queue()
+        watcher = gui.FileWatcher([self.test_dir], changes.put, backend=backend).start()
+        self.addCleanup(watcher.stop)
+        time.sleep(0.3)
+        return watcher, changes
+
+    def check_watcher(self, backend):
+        watcher, changes = self.watch(backend)
+        for i in range(5):  # A burst of saves is one batch
+            with open(self.script, "w") as f:
+                f.write(f"# {i}\n")
+        os.makedirs(os.path.join(self.test_dir, "__pycache__"))
+        for name in ("__pycache__/service.cpython.pyc", "data.db", ".#service.py"):
+            with open(os.path.join(self.test_dir, name), "w") as f:
+                f.write("x")
+        self.assertEqual(changes.get(timeout=3), [self.script])
+        package = os.path.join(self.test_dir, "pkg")
+        os.makedirs(package)
+        time.sleep(0.05)
+        with open(os.path.join(package, "mod.py"), "w") as f:
+            f.write("x = 1\n")
+        self.assertEqual(changes.get(timeout=3), [os.path.join(package, "mod.py")])
+        time.sleep(1.0)
+        self.assertTrue(changes.empty())
+        return watcher
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher(self):
+        """Test that inotify reports the matching files once per burst, new directories included."""
+        watcher = self.check_watcher("inotify")
+        self.assertEqual(watcher.backend, "inotify")
+
+    def test_polling_watcher(self):
+        """Test the polling fallback."""
+        self.check_watcher("poll")
+
+    def test_reload_affects(self):
+        """Test that a change only restarts the files whose folder, patterns and ignore globs match."""
+        first, second = self.app.files
+        self.assertTrue(self.app.reload_affects(first, self.script))
+        self.assertFalse(self.app.reload_affects(second, self.script))
+        self.assertFalse(self.app.reload_affects(first, os.path.join(self.test_dir, "notes.txt")))
+        first["hot_reload"] = {"patterns": ["*.py", "*.html"], "ignore": ["tests"]}
+        self.assertTrue(self.app.reload_affects(first, os.path.join(self.test_dir, "templates", "index.html")))
+        self.assertFalse(self.app.reload_affects(first, os.path.join(self.test_dir, "tests", "test_x.py")))
+
+    def test_restart_coalesced(self):
+        """Test that a running instance is restarted once and changes during the restart make one more restart."""
+        process = subprocess.Popen([sys.executable, self.script])
+        self.addCleanup(process.kill)
+        entry = self.app.files[0]
+        entry["instances"] = [{"instance": 0, "process": process, "status": "running", "port": None}]
+        self.app.on_sources_changed([self.script])
+        self.app.on_sources_changed([self.script])  # While stopping
+        func, args = self.scheduled.get(timeout=5)  # Stop done
+        self.assertIsNotNone(process.poll())
+        func(*args)
+        self.assertEqual(self.started, [(0, [0])])
+        # The coalesced change waits for the cooldown instead of restarting at once
+        self.assertTrue(entry["reload_state"]["scheduled"])
+        # Stopped by the user: nothing to restart
+        entry["instances"][0].update(process=None, status="stopped")
+        func, args = self.scheduled.get(timeout=1)
+        func(*args)
+        self.assertEqual(self.started, [(0, [0])])
+        self.assertEqual(entry["reload_state"]["pending"], [])
+
+
+class TestImportProfiler(unittest.TestCase):
+    """Test -X importtime parsing and history."""
+
+    SAMPLE = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       267 |        267 |       copyreg",
+        "import time:       728 |       1000 |     re",
+        "import time:       558 |       1558 |   json.decoder",
+        "import time:       706 |        706 |   json.encoder",
+        "import time:       275 |       2539 | json",
+        "import time:        50 |         50 | math",
+    ])
+
+    def setUp(self):
+        """Set up a private history file."""
+        self.test_dir = tempfile.mkdtemp()
+        self.profiler = gui.ImportProfiler([sys.executable], history_file=os.path.join(self.test_dir, "history.json"))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_parse_importtime_tree(self):
+        """Test that the post-order output is rebuilt as a tree."""
+        tree = gui.parse_importtime(self.SAMPLE)
+        self.assertEqual([n["name"] for n in tree], ["json", "math"])
+        json_node = tree[0]
+        self.assertEqual([n["name"] for n in json_node["children"]], ["json.decoder", "json.encoder"])
+        self.assertEqual(json_node["children"][0]["children"][0]["children"][0]["name"], "copyreg")
+        slowest = gui.ImportProfiler.slowest(tree, 2)
+        self.assertEqual([n["name"] for n in slowest], ["json", "json.decoder"])
+
+    def test_script_imports(self):
+        """Test that top-level imports, including optional ones, are found."""
+        script = Path(self.test_dir) / "service.py"
+        script.write_text("import os, json\nfrom collections import abc\nfrom . import local\n"
+                          "try:\n    import ujson\nexcept ImportError:\n    ujson = None\n"
+                          "def f():\n    import secret\n")
+        self.assertEqual(gui.ImportProfiler.script_imports(str(script)), ["os", "json", "collections", "ujson"])
+
+    def test_profile_and_history(self):
+        """Test a real profile run and regression detection against the history."""
+        result = self.profiler.profile(["json", "module_that_does_not_exist_xyz"])
+        self.assertGreater(result["total_us"], 0)
+        self.assertTrue(any(n["name"] == "json" for n in result["tree"]))
+        self.assertEqual(len(result["errors"]), 1)
+
+        self.assertIsNone(self.profiler.record("json", "test", result))
+        previous = self.profiler.record("json", "test", result)
+        self.assertEqual(previous["total_us"], result["total_us"])
+
+        slower = {"tree": gui.parse_importtime(self.SAMPLE.replace("2539 | json", "99999 | json"))}
+        regressions = gui.ImportProfiler.regressions(slower, {"modules": {"json": 2539}})
+        self.assertEqual(regressions, [("json", 2539, 99999)])
+
+
+class TestEnvBenchmark(unittest.TestCase):
+    """Test the CPU benchmark suite."""
+
+    def setUp(self):
+        """Set up a private results directory."""
+        self.test_dir = tempfile.mkdtemp()
+        self.benchmark = gui.EnvBenchmark([sys.executable], results_dir=self.test_dir, matmul_size=64,
+                                          memory_mb=4, python_loops=10000, repeat=1)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_thread_counts(self):
+        """Test the thread counts of the scaling test."""
+        self.assertEqual(gui.EnvBenchmark.thread_counts(1), [1])
+        self.assertEqual(gui.EnvBenchmark.thread_counts(6), [1, 2, 4, 6])
+        self.assertEqual(gui.EnvBenchmark.thread_counts(8), [1, 2, 4, 8])
+
+    def test_run_and_compare(self):
+        """Test a quick run, its JSON file and the comparison table."""
+        result = self.benchmark.run("test-env", max_threads=2)
+        self.assertGreater(result["python_mloops_s"], 0)
+        self.assertGreater(result["memory_gb_s"], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "test-env.json")))
+
+        self.benchmark.save("other env", dict(result, env="other env", numpy_gflops=12.5))
+        results = self.benchmark.load_all()
+        self.assertEqual(len(results), 2)
+        rows = dict(gui.EnvBenchmark.comparison_rows(results))
+        self.assertEqual(len(rows["Loop Python"]), 2)
+        self.assertIn("12.50 GFLOPS", rows["NumPy matmul"])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
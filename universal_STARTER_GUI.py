@@ -23,15 +23,42 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Iterator
 import shutil
 import tkinter.messagebox as messagebox
 import tkinter.simpledialog as simpledialog
+from tkinter import ttk
 import psutil
 import textwrap
-
-
-def run_install_command(command: List[str], q: queue.Queue):
+import time
+import ast
+import ctypes
+import ctypes.util
+import fnmatch
+import asyncio
+import hashlib
+import re
+import shlex
+import bisect
+import collections
+import gzip
+import io
+from array import array
+import signal
+import secrets
+import select
+import socket
+import struct
+import zlib
+import platform
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from packaging.utils import canonicalize_name, parse_wheel_filename, InvalidWheelFilename
+from packaging.requirements import Requirement, InvalidRequirement
+from packaging.version import Version, InvalidVersion
+
+
+def run_install_command(command: List[str], q: queue.Queue, env: Optional[Dict[str, str]] = None):
     """Run the install command and put output into queue."""
     try:
         process = subprocess.Popen(
@@ -39,7 +66,8 @@ def run_install_command(command: List[str], q: queue.Queue):
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
-            bufsize=1
+            bufsize=1,
+            env=env
         )
 
         for line in process.stdout:
@@ -57,35 +85,1190 @@ def run_install_command(command: List[str], q: queue.Queue):
         q.put(None)
 
 
-def read_process_output(process: subprocess.Popen, q: queue.Queue, name: str):
-    """Read stdout and stderr from a process and put into queue."""
-    try:
-        # Read stdout
+class WheelInstallPipeline:
+    """
+    Installs a requirements file in three stages instead of one serial pip run.
+
+    1. Resolve: a single `pip install --dry-run --report` computes the full
+       set of distributions to install (already satisfied ones are skipped).
+    2. Fetch: every resolved distribution is downloaded/built as a wheel into
+       the shared wheelhouse in parallel (`pip wheel --no-deps`); wheels
+       already in the wheelhouse are reused.
+    3. Install: one `pip install --no-index --no-deps` from the wheelhouse.
+
+    Progress is reported per package. If the fast path is not available
+    (old pip, resolution error) callers fall back to a plain `pip install -r`.
+
+    Installa i requirements risolvendo una volta e scaricando le wheel in parallelo.
+    """
+
+    def __init__(self, python_command: List[str], wheelhouse: str = os.path.join(".venvs", ".wheelhouse"),
+                 workers: Optional[int] = None, log_callback=None, progress_callback=None,
+                 env: Optional[Dict[str, str]] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            python_command: Command prefix running the target interpreter
+            wheelhouse: Directory caching the built/downloaded wheels
+            workers: Number of parallel fetch jobs (default: min(8, cpu_count))
+            log_callback: Optional callable(str) receiving log lines
+            progress_callback: Optional callable(done, total)
+            env: Environment variables for the pip processes (default: inherited)
+        """
+        self.python_command = python_command
+        self.env = env
+        self.wheelhouse = os.path.abspath(wheelhouse)
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.log = log_callback or (lambda message: None)
+        self.progress = progress_callback or (lambda done, total: None)
+        self.timings = {}
+
+    def _pip(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run pip in the target interpreter."""
+        return subprocess.run(self.python_command + ["-m", "pip", "--disable-pip-version-check"] + args,
+                              capture_output=True, text=True, env=self.env)
+
+    def resolve(self, req_file: str) -> Optional[List[Dict]]:
+        """
+        Resolve the requirement set once.
+
+        Returns:
+            List of {"name", "version", "spec"} dictionaries, or None if the
+            installed pip cannot produce a resolution report
+        """
+        start = time.perf_counter()
+        result = self._pip(["install", "--dry-run", "--quiet", "--report", "-", "-r", req_file])
+        self.timings["resolve"] = time.perf_counter() - start
+        if result.returncode != 0:
+            self.log(result.stderr.strip() + "\n")
+            return None
+        try:
+            report = json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return None
+        resolved = []
+        for item in report.get("install", []):
+            metadata = item.get("metadata", {})
+            name = metadata.get("name")
+            version = metadata.get("version")
+            if item.get("is_direct"):
+                # URL, VCS or local path requirements are built from their source
+                spec = f"{name} @ {item['download_info']['url']}"
+            else:
+                spec = f"{name}=={version}"
+            resolved.append({"name": name, "version": version, "spec": spec,
+                             "direct": bool(item.get("is_direct"))})
+        return resolved
+
+    def cached_wheels(self) -> Dict[Tuple[str, str], str]:
+        """Index the wheelhouse by (canonical name, version)."""
+        index = {}
+        if not os.path.isdir(self.wheelhouse):
+            return index
+        for filename in os.listdir(self.wheelhouse):
+            if not filename.endswith(".whl"):
+                continue
+            try:
+                name, version, _, _ = parse_wheel_filename(filename)
+            except InvalidWheelFilename:
+                continue
+            index[(name, str(version))] = filename
+        return index
+
+    def _fetch(self, package: Dict) -> Tuple[Dict, bool, float, str]:
+        """Download or build a single wheel. Return (package, ok, seconds, error)."""
+        start = time.perf_counter()
+        result = self._pip(["wheel", "--no-deps", "--quiet", "--find-links", self.wheelhouse,
+                            "-w", self.wheelhouse, package["spec"]])
+        error = result.stderr.strip().splitlines()[-1] if result.returncode != 0 and result.stderr.strip() else ""
+        return package, result.returncode == 0, time.perf_counter() - start, error
+
+    def fetch(self, packages: List[Dict]) -> bool:
+        """Fetch all missing wheels in parallel. Return True if all succeeded."""
+        start = time.perf_counter()
+        os.makedirs(self.wheelhouse, exist_ok=True)
+        cached = self.cached_wheels()
+        total = len(packages)
+        done = 0
+        missing = []
+        for package in packages:
+            key = (canonicalize_name(package["name"]), str(package["version"]))
+            if not package["direct"] and key in cached:
+                done += 1
+                self.log(f"[{done}/{total}] {package['name']} {package['version']} (in cache)\n")
+            else:
+                missing.append(package)
+        self.progress(done, total)
+
+        ok = True
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._fetch, package) for package in missing]
+            for future in as_completed(futures):
+                package, success, seconds, error = future.result()
+                done += 1
+                if success:
+                    self.log(f"[{done}/{total}] {package['name']} {package['version']} ({seconds:.1f}s)\n")
+                else:
+                    ok = False
+                    self.log(f"[{done}/{total}] ✗ {package['name']} {package['version']}: {error}\n")
+                self.progress(done, total)
+        self.timings["fetch"] = time.perf_counter() - start
+        return ok
+
+    def install(self, packages: List[Dict]) -> bool:
+        """Install the resolved set from the wheelhouse."""
+        start = time.perf_counter()
+        specs = [p["spec"] if p["direct"] else f"{p['name']}=={p['version']}" for p in packages]
+        process = subprocess.Popen(
+            self.python_command + ["-m", "pip", "--disable-pip-version-check", "install", "--no-index",
+                                   "--no-deps", "--find-links", self.wheelhouse] + specs,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=self.env
+        )
         for line in process.stdout:
-            log_queue.put(f"[{name}] {line}")
-        # Read stderr
-        for line in process.stderr:
-            log_queue.put(f"[{name} ERR] {line}")
+            self.log(line)
+        process.wait()
+        self.timings["install"] = time.perf_counter() - start
+        return process.returncode == 0
+
+    def run(self, req_file: str) -> Optional[bool]:
+        """
+        Run the whole pipeline.
+
+        Returns:
+            True/False for success/failure, None if the fast path is not
+            available and a plain pip install should be used instead
+        """
+        packages = self.resolve(req_file)
+        if packages is None:
+            return None
+        self.log(f"Risolti {len(packages)} pacchetti da installare in {self.timings['resolve']:.1f}s\n")
+        if not packages:
+            self.progress(1, 1)
+            return True
+        if not self.fetch(packages):
+            return None
+        return self.install(packages)
+
+    def format_timings(self) -> str:
+        """Format the recorded stage timings for the log."""
+        stages = ", ".join(f"{stage}: {seconds:.1f}s" for stage, seconds in self.timings.items())
+        return f"⏱ Tempo totale {sum(self.timings.values()):.1f}s ({stages})"
+
+
+def run_install_pipeline(python_command: List[str], req_file: str, q: queue.Queue, delete_after: bool = False,
+                         env: Optional[Dict[str, str]] = None):
+    """
+    Install requirements through WheelInstallPipeline, falling back to plain pip.
+
+    If delete_after is True req_file is removed once the installation is over.
+    env is passed to every pip process (activated environment variables).
+    """
+    def report(done, total):
+        q.put(f"PROGRESS:{int(done * 100 / total) if total else 100}")
+
+    pipeline = WheelInstallPipeline(python_command, log_callback=lambda line: q.put(line.rstrip("\n")),
+                                    progress_callback=report, env=env)
+    try:
+        try:
+            result = pipeline.run(req_file)
+        except Exception as e:
+            q.put(f"[ERROR] {str(e)}")
+            result = None
+
+        if result is None:
+            q.put("Pipeline veloce non disponibile, uso pip install standard...")
+            run_install_command(python_command + ["-m", "pip", "install", "-r", req_file], q, env)
+            return
+
+        q.put(pipeline.format_timings())
+        if result:
+            q.put("[SUCCESS] Installazione dipendenze completata!")
+        else:
+            q.put("[ERROR] Installazione fallita")
+        q.put(None)
+    finally:
+        if delete_after:
+            try:
+                os.unlink(req_file)
+            except OSError:
+                pass
+
+
+def read_process_output(process: subprocess.Popen, q: queue.Queue, name: str,
+                        formats: Optional[List[str]] = None, metrics: Optional["ServiceMetrics"] = None):
+    """
+    Read stdout and stderr from a process into log_buffer and the log queue.
+
+    Each line is parsed on the reader thread (see LOG_PARSERS) so the console
+    can filter by level and service without looking at the text again. With
+    `metrics`, access log lines also feed the service's request metrics.
+    """
+    archive = log_archive.writer(name)
+
+    def read_stream(stream, prefix: str):
+        parser = LogLineParser(formats)
+        for line in stream:
+            level, timestamp, logger = parser.parse(line)
+            log_queue.put(log_buffer.append(name, f"{prefix} {line}", level, timestamp, logger))
+            archive.append(line if stream is process.stdout else f"[ERR] {line}", level)
+            if metrics is not None:
+                access = parse_access_log(line)
+                if access:
+                    metrics.record(*access)
+
+    def read_stderr():
+        try:
+            read_stream(process.stderr, f"[{name} ERR]")
+        except Exception:
+            pass
+
+    try:
+        # stderr is read concurrently so both streams are shown live and a full
+        # stderr pipe cannot block the child while stdout is being drained
+        stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+        stderr_thread.start()
+        read_stream(process.stdout, f"[{name}]")
+        stderr_thread.join()
     except Exception as e:
         log_queue.put(f"[{name}] Errore lettura output: {e}\n")
     finally:
+        log_archive.close_writer(name, archive)
         q.put(None)  # Signal completion
 
 
-def monitor_install_queue(q: queue.Queue, app):
-    """Monitor the install output queue."""
+def monitor_install_queue(q: queue.Queue, app, succeeded: bool = False):
+    """
+    Monitor the install output queue.
+
+    The progress bar is completed only if the last outcome line was a
+    success; after a failure it is reset.
+    """
     try:
         while True:
             line = q.get_nowait()
             if line is None:
+                app.install_progress_bar.set(1.0 if succeeded else 0)
                 break
-            log_queue.put(line)
+            if line.startswith("PROGRESS:"):
+                app.install_progress_bar.set(int(line.split(":")[1]) / 100.0)
+                continue
+            if line.startswith("[SUCCESS]"):
+                succeeded = True
+            elif line.startswith("[ERROR]"):
+                succeeded = False
+            log_queue.put(line + "\n")
     except queue.Empty:
-        app.after(100, lambda: monitor_install_queue(q, app))
+        app.after(100, lambda: monitor_install_queue(q, app, succeeded))
 
-# Global log queue for thread-safe logging to GUI
+# Global log queue for thread-safe logging to GUI: messages (str) or sequence
+# numbers (int) of service lines stored in log_buffer
 log_queue = queue.Queue()
 
+# Numeric log levels, as in the logging module; 0 means "not parsed"
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+# Level of the launcher's own messages: above every filter, so notices are never hidden
+LEVEL_ALWAYS = 255
+_LEVEL_ALIASES = dict(LOG_LEVELS, TRACE=10, WARN=30, NOTICE=20, ERR=40, FATAL=50, EXCEPTION=40, PANIC=50)
+_LEVEL_ALTERNATION = "|".join(sorted(_LEVEL_ALIASES, key=len, reverse=True))
+
+
+def level_number(value) -> int:
+    """Return the numeric level of a level name or number (0 if unknown)."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return _LEVEL_ALIASES.get(value.upper(), 0)
+    return 0
+
+
+def parse_log_timestamp(value) -> Optional[float]:
+    """Return a POSIX timestamp from an epoch number or an ISO-like date string."""
+    if isinstance(value, (int, float)):
+        # Epoch in milliseconds is common in JSON loggers
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+_JSON_FIELDS = {
+    "level": ("level", "levelname", "severity", "lvl", "log.level"),
+    "time": ("timestamp", "time", "ts", "@timestamp", "asctime"),
+    "logger": ("logger", "name", "logger_name", "log.logger"),
+}
+
+
+def parse_json_log(line: str) -> Optional[Tuple[int, Optional[float], Optional[str]]]:
+    """Parse a JSON log line (structlog, python-json-logger, ECS, ...)."""
+    if not line.startswith("{"):
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    level = timestamp = logger = None
+    for key in _JSON_FIELDS["level"]:
+        if key in record:
+            level = record[key]
+            break
+    for key in _JSON_FIELDS["time"]:
+        if key in record:
+            timestamp = parse_log_timestamp(record[key])
+            break
+    for key in _JSON_FIELDS["logger"]:
+        if key in record:
+            logger = record[key]
+            break
+    if isinstance(level, str) and level.isdigit():
+        level = int(level)
+    return level_number(level), timestamp, logger if isinstance(logger, str) else None
+
+
+_LOGFMT_PAIR = re.compile(r'([\w.\-]+)=("(?:[^"\\]|\\.)*"|\S*)')
+
+
+def parse_logfmt_log(line: str) -> Optional[Tuple[int, Optional[float], Optional[str]]]:
+    """Parse a logfmt line: key=value pairs with at least a level."""
+    if "level=" not in line and "lvl=" not in line:
+        return None
+    fields = dict(_LOGFMT_PAIR.findall(line))
+    level = fields.get("level") or fields.get("lvl")
+    if not level:
+        return None
+    timestamp = fields.get("time") or fields.get("ts")
+    logger = fields.get("logger") or fields.get("name") or fields.get("module")
+    return (level_number(level.strip('"')), parse_log_timestamp(timestamp.strip('"')) if timestamp else None,
+            logger.strip('"') if logger else None)
+
+
+# "%(asctime)s - %(name)s - %(levelname)s - %(message)s" (logging cookbook)
+_LOGGING_DASHED = re.compile(
+    rf"(\d{{4}}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[.,]\d+)?)\s+-\s+(\S+)\s+-\s+({_LEVEL_ALTERNATION})\s+-")
+# "%(asctime)s [%(levelname)s] %(name)s: %(message)s" and "%(asctime)s %(levelname)s %(name)s ..."
+_LOGGING_BRACKETED = re.compile(
+    rf"(\d{{4}}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[.,]\d+)?)\s+\[?({_LEVEL_ALTERNATION})\]?\s+([\w.]+)?")
+# basicConfig default "%(levelname)s:%(name)s:%(message)s"
+_LOGGING_BASIC = re.compile(rf"({_LEVEL_ALTERNATION}):([\w.]+):")
+
+
+def parse_logging_log(line: str) -> Optional[Tuple[int, Optional[float], Optional[str]]]:
+    """Parse the common formats of the Python logging module."""
+    first = line[:1]
+    if first.isdigit():
+        match = _LOGGING_DASHED.match(line)
+        if match:
+            timestamp, logger, level = match.groups()
+        else:
+            match = _LOGGING_BRACKETED.match(line)
+            if not match:
+                return None
+            timestamp, level, logger = match.groups()
+        return _LEVEL_ALIASES[level], parse_log_timestamp(timestamp.replace(",", ".")), logger
+    if first.isupper():
+        match = _LOGGING_BASIC.match(line)
+        if match:
+            return _LEVEL_ALIASES[match.group(1)], None, match.group(2)
+    return None
+
+
+# 'INFO:     127.0.0.1:54321 - "GET /items?id=1 HTTP/1.1" 200 OK'
+UVICORN_ACCESS = re.compile(
+    rf'({_LEVEL_ALTERNATION}):\s+(\S+) - "([A-Z]+) (\S+) HTTP/[\d.]+" (\d{{3}})')
+# 'INFO:     Started server process [1234]'
+_UVICORN_SERVER = re.compile(rf"({_LEVEL_ALTERNATION}):\s+")
+
+
+def parse_uvicorn_log(line: str) -> Optional[Tuple[int, Optional[float], Optional[str]]]:
+    """Parse uvicorn access and server log lines."""
+    match = _UVICORN_SERVER.match(line)
+    if not match:
+        return None
+    level = _LEVEL_ALIASES[match.group(1)]
+    if UVICORN_ACCESS.match(line):
+        return level, None, "uvicorn.access"
+    return level, None, "uvicorn.error"
+
+
+# Pluggable parser stage: name -> function(line) returning (level, timestamp, logger) or None.
+# Order matters: more specific formats first.
+LOG_PARSERS = {
+    "json": parse_json_log,
+    "logfmt": parse_logfmt_log,
+    "logging": parse_logging_log,
+    "uvicorn": parse_uvicorn_log,
+}
+
+
+class LogLineParser:
+    """
+    Parse service output lines into (level, timestamp, logger).
+
+    One instance per output stream: the format that matched last is tried
+    first, so a service logging in a single format costs one attempt per line.
+    Lines no parser recognises (tracebacks, wrapped messages) inherit the level
+    of the previous line of the stream.
+    """
+
+    def __init__(self, formats: Optional[List[str]] = None):
+        names = formats or list(LOG_PARSERS)
+        self.parsers = [(name, LOG_PARSERS[name]) for name in names if name in LOG_PARSERS]
+        self.last_level = 0
+        self.format = None
+
+    def parse(self, line: str) -> Tuple[int, Optional[float], Optional[str]]:
+        """Return (level, timestamp, logger) for a line; timestamp and logger may be None."""
+        for name, parser in self.parsers:
+            result = parser(line)
+            if result is not None:
+                if name != self.parsers[0][0]:
+                    # Move the matching parser to the front for the next lines
+                    self.parsers.remove((name, parser))
+                    self.parsers.insert(0, (name, parser))
+                self.format = name
+                level = result[0] or self.last_level
+                self.last_level = level
+                return level, result[1], result[2]
+        return self.last_level, None, None
+
+
+class LogBuffer:
+    """
+    Ring buffer of console lines with their parsed fields stored column-wise.
+
+    Level, service, logger and timestamp live in typed arrays next to the
+    text, so filtering by level or service scans a few bytes per line and
+    never re-parses the text.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self.levels = array("B", bytes(capacity))
+        self.services = array("H", bytes(2 * capacity))
+        self.loggers = array("H", bytes(2 * capacity))
+        self.times = array("d", bytes(8 * capacity))
+        self.lines: List[Optional[str]] = [None] * capacity
+        self.service_names: List[str] = []
+        self.logger_names: List[Optional[str]] = [None]
+        self._service_ids: Dict[str, int] = {}
+        self._logger_ids: Dict[Optional[str], int] = {None: 0}
+        self.next_seq = 0
+        self.lock = threading.Lock()
+
+    def _intern(self, value, names: List, ids: Dict) -> int:
+        """Return the id of a service or logger name, assigning a new one if needed."""
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(names)
+            names.append(value)
+        return index
+
+    def append(self, service: str, line: str, level: int = 0, timestamp: Optional[float] = None,
+               logger: Optional[str] = None) -> int:
+        """Store a line and return its sequence number."""
+        with self.lock:
+            seq = self.next_seq
+            i = seq % self.capacity
+            self.levels[i] = level
+            self.services[i] = self._intern(service, self.service_names, self._service_ids)
+            self.loggers[i] = self._intern(logger, self.logger_names, self._logger_ids)
+            self.times[i] = timestamp if timestamp is not None else time.time()
+            self.lines[i] = line
+            self.next_seq = seq + 1
+        return seq
+
+    def get(self, seq: int) -> Optional[Tuple[str, str, int]]:
+        """Return (service, line, level) of a sequence number, or None if it was overwritten."""
+        with self.lock:
+            if not self.next_seq - self.capacity <= seq < self.next_seq:
+                return None
+            i = seq % self.capacity
+            return self.service_names[self.services[i]], self.lines[i], self.levels[i]
+
+    def service_filter(self, services: Optional[List[str]]) -> Optional[set]:
+        """Return the ids of the given services and of their instances (name#N)."""
+        if services is None:
+            return None
+        wanted = set(services)
+        return {i for i, name in enumerate(self.service_names)
+                if name in wanted or name.rsplit("#", 1)[0] in wanted}
+
+    def matches(self, seq: int, min_level: int = 0, service_ids: Optional[set] = None) -> bool:
+        """Return True if a stored line passes the level and service filters."""
+        i = seq % self.capacity
+        return self.levels[i] >= min_level and (service_ids is None or self.services[i] in service_ids)
+
+    def select(self, min_level: int = 0, services: Optional[List[str]] = None, limit: int = 5000) -> List[str]:
+        """Return the last `limit` lines passing the filters, oldest first."""
+        with self.lock:
+            service_ids = self.service_filter(services)
+            first = max(0, self.next_seq - self.capacity)
+            levels, service_column, lines = self.levels, self.services, self.lines
+            result = []
+            for seq in range(self.next_seq - 1, first - 1, -1):
+                i = seq % self.capacity
+                if levels[i] >= min_level and (service_ids is None or service_column[i] in service_ids):
+                    result.append(lines[i])
+                    if len(result) >= limit:
+                        break
+        result.reverse()
+        return result
+
+    def level_counts(self) -> Dict[int, int]:
+        """Return how many retained lines have each level."""
+        with self.lock:
+            count = min(self.next_seq, self.capacity)
+            counts = {}
+            for level in self.levels[:count]:
+                counts[level] = counts.get(level, 0) + 1
+        return counts
+
+
+# Output of the launched services, with parsed level/logger
+log_buffer = LogBuffer()
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional, gzip is always available
+    zstandard = None
+
+
+def parse_time_spec(value: str, now: Optional[float] = None) -> float:
+    """
+    Return a POSIX timestamp from an ISO date/time or a relative age ("90s", "15m", "2h", "1d").
+
+    Raises:
+        ValueError: If the value is not recognised
+    """
+    value = value.strip()
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return (now if now is not None else time.time()) - float(value[:-1]) * units[value[-1]]
+    timestamp = parse_log_timestamp(value)
+    if timestamp is None:
+        raise ValueError(f"Orario non valido: {value}")
+    return timestamp
+
+
+class ServiceLogWriter:
+    """
+    Append the output of one service to segment files with a sparse time index.
+
+    Each record is one line "<timestamp>\\t<level>\\t<text>". Every
+    `index_every` bytes the (timestamp, offset) of the next record is added
+    to the segment's .idx file, so readers can seek to a time without
+    scanning the segment from the start.
+    """
+
+    def __init__(self, archive: "LogArchive", service: str):
+        self.archive = archive
+        self.service = service
+        self.directory = archive.service_dir(service)
+        self.lock = threading.Lock()
+        self.file = None
+        self.index_file = None
+        self.path = None
+        self.size = 0
+        self.indexed_at = None
+        self.last_flush = 0.0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _open_segment(self, timestamp: float):
+        """Start a new segment named after the time of its first record (_<n> if that name is taken)."""
+        base = stem = f"{int(timestamp * 1000):013d}"
+        counter = 0
+        # A segment of the same millisecond may still be compressed: never append to it
+        while any(os.path.exists(os.path.join(self.directory, stem + suffix))
+                  for suffix in LogArchive.SEGMENT_SUFFIXES + (".idx",)):
+            counter += 1
+            stem = f"{base}_{counter:03d}"
+        self.path = os.path.join(self.directory, stem + ".log")
+        self.file = open(self.path, "ab")
+        self.index_file = open(os.path.join(self.directory, stem + ".idx"), "a", encoding="utf-8")
+        self.size = self.file.tell()
+        self.indexed_at = None
+
+    def append(self, text: str, level: int = 0, timestamp: Optional[float] = None):
+        """Append a line; timestamp defaults to now so records stay ordered."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        record = f"{timestamp:.3f}\t{level}\t{text.rstrip(chr(10))}\n".encode("utf-8", "replace")
+        with self.lock:
+            if self.file is None:
+                self._open_segment(timestamp)
+            elif self.size >= self.archive.segment_bytes:
+                self._rotate(timestamp)
+            if self.indexed_at is None or self.size - self.indexed_at >= self.archive.index_every:
+                self.index_file.write(f"{timestamp:.3f} {self.size}\n")
+                self.indexed_at = self.size
+            self.file.write(record)
+            self.size += len(record)
+            if timestamp - self.last_flush >= 1.0:
+                self._flush()
+                self.last_flush = timestamp
+
+    def _flush(self):
+        self.file.flush()
+        self.index_file.flush()
+
+    def flush(self):
+        """Write buffered records to disk (readers in other processes see them)."""
+        with self.lock:
+            if self.file:
+                self._flush()
+
+    def _close_segment(self) -> Optional[str]:
+        """Close the current segment and return its path."""
+        if self.file is None:
+            return None
+        self.file.close()
+        self.index_file.close()
+        self.file = self.index_file = None
+        return self.path
+
+    def _rotate(self, timestamp: float):
+        closed = self._close_segment()
+        self.archive.segment_closed(closed)
+        self._open_segment(timestamp)
+
+    def close(self):
+        """Close the current segment (compressed if the archive is configured to)."""
+        with self.lock:
+            closed = self._close_segment()
+        if closed:
+            self.archive.segment_closed(closed)
+
+
+class LogArchive:
+    """
+    Persistent per-service log archive: logs/<service>/<first record ms>.log[.gz|.zst].
+
+    Closed segments are optionally compressed in a background thread; the
+    sparse .idx files stay uncompressed. Reads (tail, seek, search) stream
+    the segments and never load a whole file into memory.
+    """
+
+    COMPRESSIONS = ("none", "gzip", "zstd")
+    SEGMENT_SUFFIXES = (".log", ".log.gz", ".log.zst")
+    # <first record ms>[_<n>] (the counter separates segments opened in the same millisecond)
+    SEGMENT_STEM = re.compile(r"\d{13}(_\d+)?$")
+
+    def __init__(self, base_dir: str = "logs", compression: str = "gzip", segment_bytes: int = 8 * 1024 * 1024,
+                 index_every: int = 64 * 1024, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            base_dir: Root directory of the archive (made absolute at creation)
+            compression: "none", "gzip" or "zstd" (falls back to gzip if zstandard is missing)
+            segment_bytes: Size at which a segment is closed and a new one started
+            index_every: Bytes between two entries of the sparse time index
+            max_bytes: Disk budget per service; the oldest segments are deleted beyond it
+        """
+        self.base_dir = os.path.abspath(base_dir)
+        self.compression = compression
+        self.segment_bytes = segment_bytes
+        self.index_every = index_every
+        self.max_bytes = max_bytes
+        self._writers: Dict[str, ServiceLogWriter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_name(service: str) -> str:
+        return re.sub(r"[^\w.#@+-]", "_", service) or "_"
+
+    def service_dir(self, service: str) -> str:
+        """Return the directory holding the segments of a service."""
+        return os.path.join(self.base_dir, self._safe_name(service))
+
+    def services(self) -> List[str]:
+        """Return the archived services."""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(name for name in os.listdir(self.base_dir) if os.path.isdir(os.path.join(self.base_dir, name)))
+
+    def writer(self, service: str) -> ServiceLogWriter:
+        """Return the writer of a service, creating it on first use."""
+        with self._lock:
+            writer = self._writers.get(service)
+            if writer is None:
+                writer = self._writers[service] = ServiceLogWriter(self, service)
+                # Segments left open by a previous run are closed now
+                for _, path in self.segments(service):
+                    if path.endswith(".log"):
+                        self.segment_closed(path)
+            return writer
+
+    def close_writer(self, service: str, writer: Optional[ServiceLogWriter] = None):
+        """Close the writer of a service whose process has ended."""
+        with self._lock:
+            current = self._writers.get(service)
+            if writer is None or current is writer:
+                self._writers.pop(service, None)
+                writer = current
+        if writer:
+            writer.close()
+
+    def flush(self):
+        """Flush all open writers."""
+        with self._lock:
+            writers = list(self._writers.values())
+        for writer in writers:
+            writer.flush()
+
+    def segments(self, service: str) -> List[Tuple[float, str]]:
+        """Return (start time, path) of the segments of a service, oldest first."""
+        directory = self.service_dir(service)
+        if not os.path.isdir(directory):
+            return []
+        segments = {}
+        for name in os.listdir(directory):
+            for suffix in self.SEGMENT_SUFFIXES:
+                stem = name[:-len(suffix)]
+                if name.endswith(suffix) and self.SEGMENT_STEM.match(stem):
+                    # While a segment is compressed both files exist: the plain one is complete
+                    if stem not in segments or suffix == ".log":
+                        segments[stem] = os.path.join(directory, name)
+                    break
+        return [(int(stem[:13]) / 1000.0, segments[stem]) for stem in sorted(segments)]
+
+    # --- Compression and retention ---
+
+    def segment_closed(self, path: str):
+        """Compress a closed segment in the background and apply the disk budget."""
+        compression = self.compression
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        if compression in ("gzip", "zstd"):
+            threading.Thread(target=self._compress, args=(path, compression), daemon=True).start()
+        self._apply_retention(os.path.dirname(path))
+
+    @staticmethod
+    def _compress(path: str, compression: str):
+        target = path + (".gz" if compression == "gzip" else ".zst")
+        try:
+            with open(path, "rb") as source:
+                if compression == "gzip":
+                    with gzip.open(target + ".tmp", "wb", compresslevel=6) as out:
+                        shutil.copyfileobj(source, out, 1024 * 1024)
+                else:
+                    with open(target + ".tmp", "wb") as out:
+                        zstandard.ZstdCompressor(level=3).copy_stream(source, out)
+            os.replace(target + ".tmp", target)
+            os.remove(path)
+        except OSError as e:
+            log_queue.put(f"Archivio log: compressione di {path} fallita: {e}\n")
+
+    def _apply_retention(self, directory: str):
+        segments = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.endswith(self.SEGMENT_SUFFIXES))
+        sizes = {path: os.path.getsize(path) for path in segments if os.path.exists(path)}
+        total = sum(sizes.values())
+        for path in segments[:-1]:
+            if total <= self.max_bytes:
+                break
+            stem = os.path.basename(path).split(".")[0]
+            for leftover in (path, os.path.join(directory, stem + ".idx")):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+            total -= sizes.get(path, 0)
+
+    # --- Reading ---
+
+    @staticmethod
+    def open_segment(path: str):
+        """Open a segment for binary streaming, whatever its compression."""
+        if path.endswith(".gz"):
+            return gzip.open(path, "rb")
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError("Il pacchetto 'zstandard' è necessario per leggere i segmenti .zst")
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+        return open(path, "rb")
+
+    @staticmethod
+    def parse_record(raw: bytes) -> Optional[Tuple[float, int, str]]:
+        """Return (timestamp, level, text) of a stored line."""
+        parts = raw.rstrip(b"\n").split(b"\t", 2)
+        if len(parts) != 3:
+            return None
+        try:
+            return float(parts[0]), int(parts[1]), parts[2].decode("utf-8", "replace")
+        except ValueError:
+            return None
+
+    @staticmethod
+    def index_offset(path: str, timestamp: float) -> int:
+        """Return the offset of the last indexed record at or before timestamp."""
+        stem = os.path.basename(path).split(".")[0]
+        offset = 0
+        try:
+            with open(os.path.join(os.path.dirname(path), stem + ".idx"), encoding="utf-8") as f:
+                for line in f:
+                    entry_time, _, entry_offset = line.partition(" ")
+                    try:
+                        if float(entry_time) > timestamp:
+                            break
+                        offset = int(entry_offset)
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return offset
+
+    def read(self, service: str, since: Optional[float] = None,
+             until: Optional[float] = None) -> Iterator[Tuple[float, int, str]]:
+        """Yield the records of a service from `since` (seeking through the index) up to `until`."""
+        segments = self.segments(service)
+        first = 0
+        if since is not None:
+            # Last segment starting at or before `since`
+            starts = [start for start, _ in segments]
+            first = max(0, bisect.bisect_right(starts, since) - 1)
+        self.flush()
+        for start, path in segments[first:]:
+            if until is not None and start > until:
+                return
+            try:
+                f = self.open_segment(path)
+            except FileNotFoundError:
+                # Compressed meanwhile: read the compressed copy
+                candidates = [p for s, p in self.segments(service) if s == start]
+                if not candidates:
+                    continue
+                f = self.open_segment(candidates[0])
+            with f:
+                if since is not None and since > start:
+                    f.seek(self.index_offset(path, since))
+                for raw in f:
+                    record = self.parse_record(raw)
+                    if record is None:
+                        continue
+                    if since is not None and record[0] < since:
+                        continue
+                    if until is not None and record[0] > until:
+                        return
+                    yield record
+
+    def tail(self, service: str, count: int = 100) -> List[Tuple[float, int, str]]:
+        """Return the last `count` records of a service, reading segments backwards."""
+        self.flush()
+        result: List[Tuple[float, int, str]] = []
+        for _, path in reversed(self.segments(service)):
+            needed = count - len(result)
+            if needed <= 0:
+                break
+            if path.endswith(".log"):
+                lines = self._tail_plain(path, needed)
+            else:
+                lines = collections.deque(maxlen=needed)
+                with self.open_segment(path) as f:
+                    lines.extend(f)
+            records = [r for r in (self.parse_record(raw) for raw in lines) if r]
+            result = records[-needed:] + result
+        return result
+
+    @staticmethod
+    def _tail_plain(path: str, count: int, block: int = 64 * 1024) -> List[bytes]:
+        """Return the last `count` lines of an uncompressed file, reading blocks from the end."""
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(block, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.splitlines(keepends=True)
+        if position > 0:
+            lines = lines[1:]  # First line may be partial
+        return lines[-count:]
+
+    def search(self, service: str, pattern: str, since: Optional[float] = None, until: Optional[float] = None,
+               min_level: int = 0, limit: int = 1000, regex: bool = False) -> List[Tuple[float, int, str]]:
+        """Return up to `limit` records matching a text (or regular expression) and the filters."""
+        if regex:
+            match = re.compile(pattern).search
+        else:
+            match = (lambda text: pattern in text) if pattern else (lambda text: True)
+        result = []
+        for record in self.read(service, since, until):
+            if record[1] >= min_level and match(record[2]):
+                result.append(record)
+                if len(result) >= limit:
+                    break
+        return result
+
+    @staticmethod
+    def format_record(record: Tuple[float, int, str]) -> str:
+        """Return a record as a console line with its local time."""
+        timestamp, level, text = record
+        stamp = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        return f"{stamp} {text}\n"
+
+
+# Output of the launched services written to disk
+log_archive = LogArchive()
+
+# Access log lines: '"GET /path HTTP/1.1" 200' (uvicorn, werkzeug, gunicorn, common/combined log format)
+_ACCESS_REQUEST = re.compile(r'"([A-Z]+) (\S+) HTTP/[\d.]+" (\d{3})')
+# Explicit duration after the request: "12.3ms", "in 0.012s", "duration=850us"
+_ACCESS_DURATION = re.compile(r'(\d+(?:\.\d+)?)\s*(ms|us|µs|s)\b')
+# Bare decimal at the end of the line: seconds, as gunicorn's %(L)s
+_ACCESS_TRAILING_SECONDS = re.compile(r'\s(\d+\.\d+)\s*$')
+_DURATION_UNITS = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "µs": 1e-6}
+# JSON/logfmt keys: status code, and durations in seconds / milliseconds / microseconds
+_STATUS_KEYS = ("status", "status_code", "http.status_code", "statusCode")
+_DURATION_KEYS = (("duration_ms", 1e-3), ("latency_ms", 1e-3), ("elapsed_ms", 1e-3), ("response_time_ms", 1e-3),
+                  ("duration_us", 1e-6), ("duration", 1.0), ("latency", 1.0), ("elapsed", 1.0),
+                  ("response_time", 1.0), ("request_time", 1.0))
+
+
+def _duration_value(value, scale: float) -> Optional[float]:
+    """Return a duration in seconds from a number or a "12.3ms" style string."""
+    if isinstance(value, (int, float)):
+        return value * scale
+    if isinstance(value, str):
+        match = _ACCESS_DURATION.fullmatch(value.strip())
+        if match:
+            return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        try:
+            return float(value) * scale
+        except ValueError:
+            return None
+    return None
+
+
+def parse_access_log(line: str) -> Optional[Tuple[int, Optional[float]]]:
+    """
+    Return (status code, latency in seconds or None) of an access log line, or None.
+
+    Recognises the request/status part of uvicorn, werkzeug (Flask),
+    gunicorn and common log format lines, and JSON or logfmt records with
+    a status and a duration field.
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        fields = record if isinstance(record, dict) else {}
+    elif "HTTP/" in line:
+        match = _ACCESS_REQUEST.search(line)
+        if not match:
+            return None
+        rest = line[match.end():]
+        duration = _ACCESS_DURATION.search(rest)
+        if duration:
+            return int(match.group(3)), float(duration.group(1)) * _DURATION_UNITS[duration.group(2)]
+        trailing = _ACCESS_TRAILING_SECONDS.search(rest)
+        return int(match.group(3)), float(trailing.group(1)) if trailing else None
+    elif "status=" in line:
+        fields = {key: value.strip('"') for key, value in _LOGFMT_PAIR.findall(line)}
+    else:
+        return None
+    status = next((fields[key] for key in _STATUS_KEYS if key in fields), None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return None
+    if not 100 <= status <= 599:
+        return None
+    latency = None
+    for key, scale in _DURATION_KEYS:
+        if key in fields:
+            latency = _duration_value(fields[key], scale)
+            break
+    return status, latency
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram in fixed memory.
+
+    Values (microseconds) are bucketed log-linearly: each power of two is
+    split into SUB_BUCKETS/2 linear buckets, so every recorded value is
+    known within ~3% from 1 µs up to MAX_MICROSECONDS, in about 1000 counters.
+    """
+
+    SUB_BITS = 6
+    SUB_BUCKETS = 1 << SUB_BITS
+    MAX_MICROSECONDS = 1 << 36  # ~19 hours
+
+    def __init__(self):
+        half = self.SUB_BUCKETS // 2
+        magnitudes = self.MAX_MICROSECONDS.bit_length() - self.SUB_BITS
+        self.counts = array("Q", bytes(8 * (self.SUB_BUCKETS + magnitudes * half)))
+        self.total = 0
+
+    def _index(self, value: int) -> int:
+        magnitude = max(0, value.bit_length() - self.SUB_BITS)
+        return magnitude * (self.SUB_BUCKETS // 2) + (value >> magnitude)
+
+    def _value(self, index: int) -> int:
+        """Return the upper bound of a bucket."""
+        half = self.SUB_BUCKETS // 2
+        if index < self.SUB_BUCKETS:
+            return index
+        magnitude, offset = divmod(index - self.SUB_BUCKETS, half)
+        magnitude += 1
+        return ((half + offset + 1) << magnitude) - 1
+
+    def record(self, seconds: float):
+        """Add a latency measurement."""
+        value = min(max(int(seconds * 1e6), 0), self.MAX_MICROSECONDS - 1)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+
+    def add(self, other: "LatencyHistogram"):
+        """Add the counts of another histogram."""
+        counts = self.counts
+        for i, count in enumerate(other.counts):
+            if count:
+                counts[i] += count
+        self.total += other.total
+
+    def reset(self):
+        """Clear all counts, keeping the memory."""
+        self.counts = array("Q", bytes(8 * len(self.counts)))
+        self.total = 0
+
+    def percentiles(self, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> List[Optional[float]]:
+        """Return the latency (seconds) at each quantile, None if empty."""
+        if not self.total:
+            return [None] * len(quantiles)
+        targets = [max(1, int(q * self.total + 0.5)) for q in quantiles]
+        result: List[Optional[float]] = [None] * len(quantiles)
+        seen = 0
+        pending = sorted(range(len(quantiles)), key=lambda i: targets[i])
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while pending and seen >= targets[pending[0]]:
+                result[pending.pop(0)] = self._value(index) / 1e6
+            if not pending:
+                break
+        return result
+
+
+class ServiceMetrics:
+    """
+    Rolling request metrics of one service, fed by its access log lines.
+
+    Request and 5xx counts are kept per second over `window` seconds; latency
+    goes to two histograms swapped every `period` seconds, so percentiles cover
+    the last period to two periods. Memory does not grow with traffic.
+    """
+
+    def __init__(self, window: int = 60, period: float = 30.0, rate_window: int = 10):
+        self.window = window
+        self.period = period
+        self.rate_window = rate_window
+        self.seconds = array("q", [-1] * window)
+        self.requests = array("L", [0] * window)
+        self.errors = array("L", [0] * window)
+        self.current = LatencyHistogram()
+        self.previous = LatencyHistogram()
+        self.period_start: Optional[float] = None
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def record(self, status: int, latency: Optional[float] = None, now: Optional[float] = None):
+        """Count a request and its latency."""
+        now = time.time() if now is None else now
+        second = int(now)
+        i = second % self.window
+        with self.lock:
+            if self.seconds[i] != second:
+                self.seconds[i] = second
+                self.requests[i] = 0
+                self.errors[i] = 0
+            self.requests[i] += 1
+            if status >= 500:
+                self.errors[i] += 1
+            self.total += 1
+            if latency is not None:
+                self._rotate(now)
+                self.current.record(latency)
+
+    def _rotate(self, now: float):
+        if self.period_start is None:
+            self.period_start = now
+        elif now - self.period_start >= self.period:
+            self.previous, self.current = self.current, self.previous
+            self.current.reset()
+            # After a long pause both periods are stale
+            if now - self.period_start >= 2 * self.period:
+                self.previous.reset()
+            self.period_start = now
+
+    def rate(self, now: Optional[float] = None) -> Tuple[float, float]:
+        """Return (requests/s, 5xx/s) over the last rate_window complete seconds."""
+        now = time.time() if now is None else now
+        last = int(now) - 1
+        requests = errors = 0
+        with self.lock:
+            for second in range(last - self.rate_window + 1, last + 1):
+                i = second % self.window
+                if self.seconds[i] == second:
+                    requests += self.requests[i]
+                    errors += self.errors[i]
+        return requests / self.rate_window, errors / self.rate_window
+
+    def histogram(self, now: Optional[float] = None) -> LatencyHistogram:
+        """Return a histogram of the recent latencies."""
+        now = time.time() if now is None else now
+        merged = LatencyHistogram()
+        with self.lock:
+            self._rotate(now)
+            merged.add(self.current)
+            merged.add(self.previous)
+        return merged
+
+    @staticmethod
+    def summary(metrics: List["ServiceMetrics"], now: Optional[float] = None) -> Optional[Dict]:
+        """Return rps, error rate and p50/p95/p99 of one or more services (instances), None if no traffic yet."""
+        metrics = [m for m in metrics if m.total]
+        if not metrics:
+            return None
+        now = time.time() if now is None else now
+        rps = errors = 0.0
+        histogram = LatencyHistogram()
+        for m in metrics:
+            requests, failed = m.rate(now)
+            rps += requests
+            errors += failed
+            histogram.add(m.histogram(now))
+        p50, p95, p99 = histogram.percentiles()
+        return {"rps": rps, "error_rate": errors / rps if rps else 0.0, "p50": p50, "p95": p95, "p99": p99,
+                "samples": histogram.total}
+
+
+def format_latency(seconds: Optional[float]) -> str:
+    """Return a latency as a short human readable string."""
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+# Request metrics of the services whose file has metrics enabled, by instance name
+service_metrics: Dict[str, ServiceMetrics] = {}
+
 
 def log_to_console(console: ctk.CTkTextbox, message: str):
     """Log a message to a console textbox."""
@@ -147,8 +1330,8 @@ class RequirementsEditor(ctk.CTkToplevel):
         save_btn = ctk.CTkButton(btn_frame, text="Salva", command=self.save_file)
         save_btn.pack(side="left", padx=5)
 
-        install_btn = ctk.CTkButton(btn_frame, text="Installa", command=self.install_requirements, fg_color="green")
-        install_btn.pack(side="left", padx=5)
+        self.install_btn = ctk.CTkButton(btn_frame, text="Installa", command=self.install_requirements, fg_color="green")
+        self.install_btn.pack(side="left", padx=5)
 
         close_btn = ctk.CTkButton(btn_frame, text="Chiudi", command=self.destroy)
         close_btn.pack(side="right", padx=5)
@@ -195,91 +1378,3704 @@ class RequirementsEditor(ctk.CTkToplevel):
             messagebox.showwarning("Attenzione", "Nessuna dipendenza da installare.")
             return
 
-        # Save to temp file
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False, encoding="utf-8") as f:
-            f.write(content)
-            temp_file = f.name
+        command = self.parent.get_python_command()
+        if not command:
+            messagebox.showerror("Errore", "Tipo ambiente non supportato.")
+            return
+
+        # Compare with the installed distributions in a separate thread
+        self.install_btn.configure(state="disabled", text="Analisi...")
+        q = queue.Queue()
+
+        def worker():
+            try:
+                planner = RequirementsPlanner(command)
+                q.put(("ok", planner.plan(content)))
+            except Exception as e:
+                q.put(("error", str(e)))
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        self._wait_for_plan(q)
+
+    def _wait_for_plan(self, q: queue.Queue):
+        """Wait for the requirements plan and show it."""
+        try:
+            status, result = q.get_nowait()
+        except queue.Empty:
+            if self.winfo_exists():
+                self.after(100, lambda: self._wait_for_plan(q))
+            return
+        if not self.winfo_exists():
+            return
+        self.install_btn.configure(state="normal", text="Installa")
+        if status == "error":
+            messagebox.showerror("Errore", f"Impossibile leggere i pacchetti installati: {result}")
+            return
+        self.show_plan(result)
+
+    def show_plan(self, plan: Dict[str, List]):
+        """Show the requirements diff and install only the delta on confirmation."""
+        popup = ctk.CTkToplevel(self)
+        popup.title("Piano Installazione")
+        popup.geometry("600x450")
+        popup.transient(self)
+        popup.grab_set()
+
+        text = ctk.CTkTextbox(popup, wrap="word")
+        text.pack(pady=10, padx=10, fill="both", expand=True)
+
+        sections = [
+            ("install", "Da installare"),
+            ("upgrade", "Da aggiornare"),
+            ("conflicts", "Conflitti (esclusi)"),
+            ("options", "Opzioni / righe passate a pip"),
+            ("skipped", "Non applicabili"),
+            ("satisfied", "Già soddisfatti"),
+        ]
+        for key, title in sections:
+            if not plan[key]:
+                continue
+            text.insert("end", f"{title} ({len(plan[key])}):\n")
+            for line, detail in plan[key]:
+                text.insert("end", f"  {line}  —  {detail}\n")
+            text.insert("end", "\n")
+        text.configure(state="disabled")
+
+        delta = RequirementsPlanner.delta_requirements(plan)
+        btn_frame = ctk.CTkFrame(popup)
+        btn_frame.pack(pady=5, padx=10, fill="x")
+
+        def install_delta():
+            import tempfile
+            with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False, encoding="utf-8") as f:
+                f.write(delta)
+                temp_file = f.name
+            popup.destroy()
+            # The temp file is removed by the install worker when it is done
+            self.parent.install_dependencies(temp_file, delete_after=True)
+
+        count = len(plan["install"]) + len(plan["upgrade"])
+        install_btn = ctk.CTkButton(btn_frame, text=f"Installa differenze ({count})", fg_color="green",
+                                    command=install_delta, state="normal" if delta else "disabled")
+        install_btn.pack(side="left", padx=5)
+
+        close_btn = ctk.CTkButton(btn_frame, text="Chiudi", command=popup.destroy)
+        close_btn.pack(side="right", padx=5)
+
+
+# Script run inside the target interpreter to snapshot its installed distributions
+ENV_SNAPSHOT_SCRIPT = """
+import json, os, platform, sys
+from importlib import metadata
+
+def full_version(info):
+    version = f"{info.major}.{info.minor}.{info.micro}"
+    if info.releaselevel != "final":
+        version += info.releaselevel[0] + str(info.serial)
+    return version
+
+dists = {}
+for dist in metadata.distributions():
+    name = dist.metadata["Name"]
+    if name and name not in dists:
+        dists[name] = {"version": dist.version, "requires": dist.requires or []}
+env = {
+    "implementation_name": sys.implementation.name,
+    "implementation_version": full_version(sys.implementation.version),
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "platform_python_implementation": platform.python_implementation(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}
+paths = [p for p in sys.path if os.path.basename(p) in ("site-packages", "dist-packages")]
+print(json.dumps({"dists": dists, "env": env, "paths": paths}))
+"""
+
+
+class RequirementsPlanner:
+    """
+    Compares a requirements list with what is installed in an environment.
+
+    The installed distributions are read with importlib.metadata inside the
+    target interpreter (one subprocess) and cached until one of its
+    site-packages directories changes. Requirements are evaluated with
+    `packaging`, so only the missing/outdated ones need to be installed.
+
+    Confronta i requirements con i pacchetti installati e calcola il delta.
+    """
+
+    _cache = {}  # tuple(python_command) -> (site-packages mtimes, snapshot)
+
+    def __init__(self, python_command: List[str]):
+        """
+        Initialize the planner.
+
+        Args:
+            python_command: Command prefix running the target interpreter
+        """
+        self.python_command = python_command
+
+    @staticmethod
+    def _paths_signature(paths: List[str]) -> Tuple:
+        """Return the mtimes of the site-packages directories."""
+        signature = []
+        for path in paths:
+            try:
+                signature.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def snapshot(self, refresh: bool = False) -> Dict:
+        """
+        Return {"dists": {canonical_name: {"name", "version", "requires"}}, "env": {...}, "paths": [...]}.
+
+        Raises:
+            RuntimeError: If the interpreter cannot be inspected
+        """
+        key = tuple(self.python_command)
+        cached = self._cache.get(key)
+        if cached and not refresh and cached[0] == self._paths_signature(cached[1]["paths"]):
+            return cached[1]
+
+        result = subprocess.run(self.python_command + ["-c", ENV_SNAPSHOT_SCRIPT],
+                                capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"codice {result.returncode}")
+        # conda run may print extra lines: the JSON document is the last one
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        dists = {canonicalize_name(name): dict(info, name=name) for name, info in data["dists"].items()}
+        snapshot = {"dists": dists, "env": data["env"], "paths": data["paths"]}
+        self._cache[key] = (self._paths_signature(snapshot["paths"]), snapshot)
+        return snapshot
+
+    @staticmethod
+    def _dependents_conflicts(req: Requirement, version: str, snapshot: Dict) -> List[str]:
+        """Return installed distributions whose requirements exclude version of req."""
+        conflicts = []
+        target = canonicalize_name(req.name)
+        for info in snapshot["dists"].values():
+            for dep in info["requires"]:
+                try:
+                    dep_req = Requirement(dep)
+                except InvalidRequirement:
+                    continue
+                if canonicalize_name(dep_req.name) != target or not dep_req.specifier:
+                    continue
+                if dep_req.marker and not dep_req.marker.evaluate(dict(snapshot["env"], extra="")):
+                    continue
+                if not dep_req.specifier.contains(version, prereleases=True):
+                    conflicts.append(f"{info['name']} richiede {dep_req.name}{dep_req.specifier}")
+        return conflicts
+
+    def plan(self, content: str, snapshot: Optional[Dict] = None) -> Dict[str, List]:
+        """
+        Classify every requirement line.
+
+        Returns:
+            Dictionary with the lists "install", "upgrade", "satisfied",
+            "skipped", "conflicts" (tuples of (line, detail)) and "options"
+            (pip options and unparsable lines, always passed through)
+        """
+        snapshot = snapshot or self.snapshot()
+        plan = {"install": [], "upgrade": [], "satisfied": [], "skipped": [], "conflicts": [], "options": []}
+        seen = {}
+        for raw in content.splitlines():
+            line = raw.split(" #", 1)[0].strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("-"):
+                plan["options"].append((line, "opzione pip"))
+                continue
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                plan["options"].append((line, "non analizzabile, passata a pip"))
+                continue
+
+            # Lines split by marker (pin per Python version) only compete when both apply
+            if req.marker and not req.marker.evaluate(dict(snapshot["env"], extra="")):
+                plan["skipped"].append((line, "marker non applicabile"))
+                continue
+            name = canonicalize_name(req.name)
+            if name in seen and str(seen[name].specifier) != str(req.specifier):
+                plan["conflicts"].append((line, f"in conflitto con '{seen[name]}'"))
+                continue
+            seen[name] = req
+
+            if req.url:
+                plan["install"].append((line, "requisito diretto (URL)"))
+                continue
+
+            installed = snapshot["dists"].get(name)
+            if installed is None:
+                detail = "non installato"
+                category = "install"
+            elif req.specifier.contains(installed["version"], prereleases=True):
+                plan["satisfied"].append((line, f"installato {installed['version']}"))
+                continue
+            else:
+                detail = f"installato {installed['version']}"
+                category = "upgrade"
+
+            # Exact pins can be checked against the installed dependents
+            pinned = [spec.version for spec in req.specifier if spec.operator in ("==", "===")]
+            if pinned and "*" not in pinned[0]:
+                conflicts = self._dependents_conflicts(req, pinned[0], snapshot)
+                if conflicts:
+                    plan["conflicts"].append((line, "; ".join(conflicts)))
+                    continue
+            plan[category].append((line, detail))
+        return plan
+
+    @staticmethod
+    def delta_requirements(plan: Dict[str, List]) -> str:
+        """Return the requirements text containing only what has to be installed."""
+        packages = [line for line, _ in plan["install"] + plan["upgrade"]]
+        # -r/-e and unparsable lines may install something, plain --flags don't
+        packages += [line for line, _ in plan["options"] if not line.startswith("--")]
+        if not packages:
+            return ""
+        flags = [line for line, _ in plan["options"] if line.startswith("--")]
+        return "\n".join(flags + packages) + "\n"
+
+
+def resolve_conda_prefix(name: str, conda_exe: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the prefix directory of a conda environment without running conda.
+
+    Looks at ~/.conda/environments.txt (maintained by conda itself) and at
+    the envs/ directory of the conda installation owning conda_exe.
+
+    Args:
+        name: Environment name ("base" is the installation root)
+        conda_exe: Path or name of the conda executable
+
+    Returns:
+        Absolute prefix path, or None if not found
+    """
+    roots = []
+    for exe in (conda_exe, os.environ.get("CONDA_EXE"), "conda"):
+        resolved = shutil.which(exe) if exe else None
+        if resolved:
+            # <root>/bin/conda, <root>/condabin/conda or <root>\Scripts\conda.exe
+            root = Path(resolved).resolve().parent.parent
+            if root not in roots:
+                roots.append(root)
+
+    if name == "base":
+        candidates = roots
+    else:
+        # The installation owning conda_exe comes first, then environments.txt
+        candidates = [root / "envs" / name for root in roots]
+        envs_file = Path.home() / ".conda" / "environments.txt"
+        try:
+            candidates += [Path(line.strip()) for line in envs_file.read_text(encoding="utf-8").splitlines()
+                           if line.strip() and Path(line.strip()).name == name]
+        except OSError:
+            pass
+
+    for candidate in candidates:
+        if (candidate / "conda-meta").is_dir():
+            return str(candidate)
+    return None
+
+
+def find_site_packages(prefix: str) -> List[str]:
+    """Return the site-packages directories of an environment prefix (no interpreter launch)."""
+    prefix_path = Path(prefix)
+    found = [prefix_path / "Lib" / "site-packages"]  # Windows
+    found += sorted(prefix_path.glob("lib/python*/site-packages"))  # Unix-like
+    return [str(path) for path in found if path.is_dir()]
+
+
+class EnvActivator:
+    """
+    Computes the activated environment of a venv/conda env without running conda.
+
+    `conda run -n <env> python ...` starts a full conda Python process (often
+    1-2 s) and buffers the child's output. Instead the env prefix is resolved
+    once, the variables `conda activate`/`activate` would set (PATH,
+    CONDA_PREFIX, VIRTUAL_ENV, `conda env config vars`) are computed and
+    cached, and `<prefix>/bin/python` is launched directly with them.
+
+    On top of that the activation scripts (venv `activate`, conda
+    `etc/conda/activate.d`) are sourced once in a shell and the resulting
+    changes are kept as an "activation snapshot", cached in memory and on
+    disk keyed by the scripts' mtimes. Only what the scripts add or change is
+    stored (PATH-like variables as the entries added around the current
+    value), and it is applied on top of the launcher's current environment.
+
+    Calcola le variabili d'ambiente di attivazione senza eseguire conda.
+    """
+
+    _cache = {}  # (env_type, prefix) -> activated variables
+    _snapshots = {}  # prefix -> (key, variables)
+    _snapshot_lock = threading.Lock()
+    # Variables the shell itself changes while sourcing the scripts
+    SHELL_VARIABLES = {"_", "SHLVL", "PWD", "OLDPWD", "PS1", "PROMPT"}
+    # Format of the on-disk snapshots (1 stored full values of the extended variables)
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, env_type: Optional[str], name: Optional[str] = None,
+                 path: Optional[str] = None, conda_exe: Optional[str] = None,
+                 cache_dir: str = os.path.join(".venvs", ".activation")):
+        """
+        Initialize the activator.
+
+        Args:
+            env_type: "venv", "conda" or None (system)
+            name: Environment name
+            path: Environment path (venv)
+            conda_exe: Conda executable, used to locate the installation
+            cache_dir: Directory of the on-disk activation snapshots
+        """
+        self.env_type = env_type
+        self.name = name
+        self.conda_exe = conda_exe
+        self.cache_dir = cache_dir
+        if env_type == "venv":
+            self.prefix = os.path.abspath(path) if path else None
+        elif env_type == "conda" and name:
+            self.prefix = resolve_conda_prefix(name, conda_exe)
+        else:
+            self.prefix = None
+
+    def python_executable(self) -> Optional[str]:
+        """Return the interpreter inside the environment, if it exists."""
+        if not self.prefix:
+            return None
+        if os.name == "nt":  # Windows
+            candidates = [os.path.join(self.prefix, "Scripts", "python.exe"), os.path.join(self.prefix, "python.exe")]
+        else:  # Unix-like
+            candidates = [os.path.join(self.prefix, "bin", "python")]
+        return next((c for c in candidates if os.path.exists(c)), None)
+
+    def bin_dirs(self) -> List[str]:
+        """Return the directories `activate` prepends to PATH."""
+        if os.name == "nt":  # Windows
+            if self.env_type == "venv":
+                return [os.path.join(self.prefix, "Scripts")]
+            return [self.prefix] + [os.path.join(self.prefix, *d) for d in (
+                ("Library", "mingw-w64", "bin"), ("Library", "usr", "bin"), ("Library", "bin"), ("Scripts",), ("bin",))]
+        return [os.path.join(self.prefix, "bin")]
+
+    def _conda_env_vars(self) -> Dict[str, str]:
+        """Read the variables set with `conda env config vars set` (conda-meta/state)."""
+        try:
+            with open(os.path.join(self.prefix, "conda-meta", "state"), "r", encoding="utf-8") as f:
+                return {str(k): str(v) for k, v in json.load(f).get("env_vars", {}).items()}
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return {}
+
+    def activation_variables(self) -> Dict[str, Optional[str]]:
+        """
+        Return the variables to set (None means unset) on top of the GUI environment.
+
+        PATH is returned as the list of directories to prepend, joined with os.pathsep.
+        """
+        key = (self.env_type, self.prefix)
+        if key in self._cache:
+            return self._cache[key]
+        variables = {"PYTHONHOME": None}
+        if self.env_type == "venv":
+            variables["VIRTUAL_ENV"] = self.prefix
+        else:
+            name = self.name or os.path.basename(self.prefix)
+            variables.update({
+                "CONDA_PREFIX": self.prefix,
+                "CONDA_DEFAULT_ENV": name,
+                "CONDA_SHLVL": "1",
+                "CONDA_PROMPT_MODIFIER": f"({name}) ",
+            })
+            variables.update(self._conda_env_vars())
+        variables["PATH"] = os.pathsep.join(self.bin_dirs())
+        self._cache[key] = variables
+        return variables
+
+    def _activate_d(self) -> str:
+        """Return the conda activate.d directory of the environment."""
+        return os.path.join(self.prefix, "etc", "conda", "activate.d")
+
+    def activation_scripts(self) -> List[str]:
+        """Return the activation scripts that have to be sourced, in order."""
+        if not self.prefix:
+            return []
+        if self.env_type == "venv":
+            if os.name == "nt":  # Windows
+                candidates = [os.path.join(self.prefix, "Scripts", "activate.bat")]
+            else:  # Unix-like
+                candidates = [os.path.join(self.prefix, "bin", "activate")]
+        else:
+            extension = ".bat" if os.name == "nt" else ".sh"
+            try:
+                candidates = [os.path.join(self._activate_d(), f) for f in sorted(os.listdir(self._activate_d()))
+                              if f.endswith(extension)]
+            except OSError:
+                candidates = []
+        return [c for c in candidates if os.path.isfile(c)]
+
+    def snapshot_key(self, scripts: List[str]) -> List[List]:
+        """Return the cache key of the snapshot: mtimes of the scripts and of activate.d."""
+        key = []
+        for path in [self._activate_d()] + scripts:
+            try:
+                key.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                pass
+        return key
+
+    def _source_scripts(self, scripts: List[str]) -> Dict[str, Optional[str]]:
+        """Source the scripts in a shell and return the variables they changed (None = unset)."""
+        base = self._static_environment(dict(os.environ))
+        dump = "import json, os; print(json.dumps(dict(os.environ)))"
+        if os.name == "nt":  # Windows
+            calls = " && ".join(f'call "{script}" >nul 2>&1' for script in scripts)
+            command = f'cmd /d /c "{calls} && "{sys.executable}" -c "{dump}""'
+        else:  # Unix-like
+            lines = [f". {shlex.quote(script)} >/dev/null 2>&1" for script in scripts]
+            lines.append(f"exec {shlex.quote(sys.executable)} -c {shlex.quote(dump)}")
+            command = ["sh", "-c", "\n".join(lines)]
+        result = subprocess.run(command, capture_output=True, text=True, env=base, timeout=60)
+        after = json.loads(result.stdout.strip().splitlines()[-1])
+        variables = {k: self._delta(base.get(k), v) for k, v in after.items()
+                     if base.get(k) != v and k not in self.SHELL_VARIABLES}
+        variables.update({k: None for k in base if k not in after and k not in self.SHELL_VARIABLES})
+        return variables
+
+    @staticmethod
+    def _delta(old: Optional[str], new: str):
+        """
+        Return how a script changed a variable.
+
+        A value extended with os.pathsep-separated entries (PATH, PYTHONPATH...)
+        becomes [added before, added after], so the launcher's value at launch
+        time is kept in between; any other value is returned as is.
+        """
+        if old:
+            start = new.find(old)
+            if start >= 0:
+                before, after = new[:start], new[start + len(old):]
+                if (not before or before.endswith(os.pathsep)) and (not after or after.startswith(os.pathsep)):
+                    return [before, after]
+        return new
+
+    @staticmethod
+    def apply_snapshot(env: Dict[str, str], variables: Dict) -> Dict[str, str]:
+        """Apply snapshot variables to env (modified in place and returned)."""
+        for var, value in variables.items():
+            if value is None:
+                env.pop(var, None)
+            elif isinstance(value, list):
+                current = env.get(var)
+                env[var] = value[0] + current + value[1] if current else (value[0] + value[1]).strip(os.pathsep)
+            else:
+                env[var] = value
+        return env
+
+    def snapshot(self, compute: bool = True) -> Optional[Dict]:
+        """
+        Return the activation snapshot, computing it only if the scripts changed.
+
+        Safe to call from a worker thread; concurrent callers wait for one
+        computation. With compute=False only the memory/disk caches are read
+        and None is returned when the snapshot has to be computed.
+        """
+        scripts = self.activation_scripts()
+        if not scripts:
+            return {}
+        key = self.snapshot_key(scripts)
+        cached = self._snapshots.get(self.prefix)
+        if cached and cached[0] == key:
+            return cached[1]
+        if not compute and self._snapshot_lock.locked():
+            return None  # Being computed by a worker
+        with self._snapshot_lock:
+            cached = self._snapshots.get(self.prefix)
+            if cached and cached[0] == key:
+                return cached[1]
+            cache_file = os.path.join(self.cache_dir, hashlib.sha1(self.prefix.encode("utf-8")).hexdigest()[:16] + ".json")
+            variables = None
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if (data.get("version") == self.SNAPSHOT_VERSION and data.get("prefix") == self.prefix
+                        and data.get("key") == key):
+                    variables = data["variables"]
+            except (OSError, json.JSONDecodeError, KeyError):
+                pass
+            if variables is None and not compute:
+                return None
+            if variables is None:
+                try:
+                    variables = self._source_scripts(scripts)
+                except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+                    variables = {}
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(cache_file, "w", encoding="utf-8") as f:
+                        json.dump({"version": self.SNAPSHOT_VERSION, "prefix": self.prefix, "key": key,
+                                   "variables": variables}, f, indent=2)
+                except OSError:
+                    pass
+            self._snapshots[self.prefix] = (key, variables)
+            return variables
+
+    def environment(self, base: Optional[Dict[str, str]] = None, use_snapshot: bool = True,
+                    compute_snapshot: bool = True) -> Dict[str, str]:
+        """
+        Return a full environment for Popen.
+
+        Args:
+            base: Environment to start from (default: os.environ)
+            use_snapshot: Apply the activation snapshot of the env scripts
+            compute_snapshot: Source the scripts if the snapshot is not cached
+                (False: the snapshot is skipped until a worker computes it)
+        """
+        env = self._static_environment(dict(os.environ if base is None else base))
+        if use_snapshot and self.prefix:
+            self.apply_snapshot(env, self.snapshot(compute_snapshot) or {})
+        return env
+
+    def _static_environment(self, env: Dict[str, str]) -> Dict[str, str]:
+        """Apply the computed activation variables to env (modified in place and returned)."""
+        # Unbuffered output so the log shows lines as soon as they are printed
+        env.setdefault("PYTHONUNBUFFERED", "1")
+        if not self.prefix:
+            return env
+        variables = self.activation_variables()
+        # Drop the bin dirs of an environment the GUI itself was started from
+        old_prefix = env.get("CONDA_PREFIX") or env.get("VIRTUAL_ENV")
+        path_entries = env.get("PATH", "").split(os.pathsep) if env.get("PATH") else []
+        if old_prefix and old_prefix != self.prefix:
+            path_entries = [p for p in path_entries if not p.startswith(old_prefix + os.sep) and p != old_prefix]
+        if self.env_type == "venv":
+            env.pop("CONDA_PREFIX", None)
+        for var, value in variables.items():
+            if var == "PATH":
+                env["PATH"] = os.pathsep.join([value] + [p for p in path_entries if p not in value.split(os.pathsep)])
+            elif value is None:
+                env.pop(var, None)
+            else:
+                env[var] = value
+        return env
+
+
+def parse_env_overrides(text: str) -> Dict[str, Optional[str]]:
+    """
+    Parse KEY=VALUE lines into an overrides dictionary.
+
+    A line with only "-KEY" removes the variable from the environment;
+    empty lines and lines starting with # are ignored.
+    """
+    overrides = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("-") and "=" not in line:
+            overrides[line[1:].strip()] = None
+        elif "=" in line:
+            key, value = line.split("=", 1)
+            if key.strip():
+                overrides[key.strip()] = value
+        else:
+            raise ValueError(f"Riga non valida: {line}")
+    return overrides
+
+
+def format_env_overrides(overrides: Dict[str, Optional[str]]) -> str:
+    """Format an overrides dictionary as editable KEY=VALUE lines."""
+    return "\n".join(f"-{key}" if value is None else f"{key}={value}" for key, value in overrides.items())
+
+
+def apply_env_overrides(env: Dict[str, str], overrides: Dict[str, Optional[str]]) -> Dict[str, str]:
+    """Apply per-file overrides to env; values may reference variables as $VAR / ${VAR}."""
+    for key, value in overrides.items():
+        if value is None:
+            env.pop(key, None)
+        else:
+            # Expand references against the environment being built, not the GUI's one
+            env[key] = expand_variables(value, env)
+    return env
+
+
+def expand_instance_template(value: str, instance: int, port: Optional[int]) -> str:
+    """Replace {instance} and {port} in an argument or environment value."""
+    value = value.replace("{instance}", str(instance))
+    if port is not None:
+        value = value.replace("{port}", str(port))
+    return value
+
+
+def uses_port_template(settings: Dict) -> bool:
+    """Return True if the arguments or environment of a file (or its resolved settings) reference {port}."""
+    values = list(settings.get("args", [])) + [v for v in settings.get("env", {}).values() if v is not None]
+    return any("{port}" in value for value in values)
+
+
+# Launch types: how the "path" of a file is run
+LAUNCH_TYPES = {
+    "script": "Script",
+    "module": "Modulo (-m)",
+    "entry_point": "Entry point",
+    "command": "Comando",
+}
+
+
+def parse_launch_spec(text: str) -> Tuple[str, str, List[str]]:
+    """
+    Parse a command line typed by the user into (launch type, target, args).
+
+    "-m pkg.mod ..." is a module, "*.py ..." a script; anything else is
+    returned as a command (the caller may turn it into an entry point).
+
+    Raises:
+        ValueError: If the text is empty or cannot be split
+    """
+    tokens = shlex.split(text, posix=os.name != "nt")
+    if not tokens:
+        raise ValueError("Comando vuoto")
+    if tokens[0] == "-m":
+        if len(tokens) < 2:
+            raise ValueError("Manca il nome del modulo dopo -m")
+        return "module", tokens[1], tokens[2:]
+    if tokens[0].endswith(".py"):
+        return "script", tokens[0], tokens[1:]
+    return "command", tokens[0], tokens[1:]
+
+
+# Launch profiles offered in the main window; files may define more under "profiles"
+LAUNCH_PROFILES = ["default", "dev", "bench", "prod"]
+
+
+def resolve_launch_settings(file_entry: Dict, profile: Optional[str] = None) -> Dict:
+    """
+    Return the launch settings of a file for a profile.
+
+    The base settings (args, cwd, interpreter_flags, env) are overridden by
+    the ones in file_entry["profiles"][profile]; env is merged key by key.
+    """
+    settings = {
+        "args": list(file_entry.get("args", [])),
+        "cwd": file_entry.get("cwd"),
+        "interpreter_flags": list(file_entry.get("interpreter_flags", [])),
+        "env": dict(file_entry.get("env", {})),
+    }
+    overrides = file_entry.get("profiles", {}).get(profile, {}) if profile and profile != "default" else {}
+    for key in ("args", "cwd", "interpreter_flags"):
+        if key in overrides:
+            settings[key] = overrides[key]
+    settings["env"].update(overrides.get("env", {}))
+    return settings
+
+
+def expand_variables(value: str, env: Dict[str, str]) -> str:
+    """Expand $VAR and ${VAR} references using env; unknown names are left as they are."""
+    return re.sub(r"\$(\w+)|\$\{(\w+)\}",
+                  lambda m: env.get(m.group(1) or m.group(2), m.group(0)), value)
+
+
+class SitePackagesInspector:
+    """
+    Reads installed distributions directly from *.dist-info/*.egg-info on disk.
+
+    No interpreter is launched. Results are cached per site-packages
+    directory and invalidated when its mtime changes (any install or
+    uninstall adds or removes a metadata directory).
+
+    Legge i pacchetti installati direttamente dai metadati su disco.
+    """
+
+    _cache = {}  # site-packages path -> (mtime_ns, list of packages)
+
+    def __init__(self, site_packages: List[str]):
+        """
+        Initialize the inspector.
+
+        Args:
+            site_packages: site-packages directories to inspect
+        """
+        self.site_packages = site_packages
+
+    @staticmethod
+    def _read_headers(path: Path) -> Dict[str, List[str]]:
+        """Read the RFC 822 header block of METADATA/PKG-INFO (the body is skipped)."""
+        headers = {}
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    if line in ("\n", "\r\n"):
+                        break
+                    if line[:1] in (" ", "\t") or ":" not in line:
+                        continue
+                    key, value = line.split(":", 1)
+                    headers.setdefault(key.strip().lower(), []).append(value.strip())
+        except OSError:
+            pass
+        return headers
+
+    @staticmethod
+    def _record_size(path: Path) -> int:
+        """Sum the file sizes listed in a RECORD file."""
+        total = 0
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    size = line.rstrip().rsplit(",", 1)[-1]
+                    if size.isdigit():
+                        total += int(size)
+        except OSError:
+            pass
+        return total
+
+    @staticmethod
+    def _egg_info_requires(path: Path) -> List[str]:
+        """Read requires.txt of an egg-info directory (unconditional section only)."""
+        requires = []
+        try:
+            for line in (path / "requires.txt").read_text(encoding="utf-8", errors="replace").splitlines():
+                line = line.strip()
+                if line.startswith("["):
+                    break
+                if line:
+                    requires.append(line)
+        except OSError:
+            pass
+        return requires
+
+    @staticmethod
+    def _egg_info_size(path: Path) -> int:
+        """Sum the sizes of the files listed in installed-files.txt."""
+        total = 0
+        try:
+            for line in (path / "installed-files.txt").read_text(encoding="utf-8", errors="replace").splitlines():
+                try:
+                    total += os.path.getsize(path / line.strip())
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        return total
+
+    def _read_distribution(self, path: Path) -> Optional[Dict]:
+        """Read a single *.dist-info or *.egg-info entry."""
+        if path.suffix == ".dist-info":
+            headers = self._read_headers(path / "METADATA")
+            requires = headers.get("requires-dist", [])
+            size = self._record_size(path / "RECORD")
+        elif path.is_dir():
+            headers = self._read_headers(path / "PKG-INFO")
+            requires = self._egg_info_requires(path)
+            size = self._egg_info_size(path)
+        else:
+            # Legacy single-file egg-info
+            headers = self._read_headers(path)
+            requires = []
+            size = 0
+        name = (headers.get("name") or [""])[0]
+        if not name:
+            return None
+        dependencies = []
+        for requirement in requires:
+            try:
+                req = Requirement(requirement)
+            except InvalidRequirement:
+                continue
+            # Dependencies of optional extras are not edges of the installed graph
+            if req.marker and "extra" in str(req.marker):
+                continue
+            dependencies.append(canonicalize_name(req.name))
+        return {
+            "name": name,
+            "key": canonicalize_name(name),
+            "version": (headers.get("version") or [""])[0],
+            "summary": (headers.get("summary") or [""])[0],
+            "size": size,
+            "requires": sorted(set(dependencies)),
+            "location": str(path.parent),
+        }
+
+    def _scan(self, site_packages: str) -> List[Dict]:
+        """Read all distributions of one site-packages directory, using the cache."""
+        try:
+            mtime = os.stat(site_packages).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._cache.get(site_packages)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        packages = []
+        with os.scandir(site_packages) as it:
+            for entry in it:
+                if entry.name.endswith((".dist-info", ".egg-info")):
+                    package = self._read_distribution(Path(entry.path))
+                    if package:
+                        packages.append(package)
+        self._cache[site_packages] = (mtime, packages)
+        return packages
+
+    def packages(self) -> List[Dict]:
+        """
+        Return the installed distributions with dependency edges.
+
+        Each package has "name", "key", "version", "summary", "size",
+        "requires" (canonical names) and "required_by" (canonical names).
+        """
+        packages = {}
+        for site_packages in self.site_packages:
+            for package in self._scan(site_packages):
+                # The first site-packages on the path wins, as at import time
+                packages.setdefault(package["key"], dict(package))
+        for package in packages.values():
+            package["required_by"] = []
+        for package in packages.values():
+            for dependency in package["requires"]:
+                if dependency in packages:
+                    packages[dependency]["required_by"].append(package["key"])
+        return sorted(packages.values(), key=lambda p: p["key"])
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Parse the stderr of `python -X importtime` into a tree.
+
+    The output is post-order (a module is printed after its imports) and
+    nesting is given by the indentation of the module name.
+
+    Returns:
+        List of root nodes {"name", "self_us", "cumulative_us", "children"}
+    """
+    pending = {}  # depth -> nodes waiting for their parent
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        name_field = parts[2].rstrip()
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        node = {
+            "name": name_field.strip(),
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+class ImportProfiler:
+    """
+    Profiles the import time of a script or a list of modules with -X importtime.
+
+    For a script, only its top-level imports (found with ast) are executed,
+    so long-running services can be profiled without starting them. Each run
+    is appended to a JSON history so regressions after dependency upgrades
+    are visible.
+
+    Profila il tempo di import di uno script o di una lista di moduli.
+    """
+
+    def __init__(self, python_command: List[str], history_file: str = "import_profiles_STARTER_GUI.json"):
+        """
+        Initialize the profiler.
+
+        Args:
+            python_command: Command prefix running the target interpreter
+            history_file: JSON file storing the previous runs
+        """
+        self.python_command = python_command
+        self.history_file = history_file
+
+    @staticmethod
+    def script_imports(script_path: str) -> List[str]:
+        """Return the absolute modules imported at the top level of a script."""
+        with open(script_path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=script_path)
+        modules = []
+        # Top-level statements, including those guarded by try/if (optional imports)
+        stack = list(reversed(tree.body))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ast.Import):
+                modules += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules.append(node.module)
+            elif isinstance(node, (ast.Try, ast.If)):
+                children = node.body + node.orelse + getattr(node, "finalbody", [])
+                for handler in getattr(node, "handlers", []):
+                    children += handler.body
+                stack.extend(reversed(children))
+        return list(dict.fromkeys(modules))
+
+    def profile(self, modules: List[str], cwd: Optional[str] = None, timeout: int = 120) -> Dict:
+        """
+        Import modules in a fresh interpreter with -X importtime.
+
+        Returns:
+            Dictionary with "tree", "total_us", "wall_s", "errors" and "modules"
+        """
+        code = ("import sys\n"
+                "sys.path.insert(0, '.')\n"
+                f"for name in {modules!r}:\n"
+                "    try:\n"
+                "        __import__(name)\n"
+                "    except BaseException as e:\n"
+                "        print(f'IMPORT_ERROR {name}: {e!r}', file=sys.stderr)\n")
+        start = time.perf_counter()
+        result = subprocess.run(self.python_command + ["-X", "importtime", "-c", code],
+                                capture_output=True, text=True, cwd=cwd, timeout=timeout)
+        wall = time.perf_counter() - start
+        tree = parse_importtime(result.stderr)
+        errors = [line[len("IMPORT_ERROR "):] for line in result.stderr.splitlines()
+                  if line.startswith("IMPORT_ERROR ")]
+        return {
+            "modules": modules,
+            "tree": tree,
+            "total_us": sum(node["cumulative_us"] for node in tree),
+            "wall_s": wall,
+            "errors": errors,
+        }
+
+    def profile_script(self, script_path: str) -> Dict:
+        """Profile the top-level imports of a script, run from its directory."""
+        return self.profile(self.script_imports(script_path), cwd=os.path.dirname(os.path.abspath(script_path)))
+
+    @staticmethod
+    def slowest(tree: List[Dict], count: int = 20, key: str = "cumulative_us") -> List[Dict]:
+        """Return the count slowest modules of a tree (all depths)."""
+        nodes = []
+        stack = list(tree)
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node["children"])
+        return sorted(nodes, key=lambda n: n[key], reverse=True)[:count]
+
+    def load_history(self) -> Dict[str, List[Dict]]:
+        """Load the history of previous runs, keyed by target."""
+        try:
+            with open(self.history_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def record(self, target: str, env_name: str, result: Dict, keep: int = 50) -> Optional[Dict]:
+        """
+        Append a run to the history.
+
+        Returns:
+            The previous run for the same target and environment, if any
+        """
+        history = self.load_history()
+        runs = history.setdefault(target, [])
+        previous = next((run for run in reversed(runs) if run.get("env") == env_name), None)
+        runs.append({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "env": env_name,
+            "total_us": result["total_us"],
+            "modules": {node["name"]: node["cumulative_us"] for node in self.slowest(result["tree"], 50)},
+        })
+        history[target] = runs[-keep:]
+        try:
+            with open(self.history_file, "w", encoding="utf-8") as f:
+                json.dump(history, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"Error saving import profile history: {e}")
+        return previous
+
+    @staticmethod
+    def regressions(result: Dict, previous: Dict, threshold: float = 0.2, min_us: int = 5000) -> List[Tuple[str, int, int]]:
+        """Return (module, before_us, after_us) for modules slower than in the previous run."""
+        before = previous.get("modules", {})
+        found = []
+        for node in ImportProfiler.slowest(result["tree"], 50):
+            old = before.get(node["name"])
+            if old is not None and node["cumulative_us"] - old >= min_us and node["cumulative_us"] > old * (1 + threshold):
+                found.append((node["name"], old, node["cumulative_us"]))
+        return found
+
+
+# Script run inside the target interpreter by EnvBenchmark (config as JSON in argv[1])
+BENCHMARK_SCRIPT = r"""
+import json, os, platform, sys, time
+
+config = json.loads(sys.argv[1])
+result = {"python": platform.python_version(), "implementation": platform.python_implementation()}
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if "python" in config["tests"]:
+    def loop():
+        total = 0
+        for i in range(config["python_loops"]):
+            total += i % 7
+        return total
+    seconds = best_of(loop, config["repeat"])
+    result["python_mloops_s"] = config["python_loops"] / seconds / 1e6
+
+n = config["matmul_size"]
+flops = 2.0 * n ** 3
+try:
+    import numpy as np
+    result["numpy"] = np.__version__
+    try:
+        from threadpoolctl import threadpool_info
+        result["blas"] = ", ".join(sorted({f"{i['internal_api']} ({i['num_threads']} thr)" for i in threadpool_info()}))
+    except ImportError:
+        pass
+    if "numpy" in config["tests"]:
+        a = np.random.rand(n, n)
+        b = np.random.rand(n, n)
+        a @ b  # Warm-up (thread pool start)
+        result["numpy_gflops"] = flops / best_of(lambda: a @ b, config["repeat"]) / 1e9
+    if "memory" in config["tests"]:
+        src = np.ones(config["memory_mb"] * 1024 * 1024 // 8)
+        dst = np.empty_like(src)
+        seconds = best_of(lambda: np.copyto(dst, src), config["repeat"])
+        result["memory_gb_s"] = 2 * src.nbytes / seconds / 1e9
+except ImportError:
+    if "memory" in config["tests"]:
+        src = bytearray(config["memory_mb"] * 1024 * 1024)
+        seconds = best_of(lambda: bytes(src), config["repeat"])
+        result["memory_gb_s"] = 2 * len(src) / seconds / 1e9
+
+if "torch" in config["tests"]:
+    try:
+        import torch
+        result["torch"] = torch.__version__
+        if config.get("threads"):
+            torch.set_num_threads(config["threads"])
+        a = torch.rand(n, n, dtype=torch.float64)
+        b = torch.rand(n, n, dtype=torch.float64)
+        torch.mm(a, b)
+        result["torch_gflops"] = flops / best_of(lambda: torch.mm(a, b), config["repeat"]) / 1e9
+    except ImportError:
+        pass
+
+print("BENCHMARK_RESULT " + json.dumps(result))
+"""
+
+
+class EnvBenchmark:
+    """
+    CPU micro-benchmarks run inside an environment's interpreter.
+
+    Measures NumPy/PyTorch float64 matmul GFLOPS, their scaling with the
+    BLAS/OpenMP thread count (set through OMP/MKL/OpenBLAS environment
+    variables, which must be fixed before the libraries are imported, so
+    each thread count is a separate process), memory copy bandwidth and pure
+    Python loop speed. Results are stored as one JSON file per environment
+    so environments can be compared side by side.
+
+    Benchmark CPU dell'ambiente selezionato, salvati in JSON per ambiente.
+    """
+
+    THREAD_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+    def __init__(self, python_command: List[str], results_dir: str = "benchmarks_STARTER_GUI",
+                 matmul_size: int = 1024, memory_mb: int = 256, python_loops: int = 2000000, repeat: int = 3):
+        """
+        Initialize the benchmark.
+
+        Args:
+            python_command: Command prefix running the target interpreter
+            results_dir: Directory where the per-environment JSON files are stored
+            matmul_size: Size of the square matrices
+            memory_mb: Size of the buffer copied for the bandwidth test
+            python_loops: Iterations of the pure Python loop
+            repeat: Repetitions per test (the best time is kept)
+        """
+        self.python_command = python_command
+        self.results_dir = results_dir
+        self.config = {"matmul_size": matmul_size, "memory_mb": memory_mb,
+                       "python_loops": python_loops, "repeat": repeat}
+
+    @staticmethod
+    def thread_counts(max_threads: Optional[int] = None) -> List[int]:
+        """Return 1, 2, 4, ... up to (and including) the number of cores."""
+        max_threads = max_threads or psutil.cpu_count(logical=False) or os.cpu_count() or 1
+        counts = []
+        n = 1
+        while n < max_threads:
+            counts.append(n)
+            n *= 2
+        counts.append(max_threads)
+        return counts
+
+    def _run(self, tests: List[str], threads: Optional[int] = None, timeout: int = 600) -> Dict:
+        """Run the benchmark script once with the given thread count."""
+        env = os.environ.copy()
+        if threads:
+            for var in self.THREAD_VARS:
+                env[var] = str(threads)
+        config = dict(self.config, tests=tests, threads=threads)
+        result = subprocess.run(self.python_command + ["-c", BENCHMARK_SCRIPT, json.dumps(config)],
+                                capture_output=True, text=True, env=env, timeout=timeout)
+        for line in result.stdout.splitlines():
+            if line.startswith("BENCHMARK_RESULT "):
+                return json.loads(line[len("BENCHMARK_RESULT "):])
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip()
+                           else f"codice {result.returncode}")
+
+    def run(self, env_name: str, max_threads: Optional[int] = None, log_callback=None) -> Dict:
+        """
+        Run the whole suite and store the result.
+
+        Args:
+            env_name: Name of the environment (used as result file name)
+            max_threads: Highest thread count of the scaling test
+            log_callback: Optional callable(str) receiving progress lines
+
+        Returns:
+            Result dictionary
+        """
+        log = log_callback or (lambda message: None)
+        log("Benchmark base (Python, memoria, matmul con thread predefiniti)...\n")
+        result = self._run(["python", "memory", "numpy", "torch"])
+        result["scaling"] = {}
+        if "numpy" in result or "torch" in result:
+            for threads in self.thread_counts(max_threads):
+                log(f"Matmul con {threads} thread...\n")
+                scaled = self._run(["numpy", "torch"], threads=threads)
+                result["scaling"][str(threads)] = {key: scaled[key] for key in ("numpy_gflops", "torch_gflops")
+                                                   if key in scaled}
+        result.update({
+            "env": env_name,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "cpu": platform_cpu_description(),
+            "config": self.config,
+        })
+        self.save(env_name, result)
+        return result
+
+    def _result_path(self, env_name: str) -> str:
+        """Return the JSON file of an environment."""
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in env_name)
+        return os.path.join(self.results_dir, f"{safe_name}.json")
+
+    def save(self, env_name: str, result: Dict):
+        """Store the result of an environment."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        with open(self._result_path(env_name), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    def load_all(self) -> List[Dict]:
+        """Load the stored results of all environments."""
+        results = []
+        if not os.path.isdir(self.results_dir):
+            return results
+        for filename in sorted(os.listdir(self.results_dir)):
+            if filename.endswith(".json"):
+                try:
+                    with open(os.path.join(self.results_dir, filename), "r", encoding="utf-8") as f:
+                        results.append(json.load(f))
+                except (OSError, json.JSONDecodeError):
+                    continue
+        return results
+
+    @staticmethod
+    def comparison_rows(results: List[Dict]) -> List[Tuple[str, List[str]]]:
+        """Build (metric, [value per environment]) rows for a side-by-side table."""
+        def fmt(value, unit):
+            return f"{value:.2f} {unit}" if isinstance(value, (int, float)) else "-"
+
+        rows = [
+            ("Python", [r.get("python", "-") for r in results]),
+            ("NumPy", [r.get("numpy", "-") for r in results]),
+            ("BLAS", [r.get("blas", "-") for r in results]),
+            ("PyTorch", [r.get("torch", "-") for r in results]),
+            ("Loop Python", [fmt(r.get("python_mloops_s"), "M it/s") for r in results]),
+            ("Banda memoria", [fmt(r.get("memory_gb_s"), "GB/s") for r in results]),
+            ("NumPy matmul", [fmt(r.get("numpy_gflops"), "GFLOPS") for r in results]),
+            ("PyTorch matmul", [fmt(r.get("torch_gflops"), "GFLOPS") for r in results]),
+        ]
+        thread_counts = sorted({int(t) for r in results for t in r.get("scaling", {})})
+        for threads in thread_counts:
+            for key, label in (("numpy_gflops", "NumPy"), ("torch_gflops", "PyTorch")):
+                values = [r.get("scaling", {}).get(str(threads), {}).get(key) for r in results]
+                if any(v is not None for v in values):
+                    rows.append((f"{label} {threads} thr", [fmt(v, "GFLOPS") for v in values]))
+        return rows
+
+
+def platform_cpu_description() -> str:
+    """Return a short description of the CPU (model and core counts)."""
+    model = ""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        model = platform.processor()
+    return f"{model} ({psutil.cpu_count(logical=False)} core / {psutil.cpu_count()} thread)".strip()
+
+
+class LocalhostScanner:
+    """
+    Builds a deduplicated PID -> listening ports index of localhost services.
+
+    Process metadata (name, command line) is read once per PID and cached;
+    the entry is invalidated when the PID's create_time changes (PID reuse).
+
+    On Linux the LISTEN sockets are read from /proc/net/tcp and tcp6 and
+    their inodes are mapped to PIDs through /proc/<pid>/fd only when a new
+    inode appears, so a steady-state scan reads two small files instead of
+    every process' descriptor table (what psutil.net_connections does).
+    All addresses are covered: IPv4/IPv6 loopback, wildcard and the other
+    local interface addresses. The caches are guarded by a lock, so one
+    scanner can be shared by the GUI and the worker threads.
+
+    Scansiona i servizi in ascolto su localhost con cache dei metadati per PID.
+    """
+
+    PROC_NET_FILES = ("/proc/net/tcp", "/proc/net/tcp6")
+    TCP_LISTEN = "0A"
+
+    def __init__(self, use_procfs: Optional[bool] = None):
+        """
+        Initialize the scanner with empty caches.
+
+        Args:
+            use_procfs: Read /proc/net directly (default: when available)
+        """
+        self._meta = {}  # pid -> {"create_time", "name", "cmdline"}
+        self._inode_pids = {}  # socket inode -> pid (None if not readable)
+        self._lock = threading.RLock()
+        if use_procfs is None:
+            use_procfs = os.path.exists(self.PROC_NET_FILES[0])
+        self.use_procfs = use_procfs
+
+    @staticmethod
+    def decode_address(hex_address: str) -> str:
+        """Decode an address of /proc/net/tcp{,6} (32-bit words in host byte order)."""
+        raw = bytes.fromhex(hex_address)
+        words = b"".join(raw[i:i + 4][::-1] if sys.byteorder == "little" else raw[i:i + 4]
+                         for i in range(0, len(raw), 4))
+        return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, words)
+
+    def _read_proc_net(self) -> List[Tuple[str, int, int]]:
+        """Return (ip, port, inode) of the LISTEN sockets in /proc/net/tcp{,6}."""
+        sockets = []
+        for path in self.PROC_NET_FILES:
+            try:
+                with open(path, "r") as f:
+                    next(f, None)  # Header
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) < 10 or fields[3] != self.TCP_LISTEN:
+                            continue
+                        address, port = fields[1].split(":")
+                        sockets.append((self.decode_address(address), int(port, 16), int(fields[9])))
+            except OSError:
+                continue
+        return sockets
+
+    def _resolve_inodes(self, inodes: set):
+        """Map new socket inodes to PIDs walking /proc/<pid>/fd, stopping once all are found."""
+        missing = set(inodes)
+        for entry in os.scandir("/proc"):
+            if not missing:
+                break
+            if not entry.name.isdigit():
+                continue
+            fd_dir = os.path.join(entry.path, "fd")
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue  # Other users' processes, or exited
+            for fd in fds:
+                try:
+                    target = os.readlink(os.path.join(fd_dir, fd))
+                except OSError:
+                    continue
+                if target.startswith("socket:["):
+                    inode = int(target[8:-1])
+                    if inode in missing:
+                        self._inode_pids[inode] = int(entry.name)
+                        missing.discard(inode)
+        # Not resolvable (permissions): remembered so they do not trigger a walk every scan
+        for inode in missing:
+            self._inode_pids[inode] = None
+
+    def listening_sockets(self) -> List[Tuple[str, int, int]]:
+        """Return (ip, port, pid) of all the listening TCP sockets with a known owner."""
+        if self.use_procfs:
+            with self._lock:
+                sockets = self._read_proc_net()
+                inodes = {inode for _, _, inode in sockets if inode}
+                new_inodes = inodes - self._inode_pids.keys()
+                if new_inodes:
+                    self._resolve_inodes(new_inodes)
+                for inode in [inode for inode in self._inode_pids if inode not in inodes]:
+                    del self._inode_pids[inode]
+                return [(ip, port, self._inode_pids[inode]) for ip, port, inode in sockets
+                        if inode and self._inode_pids.get(inode)]
+        return [(conn.laddr.ip, conn.laddr.port, conn.pid) for conn in psutil.net_connections(kind="inet")
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.pid]
+
+    def listening_ports(self) -> Dict[int, List[int]]:
+        """Return {pid: sorted listening ports}."""
+        return {pid: sorted({port for port, _ in entries}) for pid, entries in self.listening_addresses().items()}
+
+    def listening_addresses(self) -> Dict[int, set]:
+        """Return {pid: {(port, ip)}} of the listening sockets."""
+        index = {}
+        for ip, port, pid in self.listening_sockets():
+            index.setdefault(pid, set()).add((port, ip))
+        return index
+
+    def metadata(self, pid: int) -> Optional[Dict]:
+        """Return the cached metadata of a process, reading it only for new PIDs."""
+        try:
+            proc = psutil.Process(pid)
+            create_time = proc.create_time()
+            cached = self._meta.get(pid)
+            if cached and cached["create_time"] == create_time:
+                return cached
+            with proc.oneshot():
+                meta = {"create_time": create_time, "name": proc.name(), "cmdline": " ".join(proc.cmdline())}
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            self._meta.pop(pid, None)
+            return None
+        self._meta[pid] = meta
+        return meta
+
+    def scan(self, filter_type: str = "all") -> Dict[int, Dict]:
+        """
+        Return {pid: row} for the listening processes.
+
+        Each row has pid, ports, port (lowest), addresses, name and cmdline (max 100 chars).
+        """
+        with self._lock:
+            ports_index = self.listening_addresses()
+            rows = {}
+            for pid, entries in ports_index.items():
+                meta = self.metadata(pid)
+                if meta is None:
+                    continue
+                ports = sorted({port for port, _ in entries})
+                addresses = sorted({ip for _, ip in entries})
+                row = {"pid": pid, "ports": ports, "port": ports[0], "addresses": addresses,
+                       "name": meta["name"], "cmdline": meta["cmdline"][:100]}
+                if filter_type == "app_services" and not any(is_app_service(dict(row, port=port)) for port in ports):
+                    continue
+                rows[pid] = row
+            # Forget processes that are no longer listening
+            for pid in [pid for pid in self._meta if pid not in ports_index]:
+                del self._meta[pid]
+            return rows
+
+    @staticmethod
+    def diff(old: Dict[int, Dict], new: Dict[int, Dict]) -> Tuple[Dict[int, Dict], Dict[int, Dict], List[int]]:
+        """Return (added, changed, removed) between two scans."""
+        added = {pid: row for pid, row in new.items() if pid not in old}
+        changed = {pid: row for pid, row in new.items() if pid in old and old[pid] != row}
+        removed = [pid for pid in old if pid not in new]
+        return added, changed, removed
+
+
+localhost_scanner = LocalhostScanner()
+
+
+def get_localhost_processes(filter_type="all"):
+    """Get list of processes listening on localhost (one entry per port)."""
+    processes = []
+    try:
+        for row in localhost_scanner.scan(filter_type).values():
+            for port in row["ports"]:
+                processes.append({"port": port, "pid": row["pid"], "name": row["name"], "cmdline": row["cmdline"]})
+    except Exception as e:
+        print(f"Error getting processes: {e}")
+    return sorted(processes, key=lambda x: x['port'])
+
+
+def listening_port_owners(scanner: Optional[LocalhostScanner] = None) -> Dict[int, Dict]:
+    """Return {port: owner row} of all the listening sockets, from a single scan."""
+    owners = {}
+    for row in (scanner or localhost_scanner).scan().values():
+        for port in row["ports"]:
+            owners.setdefault(port, row)
+    return owners
+
+
+def find_port_conflicts(ports: List[int], owners: Dict[int, Dict]) -> Dict[int, Dict]:
+    """Return {port: owner row} for the expected ports that are already taken."""
+    return {port: owners[port] for port in ports if port in owners}
+
+
+def find_free_port(host: str = "127.0.0.1") -> int:
+    """Return a TCP port currently free on host (chosen by the OS)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
+
+
+def process_tree_pids(pid: int) -> set:
+    """Return pid and the PIDs of all its descendants."""
+    pids = {pid}
+    try:
+        pids.update(child.pid for child in psutil.Process(pid).children(recursive=True))
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return pids
+
+
+def new_session_kwargs() -> Dict:
+    """Return the Popen arguments placing a launched process in its own session/process group."""
+    if os.name == "nt":  # Windows
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+class ProcessStopper:
+    """
+    Stops whole process trees in bounded time.
+
+    The tree of each root (children found with psutil, plus the root's
+    process group when it leads one) is sent SIGINT, then SIGTERM, then
+    SIGKILL; each phase signals all the surviving processes at once and
+    waits its grace period, so stopping N trees takes at most the sum of
+    the grace periods. Processes spawned during the shutdown are picked up
+    at the next phase. On Windows the phases are CTRL_BREAK, terminate, kill.
+
+    Ferma alberi di processi con SIGINT → SIGTERM → SIGKILL.
+    """
+
+    def __init__(self, interrupt_grace: float = 2.0, terminate_grace: float = 3.0, kill_grace: float = 1.0):
+        """
+        Initialize the stopper.
+
+        Args:
+            interrupt_grace: Seconds to wait after SIGINT
+            terminate_grace: Seconds to wait after SIGTERM
+            kill_grace: Seconds to wait for SIGKILL to be delivered
+        """
+        self.interrupt_grace = interrupt_grace
+        self.terminate_grace = terminate_grace
+        self.kill_grace = kill_grace
+
+    def phases(self) -> List[Tuple[str, int, float]]:
+        """Return (label, signal, grace) for each phase."""
+        if os.name == "nt":  # Windows
+            return [("CTRL_BREAK", signal.CTRL_BREAK_EVENT, self.interrupt_grace),
+                    ("TERMINATE", signal.SIGTERM, self.terminate_grace),
+                    ("KILL", signal.SIGTERM, self.kill_grace)]
+        return [("SIGINT", signal.SIGINT, self.interrupt_grace),
+                ("SIGTERM", signal.SIGTERM, self.terminate_grace),
+                ("SIGKILL", signal.SIGKILL, self.kill_grace)]
+
+    @staticmethod
+    def _tree(pid: int) -> List[psutil.Process]:
+        """Return the process and its descendants (empty if it is gone)."""
+        try:
+            root = psutil.Process(pid)
+            return [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return []
+
+    @staticmethod
+    def _is_zombie(proc: psutil.Process) -> bool:
+        """Return True if the process has exited and only waits to be reaped."""
+        try:
+            return proc.status() == psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.AccessDenied:
+            return False
+
+    @staticmethod
+    def _group_leaders(pids: List[int]) -> List[int]:
+        """Return the roots leading their own process group (POSIX only)."""
+        if os.name == "nt":
+            return []
+        leaders = []
+        for pid in pids:
+            try:
+                if os.getpgid(pid) == pid and pid != os.getpgrp():
+                    leaders.append(pid)
+            except OSError:
+                continue
+        return leaders
+
+    def stop(self, pids: List[int]) -> Dict[int, str]:
+        """
+        Stop the trees rooted at pids (blocking, bounded by the grace periods).
+
+        Returns:
+            {pid: phase label that reaped it, or "survived"}
+        """
+        groups = self._group_leaders(pids)
+        known = {}
+        reaped = {}
+        alive = []
+        for label, sig, grace in self.phases():
+            for pid in pids:
+                for proc in self._tree(pid):
+                    if proc.pid not in known and proc.pid not in reaped:
+                        known[proc.pid] = proc
+                        alive.append(proc)
+            if not alive:
+                break
+            for proc in alive:
+                try:
+                    if groups and os.getpgid(proc.pid) in groups:
+                        continue  # Signalled once below with its group; twice would force-exit servers
+                    if label == "KILL":
+                        proc.kill()
+                    elif label == "CTRL_BREAK" and proc.pid not in pids:
+                        continue  # The console event reaches the whole group through the root
+                    else:
+                        proc.send_signal(sig)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                    pass
+            for pgid in groups:
+                try:
+                    os.killpg(pgid, sig)
+                except OSError:
+                    pass
+            gone, alive = psutil.wait_procs(alive, timeout=grace)
+            # Orphans already dead but not yet reaped by their new parent count as stopped
+            gone += [proc for proc in alive if self._is_zombie(proc)]
+            alive = [proc for proc in alive if proc not in gone]
+            for proc in gone:
+                reaped[proc.pid] = label
+        for proc in alive:
+            reaped[proc.pid] = "survived"
+        return reaped
+
+    def stop_async(self, pids: List[int], callback) -> threading.Thread:
+        """Stop the trees in a worker thread, then call callback(reaped) from that thread."""
+        thread = threading.Thread(target=lambda: callback(self.stop(pids)), daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def format_report(reaped: Dict[int, str]) -> str:
+        """Format the reaped PIDs for the log."""
+        return ", ".join(f"{pid} ({label})" for pid, label in sorted(reaped.items())) or "nessun processo"
+
+
+def parse_cpu_list(value) -> List[int]:
+    """Parse a CPU list given as [0, 1] or as a string like "0-3,6"."""
+    if isinstance(value, (list, tuple)):
+        return sorted({int(cpu) for cpu in value})
+    cpus = set()
+    for part in str(value).split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    """Format a CPU list compactly ("0-3,6")."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+class ResourceLimits:
+    """
+    Per-file resource settings applied when the file is launched.
+
+    Settings (the "resources" key of a file in the config):
+        cpu_affinity: CPUs to pin to, [0, 1] or "0-3,6"
+        nice: Scheduling priority (-20..19)
+        ionice: "idle", "best-effort" or "realtime" (Linux), optionally "best-effort:7"
+        memory_mb: Address-space limit (RLIMIT_AS); also memory.max in the cgroup
+        max_open_files: Open file descriptors limit (RLIMIT_NOFILE)
+        cgroup: cgroup v2 to place the process in (path or name under /sys/fs/cgroup)
+
+    Only the rlimits are set in the child before exec (preexec_fn), so every
+    descendant inherits them; a failure there is reported on the child's
+    stderr and the launch goes on. Affinity, nice, ionice and the cgroup
+    placement are applied from the launcher with psutil right after launch,
+    returning warnings instead of aborting the launch.
+
+    Impostazioni di risorse per file applicate all'avvio.
+    """
+
+    CGROUP_ROOT = "/sys/fs/cgroup"
+    IONICE_CLASSES = {"idle": "IOPRIO_CLASS_IDLE", "best-effort": "IOPRIO_CLASS_BE", "realtime": "IOPRIO_CLASS_RT"}
+
+    def __init__(self, settings: Optional[Dict] = None):
+        """
+        Initialize from the settings dictionary.
+
+        Raises:
+            ValueError: If a setting is not valid
+        """
+        settings = settings or {}
+        self.cpus = parse_cpu_list(settings["cpu_affinity"]) if settings.get("cpu_affinity") not in (None, "", []) else []
+        self.nice = int(settings["nice"]) if settings.get("nice") is not None else None
+        self.ionice = settings.get("ionice")
+        if self.ionice and self.ionice.split(":")[0] not in self.IONICE_CLASSES:
+            raise ValueError(f"Classe ionice non valida: {self.ionice}")
+        self.memory_mb = int(settings["memory_mb"]) if settings.get("memory_mb") else None
+        self.max_open_files = int(settings["max_open_files"]) if settings.get("max_open_files") else None
+        cgroup = settings.get("cgroup")
+        self.cgroup = (cgroup if os.path.isabs(cgroup) else os.path.join(self.CGROUP_ROOT, cgroup)) if cgroup else None
+
+    def is_empty(self) -> bool:
+        """Return True if no setting is configured."""
+        return not (self.cpus or self.nice is not None or self.ionice or self.memory_mb
+                    or self.max_open_files or self.cgroup)
+
+    @classmethod
+    def cgroup_available(cls) -> bool:
+        """Return True if the unified cgroup v2 hierarchy is mounted."""
+        return os.path.exists(os.path.join(cls.CGROUP_ROOT, "cgroup.controllers"))
+
+    def prepare_cgroup(self) -> Optional[str]:
+        """
+        Create the cgroup if needed and set memory.max.
+
+        Returns:
+            The cgroup.procs file to write the child into, or None if unavailable
+        """
+        if not self.cgroup or not self.cgroup_available():
+            return None
+        try:
+            os.makedirs(self.cgroup, exist_ok=True)
+            if self.memory_mb:
+                with open(os.path.join(self.cgroup, "memory.max"), "w") as f:
+                    f.write(str(self.memory_mb * 1024 * 1024))
+        except OSError:
+            pass  # memory controller may not be delegated; placement can still work
+        procs = os.path.join(self.cgroup, "cgroup.procs")
+        return procs if os.access(procs, os.W_OK) else None
+
+    def preexec_fn(self):
+        """Return the function setting the rlimits in the child (POSIX), or None."""
+        if os.name == "nt" or not (self.memory_mb or self.max_open_files):
+            return None
+        import resource
+        memory_mb, max_open_files = self.memory_mb, self.max_open_files
+
+        def apply():
+            # Runs between fork and exec: no logging, failures go to the child's stderr
+            try:
+                if memory_mb:
+                    limit = memory_mb * 1024 * 1024
+                    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+                if max_open_files:
+                    hard = resource.getrlimit(resource.RLIMIT_NOFILE)[1]
+                    soft = max_open_files if hard == resource.RLIM_INFINITY else min(max_open_files, hard)
+                    resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+            except (OSError, ValueError) as e:
+                os.write(2, f"Risorse: limite non applicato: {e}\n".encode())
+        return apply
+
+    def valid_cpus(self) -> Tuple[List[int], List[str]]:
+        """Return (the configured CPUs the launcher may use, warnings), checked in the launcher."""
+        if not self.cpus:
+            return [], []
+        try:
+            allowed = set(psutil.Process().cpu_affinity())
+        except (AttributeError, psutil.Error, OSError):
+            return self.cpus, []  # Affinity not supported: reported when applied
+        cpus = [cpu for cpu in self.cpus if cpu in allowed]
+        excluded = [cpu for cpu in self.cpus if cpu not in allowed]
+        warnings = [f"CPU {format_cpu_list(excluded)} non disponibili (consentite: {format_cpu_list(sorted(allowed))})"] \
+            if excluded else []
+        return cpus, warnings
+
+    def apply_after_launch(self, pid: int, cgroup_procs: Optional[str] = None) -> List[str]:
+        """
+        Apply affinity, nice, ionice and the cgroup to a launched process with psutil.
+
+        Every setting is applied independently; the ones failing (missing
+        privileges, unavailable CPUs) are returned as warnings for the log.
+        """
+        warnings = []
+        try:
+            proc = psutil.Process(pid)
+        except psutil.NoSuchProcess as e:
+            return [str(e)]
+
+        def attempt(label: str, func):
+            try:
+                func()
+            except (psutil.AccessDenied, PermissionError):
+                warnings.append(f"{label}: permesso negato")
+            except (psutil.Error, ValueError, OSError, AttributeError) as e:
+                warnings.append(f"{label}: {e}")
+
+        if cgroup_procs:
+            def place():
+                with open(cgroup_procs, "w") as f:
+                    f.write(str(pid))
+            attempt("cgroup", place)
+        cpus, cpu_warnings = self.valid_cpus()
+        warnings += cpu_warnings
+        if cpus:
+            attempt("affinità CPU", lambda: proc.cpu_affinity(cpus))
+        if self.nice is not None:
+            if os.name == "nt":  # Windows: priority classes
+                value = (psutil.IDLE_PRIORITY_CLASS if self.nice >= 15 else
+                         psutil.BELOW_NORMAL_PRIORITY_CLASS if self.nice > 0 else
+                         psutil.NORMAL_PRIORITY_CLASS if self.nice == 0 else psutil.HIGH_PRIORITY_CLASS)
+            else:
+                value = self.nice
+            attempt(f"nice {self.nice}", lambda: proc.nice(value))
+        if self.ionice:
+            if hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+                io_class, _, level = self.ionice.partition(":")
+                attempt("ionice", lambda: proc.ionice(getattr(psutil, self.IONICE_CLASSES[io_class]),
+                                                      int(level) if level else None))
+            else:
+                warnings.append("ionice non supportato su questa piattaforma")
+        if os.name == "nt" and (self.memory_mb or self.max_open_files or self.cgroup):
+            warnings.append("limiti di memoria/file e cgroup non supportati su Windows")
+        return warnings
+
+    def describe(self) -> str:
+        """Return a one-line summary for the file widget."""
+        parts = []
+        if self.cpus:
+            parts.append(f"CPU {format_cpu_list(self.cpus)}")
+        if self.nice is not None:
+            parts.append(f"nice {self.nice}")
+        if self.ionice:
+            parts.append(f"io {self.ionice}")
+        if self.memory_mb:
+            parts.append(f"mem {format_bytes(self.memory_mb * 1024 * 1024)}")
+        if self.max_open_files:
+            parts.append(f"fd {self.max_open_files}")
+        if self.cgroup:
+            parts.append(f"cgroup {os.path.relpath(self.cgroup, self.CGROUP_ROOT)}")
+        return " · ".join(parts)
+
+
+def is_app_service(proc):
+    """Determine if a process is an application service (not system service)."""
+    name = proc['name'].lower()
+    cmdline = proc['cmdline'].lower()
+    port = proc['port']
+
+    # Exclude known system services
+    system_services = ['nahimic', 'norton', 'antivirus', 'defender', 'windows',
+                      'svchost', 'system', 'idle', 'csrss', 'smss', 'lsass']
+    if any(s in name for s in system_services):
+        return False
+
+    # Include development servers
+    dev_servers = ['uvicorn', 'fastapi', 'flask', 'django', 'gunicorn',
+                  'node', 'npm', 'yarn', 'express', 'next', 'react']
+    if any(s in cmdline for s in dev_servers):
+        return True
+
+    # Include common development ports
+    if 3000 <= port <= 9999:
+        return True
+
+    # Include Python/Node processes with server/app indicators
+    if ('python' in name or 'node' in name or 'ollama' in name or 'studio' in name) and \
+       ('server' in cmdline or 'app' in cmdline or 'api' in cmdline or 'main' in cmdline):
+        return True
+
+    # Include databases if they seem user-started (not system)
+    if port in [3306, 5432, 27017, 6379] and 'service' not in cmdline:
+        return True
+
+    return False
+
+
+class LoadTester:
+    """
+    HTTP/1.1 load generator for a local service.
+
+    `concurrency` asyncio workers each keep one keep-alive connection (the
+    pool) and send requests back to back for `duration` seconds or until
+    `total_requests` are done. Latencies go to a LatencyHistogram; CPU and
+    RSS of the target process tree are sampled with psutil meanwhile.
+    """
+
+    def __init__(self, host: str, port: int, path: str = "/", method: str = "GET", concurrency: int = 10,
+                 duration: float = 10.0, total_requests: Optional[int] = None, timeout: float = 5.0,
+                 body: bytes = b"", headers: Optional[Dict[str, str]] = None, pid: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.path = path if path.startswith("/") else "/" + path
+        self.method = method.upper()
+        self.concurrency = max(1, concurrency)
+        self.duration = duration
+        self.total_requests = total_requests
+        self.timeout = timeout
+        self.pid = pid
+        # IPv6 literals are bracketed in the Host header ([::1]:8000)
+        authority = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+        request_headers = {"Host": authority, "User-Agent": "universal-starter-loadtest",
+                           "Accept": "*/*", "Connection": "keep-alive"}
+        if body or self.method in ("POST", "PUT", "PATCH"):
+            request_headers["Content-Length"] = str(len(body))
+        request_headers.update(headers or {})
+        head = f"{self.method} {self.path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items())
+        # The request bytes are built once and reused on every connection
+        self.request = (head + "\r\n").encode("latin-1") + body
+        self.histogram = LatencyHistogram()
+        self.statuses: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.completed = 0
+        self.connections = 0
+        self.bytes_received = 0
+        self.cpu_samples: List[float] = []
+        self.max_rss = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._issued = 0
+
+    def stop(self):
+        """Ask a running test to stop early."""
+        self._stop.set()
+
+    # --- HTTP/1.1 client ---
+
+    async def _connect(self):
+        self.connections += 1
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+
+    async def _read_response(self, reader) -> Tuple[int, bool]:
+        """Read one response; return (status, keep connection open)."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        status = int(parts[1])
+        keep_alive = parts[0] != "HTTP/1.0"
+        length = None
+        chunked = False
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            key = key.strip().lower()
+            value = value.strip().lower()
+            if key == "content-length":
+                length = int(value)
+            elif key == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif key == "connection":
+                keep_alive = value == "keep-alive" or (keep_alive and value != "close")
+        received = len(head)
+        if self.method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            pass
+        elif chunked:
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";")[0], 16)
+                await reader.readexactly(size + 2)
+                received += len(size_line) + size + 2
+                if size == 0:
+                    # Trailers end with an empty line (already consumed when absent)
+                    break
+        elif length is not None:
+            await reader.readexactly(length)
+            received += length
+        else:
+            # Body delimited by connection close
+            received += len(await reader.read())
+            keep_alive = False
+        self.bytes_received += received
+        return status, keep_alive
+
+    def _next_request(self) -> bool:
+        """Reserve the next request; False when the test is over."""
+        if self._stop.is_set():
+            return False
+        if self.total_requests is not None:
+            if self._issued >= self.total_requests:
+                return False
+        elif time.perf_counter() - self.started >= self.duration:
+            return False
+        self._issued += 1
+        return True
+
+    async def _worker(self):
+        reader = writer = None
+        while self._next_request():
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await self._connect()
+                writer.write(self.request)
+                status, keep_alive = await asyncio.wait_for(self._read_response(reader), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    ValueError, IndexError) as e:
+                kind = "timeout" if isinstance(e, asyncio.TimeoutError) else type(e).__name__
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+                if writer is not None:
+                    writer.close()
+                else:
+                    # Connection refused: back off instead of spinning
+                    await asyncio.sleep(0.05)
+                reader = writer = None
+                continue
+            self.histogram.record(time.perf_counter() - start)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.completed += 1
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    # --- Resource sampling ---
+
+    def _sample_resources(self, processes: Dict[int, "psutil.Process"]):
+        """Add one CPU% (sum over the tree) and RSS sample of the target."""
+        if not self.pid:
+            return
+        for pid in process_tree_pids(self.pid):
+            if pid not in processes:
+                try:
+                    processes[pid] = psutil.Process(pid)
+                    processes[pid].cpu_percent(None)  # First call only primes the counter
+                except psutil.Error:
+                    pass
+        cpu = rss = 0.0
+        for pid, process in list(processes.items()):
+            try:
+                cpu += process.cpu_percent(None)
+                rss += process.memory_info().rss
+            except psutil.Error:
+                processes.pop(pid)
+        self.cpu_samples.append(cpu)
+        self.max_rss = max(self.max_rss, int(rss))
+
+    async def _monitor(self, progress, interval: float = 0.5):
+        processes: Dict[int, psutil.Process] = {}
+        self._sample_resources(processes)
+        self.cpu_samples.clear()
+        while True:
+            await asyncio.sleep(interval)
+            self._sample_resources(processes)
+            if progress:
+                progress(self.report())
+
+    async def _run(self, progress=None):
+        self.started = time.perf_counter()
+        monitor = asyncio.ensure_future(self._monitor(progress))
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        finally:
+            monitor.cancel()
+            self.elapsed = time.perf_counter() - self.started
+
+    def run(self, progress=None) -> Dict:
+        """
+        Run the test in the calling thread (use a worker thread from the GUI).
+
+        Args:
+            progress: Optional callback receiving report() about twice per second
+        """
+        asyncio.run(self._run(progress))
+        return self.report()
+
+    def report(self) -> Dict:
+        """Return throughput, error rate, latency percentiles and resource usage so far."""
+        elapsed = self.elapsed or (time.perf_counter() - self.started if self.started else 0.0)
+        failed = sum(self.errors.values()) + sum(n for status, n in self.statuses.items() if status >= 500)
+        attempts = self.completed + sum(self.errors.values())
+        p50, p90, p99 = self.histogram.percentiles((0.5, 0.9, 0.99))
+        return {
+            "elapsed": elapsed,
+            "requests": self.completed,
+            "rps": self.completed / elapsed if elapsed else 0.0,
+            "error_rate": failed / attempts if attempts else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(self.errors),
+            "p50": p50, "p90": p90, "p99": p99,
+            "connections": self.connections,
+            "mb_received": self.bytes_received / 1024 / 1024,
+            "cpu_avg": sum(self.cpu_samples) / len(self.cpu_samples) if self.cpu_samples else None,
+            "cpu_max": max(self.cpu_samples) if self.cpu_samples else None,
+            "rss_max_mb": self.max_rss / 1024 / 1024 if self.max_rss else None,
+        }
+
+    @staticmethod
+    def format_report(report: Dict) -> str:
+        """Return a report as text for the GUI."""
+        lines = [
+            f"Durata:        {report['elapsed']:.1f} s",
+            f"Richieste:     {report['requests']}  ({report['rps']:.1f} req/s)",
+            f"Errori:        {report['error_rate']:.2%}",
+            f"Latenza:       p50 {format_latency(report['p50'])} · p90 {format_latency(report['p90'])}"
+            f" · p99 {format_latency(report['p99'])}",
+            f"Connessioni:   {report['connections']}  ({report['mb_received']:.1f} MB ricevuti)",
+        ]
+        if report["statuses"]:
+            lines.append("Codici:        " + ", ".join(f"{s}×{n}" for s, n in report["statuses"].items()))
+        if report["errors"]:
+            lines.append("Eccezioni:     " + ", ".join(f"{k}×{n}" for k, n in report["errors"].items()))
+        if report["cpu_avg"] is not None:
+            lines.append(f"Servizio:      CPU media {report['cpu_avg']:.0f}% (max {report['cpu_max']:.0f}%)"
+                         f" · RSS max {report['rss_max_mb']:.0f} MB")
+        return "\n".join(lines) + "\n"
+
+
+# Launch wrapper of ServiceProfiler: runs the service (script or module) in the same
+# interpreter and profiles it for a number of seconds. argv: config JSON, launch type, target, args
+PROFILER_WRAPPER_SCRIPT = r"""
+import atexit, collections, json, os, runpy, signal, sys, threading
+
+config = json.loads(sys.argv[1])
+launch_type, target = sys.argv[2], sys.argv[3]
+sys.argv = [target] + sys.argv[4:]
+output, seconds, mode = config["output"], config["seconds"], config["mode"]
+done = threading.Event()
+main_id = threading.main_thread().ident
+own_threads = set()
+
+def write(data):
+    with open(output + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(output + ".tmp", output)
+
+if mode == "cprofile":
+    import cProfile, marshal
+    profiler = cProfile.Profile()
+
+    def finish(*_):
+        if done.is_set():
+            return
+        done.set()
+        profiler.disable()
+        profiler.create_stats()
+        write(marshal.dumps(profiler.stats))
+
+    if hasattr(signal, "pthread_kill") and hasattr(signal, "SIGUSR2"):
+        # The profiler must be disabled by the thread it profiles
+        signal.signal(signal.SIGUSR2, finish)
+        timer = threading.Timer(seconds, signal.pthread_kill, (main_id, signal.SIGUSR2))
+    else:
+        timer = threading.Timer(seconds, finish)
+else:
+    stacks = collections.Counter()
+    labels = {}
+    skip = {"<string>", "<frozen runpy>", os.path.abspath(runpy.__file__)}
+
+    def label(code):
+        text = labels.get(code)
+        if text is None:
+            text = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return text
+
+    def sample(thread_id, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename not in skip:
+                stack.append(label(code))
+            frame = frame.f_back
+        if stack:
+            stacks[";".join(reversed(stack))] += 1
+
+    use_signal = config.get("sampler") == "signal" and hasattr(signal, "setitimer")
+
+    def finish(*_):
+        if done.is_set():
+            return
+        done.set()
+        if use_signal:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+        write("".join(f"{stack} {count}\n" for stack, count in list(stacks.items())).encode("utf-8"))
+
+    interval = config.get("interval", 0.005)
+    if use_signal:
+        # CPU-time timer: samples the main thread while it runs Python code
+        def on_timer(signum, frame):
+            if not done.is_set():
+                sample(main_id, frame)
+        signal.signal(signal.SIGPROF, on_timer)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    else:
+        # Wall-clock sampler thread: all threads, running or waiting
+        def sampler():
+            own_threads.add(threading.get_ident())
+            while not done.wait(interval):
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id not in own_threads:
+                        sample(thread_id, frame)
+        threading.Thread(target=sampler, daemon=True).start()
+    timer = threading.Timer(seconds, finish)
+
+timer.daemon = True
+timer.start()
+own_threads.add(timer.ident)
+atexit.register(finish)
+if mode == "cprofile":
+    profiler.enable()
+if launch_type == "module":
+    runpy.run_module(target, run_name="__main__", alter_sys=True)
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(target)))
+    runpy.run_path(target, run_name="__main__")
+"""
+
+
+def python_wrapper_command(script: str, python_launcher: List[str], interpreter_flags: List[str],
+                           launch_type: str, target: str, args: List[str], config: Dict) -> List[str]:
+    """Return the command running a script or module through a launch wrapper (-c script, config JSON)."""
+    return python_launcher + interpreter_flags + ["-c", script, json.dumps(config), launch_type, target] + args
+
+
+class StackProfile:
+    """
+    Result of a profiling run: collapsed stacks (sampler, py-spy) or pstats (cProfile).
+
+    Collapsed stacks are lines "outer;...;inner count", the format written by
+    py-spy --format raw and by PROFILER_WRAPPER_SCRIPT.
+    """
+
+    def __init__(self, stacks: Optional[Dict[Tuple[str, ...], float]] = None,
+                 functions: Optional[List[Dict]] = None, unit: str = "campioni"):
+        self.stacks = stacks or {}
+        self._functions = functions
+        self.unit = unit
+
+    @classmethod
+    def from_collapsed(cls, text: str) -> "StackProfile":
+        """Parse collapsed stack lines."""
+        stacks: Dict[Tuple[str, ...], float] = {}
+        for line in text.splitlines():
+            stack, _, count = line.rpartition(" ")
+            if not stack:
+                continue
+            try:
+                value = float(count)
+            except ValueError:
+                continue
+            key = tuple(stack.split(";"))
+            stacks[key] = stacks.get(key, 0) + value
+        return cls(stacks)
+
+    @classmethod
+    def from_pstats(cls, path: str) -> "StackProfile":
+        """Read a cProfile dump: functions only, times in seconds."""
+        import pstats
+        stats = pstats.Stats(path).stats
+        functions = []
+        for (filename, line, name), (_, calls, self_time, total_time, _) in stats.items():
+            label = f"{name} ({os.path.basename(filename)}:{line})" if line else name
+            functions.append({"name": label, "self": self_time, "total": total_time, "calls": calls})
+        return cls(functions=functions, unit="s")
+
+    @classmethod
+    def load(cls, path: str) -> "StackProfile":
+        """Load a profile written by ServiceProfiler (.prof = cProfile, else collapsed stacks)."""
+        if path.endswith(".prof"):
+            return cls.from_pstats(path)
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return cls.from_collapsed(f.read())
+
+    @property
+    def total(self) -> float:
+        """Total samples (stacks) or profiled seconds (cProfile, top-level)."""
+        if self.stacks:
+            return sum(self.stacks.values())
+        return max((f["total"] for f in self._functions or []), default=0.0)
+
+    def top_functions(self, limit: int = 50) -> List[Dict]:
+        """Return the functions with most self time: name, self, total (and calls for cProfile)."""
+        if self._functions is not None:
+            functions = self._functions
+        else:
+            self_counts: Dict[str, float] = {}
+            total_counts: Dict[str, float] = {}
+            for stack, count in self.stacks.items():
+                self_counts[stack[-1]] = self_counts.get(stack[-1], 0) + count
+                for name in set(stack):  # Recursion counts once per stack
+                    total_counts[name] = total_counts.get(name, 0) + count
+            functions = [{"name": name, "self": self_counts.get(name, 0), "total": total}
+                         for name, total in total_counts.items()]
+        return sorted(functions, key=lambda f: (f["self"], f["total"]), reverse=True)[:limit]
+
+    def flame_tree(self) -> Dict:
+        """Return the stacks merged into a tree of {"name", "value", "children": {name: node}}."""
+        root = {"name": "all", "value": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            node = root
+            node["value"] += count
+            for name in stack:
+                child = node["children"].get(name)
+                if child is None:
+                    child = node["children"][name] = {"name": name, "value": 0, "children": {}}
+                child["value"] += count
+                node = child
+        return root
+
+
+class ServiceProfiler:
+    """Build the commands profiling a launched service: py-spy attach or relaunch through the wrapper."""
+
+    MODES = {
+        "py-spy": "py-spy (collega al processo)",
+        "sampler": "Campionatore (riavvia)",
+        "cprofile": "cProfile (riavvia)",
+    }
+
+    def __init__(self, results_dir: str = "profiles_STARTER_GUI"):
+        self.results_dir = results_dir
+
+    @staticmethod
+    def find_py_spy(bin_dirs: Optional[List[str]] = None) -> Optional[str]:
+        """Return the py-spy executable of the environment or of the PATH."""
+        search = os.pathsep.join((bin_dirs or []) + [os.environ.get("PATH", "")])
+        return shutil.which("py-spy", path=search)
+
+    def output_path(self, name: str, mode: str) -> str:
+        """Return a new result file for a service."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = ".prof" if mode == "cprofile" else ".txt"
+        safe_name = re.sub(r"[^\w.#-]", "_", name)
+        return os.path.abspath(os.path.join(self.results_dir, f"{safe_name}-{stamp}{suffix}"))
+
+    @staticmethod
+    def py_spy_command(py_spy: str, pid: int, seconds: float, output: str, rate: int = 200) -> List[str]:
+        """Return the py-spy command recording collapsed stacks of a process tree."""
+        return [py_spy, "record", "--pid", str(pid), "--duration", str(int(max(1, seconds))), "--rate", str(rate),
+                "--format", "raw", "--subprocesses", "--nonblocking", "--output", output]
+
+    @staticmethod
+    def wrap_command(python_launcher: List[str], interpreter_flags: List[str], launch_type: str, target: str,
+                     args: List[str], mode: str, seconds: float, output: str) -> List[str]:
+        """
+        Return the command relaunching a Python service under the profiling wrapper.
+
+        Args:
+            mode: "sampler" or "cprofile"
+            launch_type: "script" or "module" (entry points are passed as their script path)
+        """
+        config = {"mode": mode, "seconds": seconds, "output": output,
+                  "sampler": "signal" if hasattr(signal, "setitimer") else "thread"}
+        return python_wrapper_command(PROFILER_WRAPPER_SCRIPT, python_launcher, interpreter_flags, launch_type,
+                                      target, args, config)
+
+
+# Launch wrapper of the tracemalloc mode: runs the service (script or module) with
+# tracemalloc enabled and sends snapshot diffs to MemoryTraceServer as JSON lines.
+# argv: config JSON, launch type, target, args
+TRACEMALLOC_WRAPPER_SCRIPT = r"""
+import json, os, runpy, socket, sys, threading, time, tracemalloc
+
+config = json.loads(sys.argv[1])
+launch_type, target = sys.argv[2], sys.argv[3]
+sys.argv = [target] + sys.argv[4:]
+# The token comes from the environment, not argv (visible to every user in ps)
+token = os.environ.pop("STARTER_TRACE_TOKEN", "")
+tracemalloc.start(config.get("frames", 1))
+ignored = [tracemalloc.Filter(False, pattern) for pattern in (
+    tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<string>")]
+
+def reporter():
+    try:
+        conn = socket.create_connection(("127.0.0.1", config["port"]), timeout=5)
+    except OSError:
+        return
+    def send(message):
+        conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+    baseline = previous = None
+    try:
+        send({"hello": token, "service": config["service"], "pid": os.getpid()})
+        while True:
+            time.sleep(config["interval"])
+            snapshot = tracemalloc.take_snapshot().filter_traces(ignored)
+            if baseline is None:
+                baseline = snapshot
+            recent = {}
+            if previous is not None:
+                for stat in snapshot.compare_to(previous, "lineno"):
+                    recent[stat.traceback[0]] = stat.size_diff
+            stats = sorted(snapshot.compare_to(baseline, "lineno"), key=lambda s: s.size_diff, reverse=True)
+            current, peak = tracemalloc.get_traced_memory()
+            send({"time": time.time(), "current": current, "peak": peak, "traces": len(snapshot.traces),
+                  "top": [{"site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "size": s.size,
+                           "size_diff": s.size_diff, "count": s.count, "count_diff": s.count_diff,
+                           "recent_diff": recent.get(s.traceback[0], 0)} for s in stats[:config.get("top", 30)]]})
+            previous = snapshot
+    except OSError:
+        pass  # Launcher closed
+
+threading.Thread(target=reporter, daemon=True).start()
+if launch_type == "module":
+    runpy.run_module(target, run_name="__main__", alter_sys=True)
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(target)))
+    runpy.run_path(target, run_name="__main__")
+"""
+
+
+class MemoryTraceServer:
+    """
+    Local TCP endpoint receiving the tracemalloc reports of the launched services.
+
+    Services connect to 127.0.0.1:<port> and authenticate with a random
+    token passed in their environment (TOKEN_ENV), never on the command line. The last report and a
+    bounded history of traced memory are kept per service.
+    """
+
+    def __init__(self, history: int = 720):
+        self.token = secrets.token_hex(16)
+        self.history_size = history
+        self.reports: Dict[str, Dict] = {}
+        self.history: Dict[str, collections.deque] = {}
+        self.lock = threading.Lock()
+        self.port: Optional[int] = None
+        self._socket: Optional[socket.socket] = None
+
+    def start(self) -> int:
+        """Start listening (once) and return the port."""
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.bind(("127.0.0.1", 0))
+            self._socket.listen(16)
+            self.port = self._socket.getsockname()[1]
+            threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.port
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return  # Closed
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        with conn, conn.makefile("r", encoding="utf-8") as stream:
+            try:
+                hello = json.loads(stream.readline() or "{}")
+                if hello.get("hello") != self.token:
+                    return
+                service = hello["service"]
+                with self.lock:
+                    # A restarted service starts a new history
+                    self.history[service] = collections.deque(maxlen=self.history_size)
+                    self.reports.pop(service, None)
+                for line in stream:
+                    report = json.loads(line)
+                    report["pid"] = hello.get("pid")
+                    with self.lock:
+                        self.reports[service] = report
+                        self.history[service].append((report["time"], report["current"]))
+            except (OSError, ValueError, KeyError):
+                pass
+
+    TOKEN_ENV = "STARTER_TRACE_TOKEN"
+
+    def config(self, service: str, interval: float = 10.0, top: int = 30, frames: int = 1) -> Dict:
+        """Return the wrapper configuration for a service (passed on the command line: no secrets)."""
+        return {"port": self.start(), "service": service, "interval": interval, "top": top, "frames": frames}
+
+    def environment(self) -> Dict[str, str]:
+        """Return the variables authenticating the wrapper to this endpoint."""
+        return {self.TOKEN_ENV: self.token}
+
+    def report(self, service: str) -> Optional[Dict]:
+        """Return the last report of a service."""
+        with self.lock:
+            return self.reports.get(service)
+
+    def growth_rate(self, service: str) -> Optional[float]:
+        """Return the traced memory trend in bytes/hour (least squares over the history)."""
+        with self.lock:
+            points = list(self.history.get(service, ()))
+        if len(points) < 3:
+            return None
+        t0 = points[0][0]
+        xs = [t - t0 for t, _ in points]
+        ys = [v for _, v in points]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        if not variance:
+            return None
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+        return slope * 3600
+
+    def close(self):
+        """Stop accepting reports."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class FileWatcher:
+    """
+    Watches directory trees and reports the changed source files in debounced batches.
+
+    On Linux the kernel reports the changes through inotify (called with
+    ctypes, one watch per directory; directories created later are added as
+    they appear). Elsewhere, or when inotify is unavailable (no libc, watch
+    limit reached), the trees are polled comparing mtime and size. Changes
+    are collected until the trees stay quiet for `debounce` seconds, and at
+    most `max_delay` seconds after the first one, so an editor saving several
+    files or a git checkout produce a single callback(paths) from the
+    watcher thread.
+    """
+
+    # Directories and files never watched (globs on each path component)
+    IGNORE = ("__pycache__", ".git", ".hg", ".svn", ".venv", ".venvs", "venv", "node_modules", ".mypy_cache",
+              ".pytest_cache", ".tox", "logs", "profiles_STARTER_GUI", "benchmarks_STARTER_GUI",
+              "*.pyc", "*.pyo", "*.swp", "*.swx", "*~", ".#*", "#*#")
+    PATTERNS = ("*.py",)
+
+    # linux/inotify.h
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: List[str], callback, patterns: Optional[List[str]] = None,
+                 ignore: Optional[List[str]] = None, debounce: float = 0.2, max_delay: float = 1.0,
+                 poll_interval: float = 0.5, backend: Optional[str] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            roots: Directories watched recursively
+            callback: Called with the sorted list of changed paths
+            patterns: File name globs reported (default: PATTERNS)
+            ignore: Path component globs skipped (default: IGNORE)
+            debounce: Quiet seconds closing a batch
+            max_delay: Maximum seconds between the first change and the callback
+            poll_interval: Seconds between two scans of the polling backend
+            backend: "inotify" or "poll" (default: inotify on Linux)
+        """
+        self.roots = sorted({os.path.abspath(root) for root in roots})
+        self.callback = callback
+        self.patterns = tuple(patterns or self.PATTERNS)
+        self.ignore = tuple(self.IGNORE if ignore is None else ignore)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.backend = backend or ("inotify" if sys.platform.startswith("linux") else "poll")
+        self.error: Optional[str] = None  # Why inotify was not used
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+        self._libc = None
+        self._watches: Dict[int, str] = {}
+        self._state: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def filter_path(path: str, roots: List[str], patterns, ignore) -> bool:
+        """Return True if path is under one of roots, matches patterns and no component matches ignore."""
+        for root in roots:
+            if path.startswith(root.rstrip(os.sep) + os.sep):
+                relative = path[len(root.rstrip(os.sep)) + 1:]
+                break
+        else:
+            return False
+        parts = relative.split(os.sep)
+        if any(fnmatch.fnmatch(part, glob) for part in parts for glob in ignore):
+            return False
+        if any(fnmatch.fnmatch(relative, glob) for glob in ignore):
+            return False
+        return any(fnmatch.fnmatch(parts[-1], glob) for glob in patterns)
+
+    def matches(self, path: str) -> bool:
+        """Return True if a change of path is reported."""
+        return self.filter_path(path, self.roots, self.patterns, self.ignore)
+
+    def _walk(self, root: str) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (directory, file names) of a tree, skipping the ignored directories."""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not any(fnmatch.fnmatch(d, glob) for glob in self.ignore)]
+            yield dirpath, filenames
+
+    def start(self) -> "FileWatcher":
+        """Start the watcher thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the watcher thread (it exits within half a second)."""
+        self._stop.set()
+
+    # --- inotify backend ---
+
+    def _inotify_start(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._libc, self._fd = libc, fd
+        try:
+            for root in self.roots:
+                self._add_tree(root)
+        except OSError:
+            self._inotify_close()
+            raise
+
+    def _add_tree(self, root: str) -> List[str]:
+        """Watch every directory of a tree; return its matching files."""
+        found = []
+        for dirpath, filenames in self._walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno == 28:  # ENOSPC: fs.inotify.max_user_watches reached
+                    raise OSError(errno, "limite di inotify raggiunto (fs.inotify.max_user_watches)")
+                continue  # Vanished or unreadable directory
+            self._watches[wd] = dirpath
+            found += [path for path in (os.path.join(dirpath, name) for name in filenames) if self.matches(path)]
+        return found
+
+    def _inotify_close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
+
+    def _read_inotify(self, timeout: float) -> List[str]:
+        """Wait up to timeout for events and return the changed paths."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset + self.EVENT.size <= len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                changed += self.roots  # Events lost: everything may have changed
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not any(
+                        fnmatch.fnmatch(os.path.basename(path), glob) for glob in self.ignore):
+                    try:
+                        changed += self._add_tree(path)  # Files moved in with the directory
+                    except OSError:
+                        pass
+                continue
+            if mask & self.IN_CREATE:
+                continue  # The content follows with IN_CLOSE_WRITE
+            if self.matches(path):
+                changed.append(path)
+        return changed
+
+    # --- polling backend ---
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} of the matching files."""
+        state = {}
+        for root in self.roots:
+            for dirpath, filenames in self._walk(root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if self.matches(path):
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def _read_poll(self, timeout: float) -> List[str]:
+        """Sleep up to timeout, rescan and return the changed paths."""
+        if self._stop.wait(min(timeout, self.poll_interval)):
+            return []
+        state = self._snapshot()
+        changed = [path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)]
+        self._state = state
+        return changed
+
+    def _run(self):
+        if self.backend == "inotify":
+            try:
+                self._inotify_start()
+            except (OSError, AttributeError) as e:
+                self.error = str(e)
+                self.backend = "poll"
+        if self.backend == "poll":
+            self._state = self._snapshot()
+        read = self._read_inotify if self.backend == "inotify" else self._read_poll
+        pending = set()
+        first = last = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                timeout = 0.5
+                if pending:
+                    timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - now)
+                changed = read(timeout)
+                now = time.monotonic()
+                if changed:
+                    if not pending:
+                        first = now
+                    last = now
+                    pending.update(changed)
+                if pending and now >= min(last + self.debounce, first + self.max_delay):
+                    batch, pending = sorted(pending), set()
+                    try:
+                        self.callback(batch)
+                    except Exception as e:
+                        log_queue.put(f"Errore hot reload: {e}\n")
+        finally:
+            self._inotify_close()
+
+
+class ProcessViewer(ctk.CTkToplevel):
+    """
+    Window for viewing and managing localhost processes.
+
+    A background thread rescans every second and pushes only the differences;
+    the table updates the changed rows instead of being rebuilt.
+    """
+
+    COLUMNS = [
+        ("ports", "Porte", 100),
+        ("addresses", "Indirizzi", 130),
+        ("pid", "PID", 70),
+        ("name", "Nome", 140),
+        ("cmdline", "Comando", 340),
+    ]
+    REFRESH_INTERVAL = 1.0
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.title("Processi Localhost")
+        self.geometry("800x600")
+
+        # Make window modal
+        self.transient(parent)
+        self.grab_set()
+
+        # Filter controls
+        filter_frame = ctk.CTkFrame(self)
+        filter_frame.pack(pady=5, padx=10, fill="x")
+
+        self.show_app_only = ctk.BooleanVar(value=True)
+        app_filter_cb = ctk.CTkCheckBox(filter_frame, text="Mostra solo servizi app",
+                                       variable=self.show_app_only,
+                                       command=self.on_options_changed)
+        app_filter_cb.pack(side="left", padx=5)
+
+        self.auto_refresh_var = ctk.BooleanVar(value=True)
+        auto_cb = ctk.CTkCheckBox(filter_frame, text="Aggiornamento automatico (1s)",
+                                  variable=self.auto_refresh_var, command=self.on_options_changed)
+        auto_cb.pack(side="left", padx=5)
+
+        # Refresh and kill buttons
+        kill_btn = ctk.CTkButton(filter_frame, text="Termina", fg_color="red", width=80,
+                                 command=self.kill_selected)
+        kill_btn.pack(side="right", padx=5)
+        refresh_btn = ctk.CTkButton(filter_frame, text="Aggiorna", width=80, command=self.request_scan)
+        refresh_btn.pack(side="right", padx=5)
+
+        # Table
+        table_frame = ctk.CTkFrame(self)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        self.tree = ttk.Treeview(table_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, header, width in self.COLUMNS:
+            self.tree.heading(key, text=header)
+            self.tree.column(key, width=width, anchor="w")
+        scrollbar = ctk.CTkScrollbar(table_frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<Delete>", lambda event: self.kill_selected())
+
+        self.status_label = ctk.CTkLabel(self, text="Scansione in corso...", anchor="w")
+        self.status_label.pack(fill="x", padx=10, pady=(0, 5))
+
+        # Scanner thread state (plain attributes: tkinter variables are not thread-safe)
+        self.rows = {}
+        self.filter_type = "app_services"
+        self.auto_refresh = True
+        self.scanner = LocalhostScanner()
+        self.updates = queue.Queue()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        threading.Thread(target=self._scan_loop, daemon=True).start()
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.after(50, self.apply_updates)
+
+    def _scan_loop(self):
+        """Scan periodically in background and queue the differences."""
+        current = {}
+        while not self.stop_event.is_set():
+            # Cleared before scanning: a request arriving during the scan triggers the next one
+            self.wake.clear()
+            start = time.perf_counter()
+            try:
+                rows = self.scanner.scan(self.filter_type)
+            except Exception as e:
+                self.updates.put(("error", str(e)))
+                rows = current
+            added, changed, removed = LocalhostScanner.diff(current, rows)
+            self.updates.put(("diff", added, changed, removed, len(rows), time.perf_counter() - start))
+            current = rows
+            self.wake.wait(self.REFRESH_INTERVAL if self.auto_refresh else None)
+
+    def request_scan(self):
+        """Ask the scanner thread for an immediate scan."""
+        self.wake.set()
+
+    def on_options_changed(self):
+        """Forward the filter/auto-refresh options to the scanner thread."""
+        self.filter_type = "app_services" if self.show_app_only.get() else "all"
+        self.auto_refresh = self.auto_refresh_var.get()
+        self.request_scan()
+
+    @staticmethod
+    def _values(row: Dict) -> Tuple:
+        """Return the table values of a row."""
+        return (", ".join(str(p) for p in row["ports"]), ", ".join(row["addresses"]), row["pid"], row["name"],
+                row["cmdline"])
+
+    def apply_updates(self):
+        """Apply the queued differences to the table."""
+        if not self.winfo_exists():
+            return
+        try:
+            while True:
+                update = self.updates.get_nowait()
+                if update[0] == "error":
+                    self.status_label.configure(text=f"Errore: {update[1]}")
+                    continue
+                _, added, changed, removed, count, seconds = update
+                for pid in removed:
+                    self.rows.pop(pid, None)
+                    if self.tree.exists(str(pid)):
+                        self.tree.delete(str(pid))
+                for pid, row in changed.items():
+                    self.rows[pid] = row
+                    self.tree.item(str(pid), values=self._values(row))
+                for pid, row in added.items():
+                    self.rows[pid] = row
+                    self.tree.insert("", "end", iid=str(pid), values=self._values(row))
+                if added or changed:
+                    # Keep the rows ordered by port, moving only what is out of place
+                    for position, pid in enumerate(sorted(self.rows, key=lambda p: (self.rows[p]["port"], p))):
+                        if self.tree.index(str(pid)) != position:
+                            self.tree.move(str(pid), "", position)
+                text = f"{count} processi in ascolto (scansione {seconds * 1000:.0f} ms)" if count \
+                    else "Nessun processo localhost trovato"
+                self.status_label.configure(text=text)
+        except queue.Empty:
+            pass
+        self.after(100, self.apply_updates)
+
+    def kill_selected(self):
+        """Kill the selected process with confirmation."""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showinfo("Info", "Selezionare un processo.", parent=self)
+            return
+        proc = self.rows.get(int(selection[0]))
+        if proc:
+            self.kill_process(proc)
+
+    def kill_process(self, proc):
+        """Kill a process with confirmation."""
+        if not messagebox.askyesno("Conferma Terminazione",
+                                 f"Terminare il processo '{proc['name']}' (PID: {proc['pid']})?"):
+            return
+
+        try:
+            psutil.Process(proc['pid']).terminate()
+            messagebox.showinfo("Successo", f"Processo {proc['pid']} terminato")
+            self.request_scan()  # Refresh list
+        except psutil.AccessDenied:
+            messagebox.showerror("Errore", "Accesso negato. Eseguire come amministratore.")
+        except psutil.NoSuchProcess:
+            messagebox.showinfo("Info", "Processo già terminato")
+            self.request_scan()
+        except Exception as e:
+            messagebox.showerror("Errore", f"Impossibile terminare processo: {e}")
+
+    def close(self):
+        """Stop the scanner thread and close the window."""
+        self.stop_event.set()
+        self.wake.set()
+        self.destroy()
+
+
+class ProfileWindow(ctk.CTkToplevel):
+    """Flamegraph (icicle, root on top) and top-functions table of a StackProfile."""
+
+    ROW_HEIGHT = 18
+
+    def __init__(self, parent, profile: StackProfile, title: str):
+        super().__init__(parent)
+        self.profile = profile
+        self.title(f"Profilo - {title}")
+        self.geometry("1000x650")
+        self.tree = profile.flame_tree()
+        self.zoom = self.tree
+        self.nodes: Dict[str, Dict] = {}
+
+        total = profile.total
+        unit = profile.unit
+        summary = f"{total:.0f} {unit}" if unit != "s" else f"{total:.2f} s profilati (thread principale)"
+        ctk.CTkLabel(self, text=summary, anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+
+        tabs = ctk.CTkTabview(self)
+        tabs.pack(fill="both", expand=True, padx=10, pady=10)
+        flame_tab = tabs.add("Flamegraph")
+        table_tab = tabs.add("Funzioni")
+
+        # Top functions
+        columns = [("name", "Funzione", 420), ("self", "Self", 80), ("self_pct", "Self %", 70),
+                   ("total", "Totale", 80), ("total_pct", "Totale %", 70), ("calls", "Chiamate", 80)]
+        table = ttk.Treeview(table_tab, columns=[c[0] for c in columns], show="headings")
+        for key, heading, width in columns:
+            table.heading(key, text=heading)
+            table.column(key, width=width, anchor="w" if key == "name" else "e")
+        table.pack(fill="both", expand=True)
+        fmt = (lambda v: f"{v:.3f}") if unit == "s" else (lambda v: f"{v:.0f}")
+        for f in profile.top_functions(200):
+            table.insert("", "end", values=(
+                f["name"], fmt(f["self"]), f"{f['self'] / total:.1%}" if total else "-",
+                fmt(f["total"]), f"{f['total'] / total:.1%}" if total else "-", f.get("calls", "")))
+
+        # Flamegraph
+        self.info_label = ctk.CTkLabel(flame_tab, text="Clic su un blocco per ingrandire, tasto destro per tornare",
+                                       anchor="w")
+        self.info_label.pack(fill="x")
+        self.canvas = ctk.CTkCanvas(flame_tab, bg="gray15", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        if not profile.stacks:
+            self.canvas.create_text(20, 20, anchor="nw", fill="white",
+                                    text="cProfile non registra gli stack: vedere la scheda Funzioni")
+            tabs.set("Funzioni")
+            return
+        self.canvas.bind("<Configure>", lambda _: self.draw())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Button-3>", lambda _: self.set_zoom(self.tree))
+        self.canvas.bind("<Motion>", self.on_motion)
+
+    @staticmethod
+    def color(name: str) -> str:
+        """Warm color, stable per function name."""
+        h = zlib.crc32(name.encode("utf-8"))
+        return f"#{205 + h % 50:02x}{80 + (h >> 8) % 120:02x}{40 + (h >> 16) % 40:02x}"
+
+    def draw(self):
+        """Draw the zoomed node full width and its descendants below it."""
+        canvas = self.canvas
+        canvas.delete("all")
+        self.nodes.clear()
+        width = max(canvas.winfo_width(), 100)
+        if not self.zoom["value"]:
+            return
+        stack = [(self.zoom, 0.0, 0)]
+        scale = width / self.zoom["value"]
+        while stack:
+            node, x, depth = stack.pop()
+            w = node["value"] * scale
+            if w < 1:
+                continue
+            y = depth * self.ROW_HEIGHT
+            tag = f"n{len(self.nodes)}"
+            self.nodes[tag] = node
+            canvas.create_rectangle(x, y, x + w, y + self.ROW_HEIGHT - 1, fill=self.color(node["name"]),
+                                    outline="gray15", tags=(tag,))
+            if w > 30:
+                canvas.create_text(x + 3, y + self.ROW_HEIGHT / 2, anchor="w", text=node["name"][:int(w / 7)],
+                                   font=("Consolas", 9), tags=(tag,))
+            child_x = x
+            for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+                stack.append((child, child_x, depth + 1))
+                child_x += child["value"] * scale
+
+    def _node_at_cursor(self) -> Optional[Dict]:
+        for tag in self.canvas.gettags("current"):
+            if tag in self.nodes:
+                return self.nodes[tag]
+        return None
+
+    def set_zoom(self, node: Dict):
+        self.zoom = node
+        self.draw()
+
+    def on_click(self, _event):
+        node = self._node_at_cursor()
+        if node:
+            self.set_zoom(node)
+
+    def on_motion(self, _event):
+        node = self._node_at_cursor()
+        if node:
+            share = node["value"] / self.tree["value"] if self.tree["value"] else 0
+            self.info_label.configure(text=f"{node['name']} — {node['value']:.0f} {self.profile.unit} ({share:.1%})")
+
+
+class MemoryWindow(ctk.CTkToplevel):
+    """Top allocation sites by growth of the instances launched in tracemalloc mode, refreshed live."""
+
+    COLUMNS = [
+        ("site", "Allocazione (file:riga)", 420),
+        ("size", "Dimensione", 90),
+        ("growth", "Crescita", 90),
+        ("recent", "Ultimo intervallo", 110),
+        ("count", "Blocchi", 70),
+        ("count_diff", "Δ blocchi", 80),
+    ]
+    REFRESH_MS = 2000
+
+    def __init__(self, parent, server: MemoryTraceServer, services: List[str]):
+        super().__init__(parent)
+        self.server = server
+        self.title("Memoria (tracemalloc)")
+        self.geometry("1000x560")
+        self.transient(parent)
+
+        header = ctk.CTkFrame(self)
+        header.pack(fill="x", padx=10, pady=(10, 0))
+        self.service_var = ctk.StringVar(value=services[0])
+        ctk.CTkOptionMenu(header, variable=self.service_var, values=services,
+                          command=lambda _: self.refresh(reschedule=False)).pack(side="left", padx=5)
+        self.summary_label = ctk.CTkLabel(header, text="In attesa del primo rilevamento...", anchor="w")
+        self.summary_label.pack(side="left", padx=10, fill="x", expand=True)
+
+        table_frame = ctk.CTkFrame(self)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        self.table = ttk.Treeview(table_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, heading, width in self.COLUMNS:
+            self.table.heading(key, text=heading)
+            self.table.column(key, width=width, anchor="w" if key == "site" else "e")
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.table.pack(fill="both", expand=True)
+        self.last_time = None
+        self.refresh()
+
+    @staticmethod
+    def signed(size: float) -> str:
+        return ("+" if size > 0 else "") + format_bytes(size)
+
+    def refresh(self, reschedule: bool = True):
+        """Show the last report of the selected instance if it changed."""
+        if not self.winfo_exists():
+            return
+        service = self.service_var.get()
+        report = self.server.report(service)
+        if report and (report["time"] != self.last_time or not reschedule):
+            self.last_time = report["time"]
+            rate = self.server.growth_rate(service)
+            trend = f" · tendenza {self.signed(rate)}/h" if rate is not None else ""
+            stamp = datetime.fromtimestamp(report["time"]).strftime("%H:%M:%S")
+            self.summary_label.configure(
+                text=f"PID {report.get('pid')} · tracciati {format_bytes(report['current'])} "
+                     f"(picco {format_bytes(report['peak'])}){trend} · {report['traces']} blocchi · {stamp}")
+            self.table.delete(*self.table.get_children())
+            for stat in report["top"]:
+                self.table.insert("", "end", values=(
+                    stat["site"], format_bytes(stat["size"]), self.signed(stat["size_diff"]),
+                    self.signed(stat["recent_diff"]), stat["count"], f"{stat['count_diff']:+d}"))
+        elif not report:
+            self.summary_label.configure(text="In attesa del primo rilevamento...")
+        if reschedule:
+            self.after(self.REFRESH_MS, self.refresh)
+
+
+class LoadTestWindow(ctk.CTkToplevel):
+    """
+    Load test panel for the running services.
+
+    Targets are the listening ports of the launched process trees (from the
+    localhost scanner); the test runs in a worker thread and reports back
+    through after().
+    """
+
+    def __init__(self, parent, targets: List[Dict]):
+        """
+        Args:
+            parent: Main window
+            targets: Rows with label, host, port and pid of each running service port
+        """
+        super().__init__(parent)
+        self.title("Load Test")
+        self.geometry("700x560")
+        self.transient(parent)
+        self.targets = {t["label"]: t for t in targets}
+        self.tester: Optional[LoadTester] = None
+
+        form = ctk.CTkFrame(self)
+        form.pack(fill="x", padx=10, pady=10)
+        form.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(form, text="Servizio:").grid(row=0, column=0, sticky="w", padx=5, pady=3)
+        labels = list(self.targets) or ["Nessun servizio in ascolto"]
+        self.target_var = ctk.StringVar(value=labels[0])
+        ctk.CTkOptionMenu(form, variable=self.target_var, values=labels).grid(
+            row=0, column=1, columnspan=3, sticky="ew", padx=5, pady=3)
+        ctk.CTkLabel(form, text="Richiesta:").grid(row=1, column=0, sticky="w", padx=5, pady=3)
+        self.method_var = ctk.StringVar(value="GET")
+        ctk.CTkOptionMenu(form, variable=self.method_var, values=["GET", "HEAD", "POST"], width=80).grid(
+            row=1, column=1, sticky="w", padx=5, pady=3)
+        self.path_entry = ctk.CTkEntry(form)
+        self.path_entry.insert(0, "/")
+        self.path_entry.grid(row=1, column=2, columnspan=2, sticky="ew", padx=5, pady=3)
+        ctk.CTkLabel(form, text="Concorrenza:").grid(row=2, column=0, sticky="w", padx=5, pady=3)
+        self.concurrency_entry = ctk.CTkEntry(form, width=80)
+        self.concurrency_entry.insert(0, "10")
+        self.concurrency_entry.grid(row=2, column=1, sticky="w", padx=5, pady=3)
+        ctk.CTkLabel(form, text="Durata (s):").grid(row=2, column=2, sticky="e", padx=5, pady=3)
+        self.duration_entry = ctk.CTkEntry(form, width=80)
+        self.duration_entry.insert(0, "10")
+        self.duration_entry.grid(row=2, column=3, sticky="w", padx=5, pady=3)
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.pack(fill="x", padx=10)
+        self.start_btn = ctk.CTkButton(buttons, text="▶ Avvia", command=self.start)
+        self.start_btn.pack(side="left", padx=5)
+        self.stop_btn = ctk.CTkButton(buttons, text="⏹ Ferma", fg_color="red", state="disabled", command=self.stop)
+        self.stop_btn.pack(side="left", padx=5)
+        self.progress = ctk.CTkProgressBar(buttons)
+        self.progress.pack(side="left", fill="x", expand=True, padx=10)
+        self.progress.set(0)
+
+        self.output = ctk.CTkTextbox(self, font=("Consolas", 11))
+        self.output.pack(fill="both", expand=True, padx=10, pady=10)
+        if not self.targets:
+            self.show("Nessun servizio avviato dalla lista è in ascolto su una porta.\n")
+            self.start_btn.configure(state="disabled")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def show(self, text: str):
+        self.output.delete("1.0", "end")
+        self.output.insert("1.0", text)
+
+    def start(self):
+        """Start a test with the values of the form."""
+        target = self.targets.get(self.target_var.get())
+        if not target:
+            return
+        try:
+            concurrency = int(self.concurrency_entry.get())
+            duration = float(self.duration_entry.get())
+            if concurrency < 1 or duration <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Errore", "Concorrenza e durata devono essere numeri positivi", parent=self)
+            return
+        self.tester = LoadTester(target["host"], target["port"], self.path_entry.get() or "/", self.method_var.get(),
+                                 concurrency=concurrency, duration=duration, pid=target["pid"])
+        self.start_btn.configure(state="disabled")
+        self.stop_btn.configure(state="normal")
+        self.show(f"Test su http://{target['host']}:{target['port']}{self.tester.path} "
+                  f"con {concurrency} connessioni...\n")
+        threading.Thread(target=self._run, args=(self.tester,), daemon=True).start()
+
+    def _run(self, tester: LoadTester):
+        try:
+            report = tester.run(progress=lambda r: self.after(0, lambda: self.update_report(r, tester, False)))
+        except Exception as e:
+            message = f"Errore: {e}\n"
+            self.after(0, lambda: self.finish(message))
+            return
+        self.after(0, lambda: self.update_report(report, tester, True))
+
+    def update_report(self, report: Dict, tester: LoadTester, done: bool):
+        """Show an interim or final report."""
+        if not self.winfo_exists() or tester is not self.tester:
+            return
+        self.progress.set(min(1.0, report["elapsed"] / tester.duration))
+        text = LoadTester.format_report(report)
+        if done:
+            self.finish(text)
+        else:
+            self.show(text)
+
+    def finish(self, text: str):
+        self.show(text)
+        self.progress.set(1.0)
+        self.start_btn.configure(state="normal")
+        self.stop_btn.configure(state="disabled")
+
+    def stop(self):
+        """Stop the running test; the partial report is shown."""
+        if self.tester:
+            self.tester.stop()
+
+    def close(self):
+        self.stop()
+        self.destroy()
+
+
+class VenvCloner:
+    """
+    Clones a venv to a new location, separating the copy logic from the GUI.
+
+    Files inside site-packages are treated as immutable and are shared with
+    the source through a reflink (FICLONE, copy-on-write) or, if that is not
+    supported, a hardlink. Everything else is copied, and the scripts that
+    embed the absolute path of the environment (shebangs in bin/, activate
+    scripts, pyvenv.cfg, .pth files) are rewritten for the new location.
+
+    Clona un venv in una nuova posizione riscrivendo i percorsi assoluti.
+    """
+
+    # Linux ioctl number for FICLONE (_IOW(0x94, 9, int))
+    FICLONE = 0x40049409
+    # Text files smaller than this are scanned for the old path
+    REWRITE_MAX_SIZE = 1024 * 1024
+
+    def __init__(self, src: str, dst: str, use_links: bool = True):
+        """
+        Initialize the cloner.
+
+        Args:
+            src: Path of the existing venv
+            dst: Path of the new venv (must not exist)
+            use_links: Share site-packages files via reflink/hardlink
+        """
+        self.src = os.path.abspath(src)
+        self.dst = os.path.abspath(dst)
+        self.use_links = use_links
+        self._reflink_ok = sys.platform.startswith("linux")
+        self._hardlink_ok = True
+        self.stats = {"reflinked": 0, "hardlinked": 0, "copied": 0, "rewritten": 0}
+
+    def scan(self) -> Tuple[List[Tuple[str, str, int]], int]:
+        """
+        Walk the source venv.
+
+        Returns:
+            Tuple of (entries, total_bytes) where each entry is
+            (kind, relative_path, size) and kind is "dir", "link" or "file"
+        """
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.src):
+            rel_root = os.path.relpath(root, self.src)
+            for d in list(dirs):
+                rel = os.path.normpath(os.path.join(rel_root, d))
+                if os.path.islink(os.path.join(root, d)):
+                    # Do not descend into symlinked directories (e.g. lib64 -> lib)
+                    dirs.remove(d)
+                    entries.append(("link", rel, 0))
+                else:
+                    entries.append(("dir", rel, 0))
+            for name in files:
+                full = os.path.join(root, name)
+                rel = os.path.normpath(os.path.join(rel_root, name))
+                if os.path.islink(full):
+                    entries.append(("link", rel, 0))
+                else:
+                    size = os.path.getsize(full)
+                    entries.append(("file", rel, size))
+                    total += size
+        return entries, total
+
+    def _is_immutable(self, rel: str) -> bool:
+        """Return True for files that can be shared with the source venv."""
+        parts = Path(rel).parts
+        if "site-packages" not in parts:
+            return False
+        # .pth/.egg-link files may contain absolute paths and must be rewritten
+        return not rel.endswith((".pth", ".egg-link"))
+
+    def _needs_rewrite(self, rel: str, size: int) -> bool:
+        """Return True for small text files that may embed the venv path."""
+        if size > self.REWRITE_MAX_SIZE:
+            return False
+        parts = Path(rel).parts
+        return (rel == "pyvenv.cfg"
+                or (parts and parts[0] in ("bin", "Scripts"))
+                or rel.endswith((".pth", ".egg-link")))
+
+    def _reflink(self, src: str, dst: str) -> bool:
+        """Try a copy-on-write clone of src into dst. Return True on success."""
+        if not self._reflink_ok:
+            return False
+        try:
+            import fcntl
+        except ImportError:
+            self._reflink_ok = False
+            return False
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), self.FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            # Filesystem does not support reflinks: don't try again
+            self._reflink_ok = False
+            try:
+                os.unlink(dst)
+            except OSError:
+                pass
+            return False
+
+    def _rewrite_copy(self, src: str, dst: str) -> bool:
+        """Copy a file replacing the old venv path. Return True if rewritten."""
+        with open(src, "rb") as f:
+            data = f.read()
+        old = self.src.encode()
+        if b"\0" in data or old not in data:
+            if src != dst:
+                shutil.copy2(src, dst)
+            return False
+        if src == dst:
+            # In-place rewrite (relocate): keep permissions of the original file
+            mode = os.stat(src).st_mode
+            with open(dst, "wb") as f:
+                f.write(data.replace(old, self.dst.encode()))
+            os.chmod(dst, mode)
+            return True
+        with open(dst, "wb") as f:
+            f.write(data.replace(old, self.dst.encode()))
+        shutil.copystat(src, dst)
+        return True
+
+    def _copy_file(self, rel: str, size: int):
+        """Materialize a single file in the destination."""
+        src = os.path.join(self.src, rel)
+        dst = os.path.join(self.dst, rel)
+        if self._needs_rewrite(rel, size):
+            if self._rewrite_copy(src, dst):
+                self.stats["rewritten"] += 1
+            else:
+                self.stats["copied"] += 1
+            return
+        if self.use_links and self._is_immutable(rel):
+            if self._reflink(src, dst):
+                self.stats["reflinked"] += 1
+                return
+            if self._hardlink_ok:
+                try:
+                    os.link(src, dst)
+                    self.stats["hardlinked"] += 1
+                    return
+                except OSError:
+                    # Cross-device or unsupported: fall back to copying
+                    self._hardlink_ok = False
+        shutil.copy2(src, dst)
+        self.stats["copied"] += 1
+
+    def _copy_link(self, rel: str):
+        """Recreate a symlink, retargeting it if it points inside the source."""
+        target = os.readlink(os.path.join(self.src, rel))
+        if os.path.isabs(target) and (target == self.src or target.startswith(self.src + os.sep)):
+            target = self.dst + target[len(self.src):]
+        os.symlink(target, os.path.join(self.dst, rel))
+
+    def clone(self, progress_callback=None) -> Dict[str, int]:
+        """
+        Clone the venv.
+
+        Args:
+            progress_callback: Optional callable(done_bytes, total_bytes)
+
+        Returns:
+            Statistics dictionary (files per strategy, bytes, elapsed seconds)
+        """
+        start = time.perf_counter()
+        if os.path.exists(self.dst):
+            raise FileExistsError(self.dst)
+        entries, total = self.scan()
+        os.makedirs(self.dst)
+        done = 0
+        last_report = 0.0
+        try:
+            for kind, rel, size in entries:
+                if kind == "dir":
+                    os.makedirs(os.path.join(self.dst, rel), exist_ok=True)
+                elif kind == "link":
+                    self._copy_link(rel)
+                else:
+                    self._copy_file(rel, size)
+                    done += size
+                    now = time.perf_counter()
+                    if progress_callback and now - last_report > 0.1:
+                        last_report = now
+                        progress_callback(done, total)
+        except Exception:
+            # Never leave a half-built environment around
+            shutil.rmtree(self.dst, ignore_errors=True)
+            raise
+        if progress_callback:
+            progress_callback(total, total)
+        result = dict(self.stats)
+        result["bytes"] = total
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    @classmethod
+    def relocate(cls, path: str, old_path: str) -> int:
+        """
+        Rewrite references to old_path in a venv that has been moved to path.
+
+        Only bin/ (Scripts/), pyvenv.cfg and the top level of site-packages
+        are visited, so this is fast even for very large environments.
+
+        Returns:
+            Number of rewritten files
+        """
+        relocator = cls(old_path, path)
+        count = 0
+        for root, dirs, files in os.walk(relocator.dst):
+            rel_root = os.path.relpath(root, relocator.dst)
+            for name in files:
+                full = os.path.join(root, name)
+                rel = os.path.normpath(os.path.join(rel_root, name))
+                if os.path.islink(full) or not relocator._needs_rewrite(rel, os.path.getsize(full)):
+                    continue
+                if relocator._rewrite_copy(full, full):
+                    count += 1
+            if os.path.basename(root) == "site-packages":
+                # Package contents never embed the venv path
+                dirs[:] = []
+        return count
+
+
+class TreeRemover:
+    """
+    Removes a directory tree using a pool of threads.
+
+    Files are unlinked directory by directory in parallel (unlink releases
+    the GIL), then the empty directories are removed deepest-first.
+    Progress is reported in files and bytes.
 
-        # Install using existing method
-        self.parent.install_dependencies(temp_file)
+    Elimina un albero di directory in parallelo riportando l'avanzamento.
+    """
 
-        # Clean up temp file
-        os.unlink(temp_file)
+    def __init__(self, path: str, workers: Optional[int] = None):
+        """
+        Initialize the remover.
 
+        Args:
+            path: Directory to remove
+            workers: Number of threads (default: min(8, cpu_count))
+        """
+        self.path = path
+        self.workers = workers or min(8, os.cpu_count() or 1)
 
-def get_localhost_processes(filter_type="all"):
-    """Get list of processes listening on localhost."""
-    processes = []
-    try:
-        for conn in psutil.net_connections(kind='inet'):
-            if conn.status == 'LISTEN' and conn.laddr:
-                # Accept both 127.0.0.1 and 0.0.0.0 bindings
-                if conn.laddr.ip in ['127.0.0.1', '0.0.0.0']:
-                    try:
-                        proc = psutil.Process(conn.pid)
-                        process_info = {
-                            'port': conn.laddr.port,
-                            'pid': conn.pid,
-                            'name': proc.name(),
-                            'cmdline': ' '.join(proc.cmdline())[:100] if proc.cmdline() else ''
-                        }
-
-                        # Apply filter
-                        if filter_type == "app_services":
-                            if not is_app_service(process_info):
-                                continue
-
-                        processes.append(process_info)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-    except Exception as e:
-        print(f"Error getting processes: {e}")
-    return sorted(processes, key=lambda x: x['port'])
+    def scan(self) -> Tuple[List[Tuple[str, List[Tuple[str, int]]]], int, int]:
+        """
+        Collect the tree contents.
 
+        Returns:
+            Tuple of (dirs, total_files, total_bytes) where dirs is a list of
+            (directory, [(file_path, size), ...]) sorted deepest-first
+        """
+        dirs = []
+        total_files = 0
+        total_bytes = 0
+        stack = [self.path]
+        while stack:
+            current = stack.pop()
+            entries = []
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            size = entry.stat(follow_symlinks=False).st_size
+                            entries.append((entry.path, size))
+                            total_bytes += size
+            except OSError:
+                pass
+            total_files += len(entries)
+            dirs.append((current, entries))
+        dirs.sort(key=lambda d: d[0].count(os.sep), reverse=True)
+        return dirs, total_files, total_bytes
+
+    @staticmethod
+    def _unlink_all(entries: List[Tuple[str, int]]) -> Tuple[int, int]:
+        """Unlink a batch of files. Return (files, bytes) removed."""
+        files = 0
+        size_done = 0
+        for file_path, size in entries:
+            try:
+                os.unlink(file_path)
+            except PermissionError:
+                # Read-only file on Windows; on POSIX unlinking depends on the directory's permissions
+                os.chmod(file_path if os.name == "nt" else os.path.dirname(file_path), 0o700)
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+            files += 1
+            size_done += size
+        return files, size_done
 
-def is_app_service(proc):
-    """Determine if a process is an application service (not system service)."""
-    name = proc['name'].lower()
-    cmdline = proc['cmdline'].lower()
-    port = proc['port']
+    def remove(self, progress_callback=None) -> Dict[str, float]:
+        """
+        Remove the tree.
 
-    # Exclude known system services
-    system_services = ['nahimic', 'norton', 'antivirus', 'defender', 'windows',
-                      'svchost', 'system', 'idle', 'csrss', 'smss', 'lsass']
-    if any(s in name for s in system_services):
-        return False
+        Args:
+            progress_callback: Optional callable(done_files, total_files, done_bytes, total_bytes)
 
-    # Include development servers
-    dev_servers = ['uvicorn', 'fastapi', 'flask', 'django', 'gunicorn',
-                  'node', 'npm', 'yarn', 'express', 'next', 'react']
-    if any(s in cmdline for s in dev_servers):
-        return True
+        Returns:
+            Statistics dictionary (files, bytes, elapsed seconds)
+        """
+        start = time.perf_counter()
+        if os.path.islink(self.path) or not os.path.isdir(self.path):
+            os.unlink(self.path)
+            return {"files": 1, "bytes": 0, "elapsed": time.perf_counter() - start}
+
+        dirs, total_files, total_bytes = self.scan()
+        done_files = 0
+        done_bytes = 0
+        last_report = 0.0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._unlink_all, entries) for _, entries in dirs if entries]
+            for future in as_completed(futures):
+                files, size_done = future.result()
+                done_files += files
+                done_bytes += size_done
+                now = time.perf_counter()
+                if progress_callback and now - last_report > 0.1:
+                    last_report = now
+                    progress_callback(done_files, total_files, done_bytes, total_bytes)
+
+        for directory, _ in dirs:
+            os.rmdir(directory)
+
+        if progress_callback:
+            progress_callback(total_files, total_files, total_bytes, total_bytes)
+        return {"files": total_files, "bytes": total_bytes, "elapsed": time.perf_counter() - start}
+
+
+class EnvProvisioner:
+    """
+    Creates venv environments as fast as the machine allows.
+
+    Strategies, fastest first:
+    1. Template snapshot: a venv stored in .venvs/.templates is link-copied
+       with VenvCloner (no interpreter launch, no network).
+    2. uv: `uv venv --seed` using uv's global cache.
+    3. venv: `python -m venv --without-pip`, then pip is installed from a
+       local wheel (wheelhouse or the interpreter's bundled ensurepip wheel)
+       without byte-compiling.
+
+    Extra packages are built once into the shared wheelhouse
+    (.venvs/.wheelhouse) and installed from there, so that later
+    environments (and offline mode) never hit the network. uv reads the
+    wheelhouse through --find-links but stores new downloads in its own
+    cache: only the pip path fills the wheelhouse.
+
+    Crea ambienti venv usando template, uv e una cache di wheel condivisa.
+    """
 
-    # Include common development ports
-    if 3000 <= port <= 9999:
-        return True
+    def __init__(self, base_dir: str = ".venvs", offline: bool = False, log_callback=None):
+        """
+        Initialize the provisioner.
 
-    # Include Python/Node processes with server/app indicators
-    if ('python' in name or 'node' in name or 'ollama' in name or 'studio' in name) and \
-       ('server' in cmdline or 'app' in cmdline or 'api' in cmdline or 'main' in cmdline):
-        return True
+        Args:
+            base_dir: Directory containing venvs, templates and the wheelhouse
+            offline: Never access the network (use only local wheels/caches)
+            log_callback: Optional callable(str) receiving output lines
+        """
+        self.base_dir = Path(base_dir)
+        self.templates_dir = self.base_dir / ".templates"
+        self.wheelhouse = self.base_dir / ".wheelhouse"
+        self.offline = offline
+        self.log = log_callback or (lambda message: None)
+        self.timings = []  # List of (step, seconds)
+
+    @staticmethod
+    def find_uv() -> Optional[str]:
+        """Return the path of the uv executable, if installed."""
+        return shutil.which("uv")
+
+    @staticmethod
+    def python_path(env_path: str) -> str:
+        """Return the interpreter path inside a venv."""
+        if os.name == "nt":  # Windows
+            return os.path.join(env_path, "Scripts", "python.exe")
+        return os.path.join(env_path, "bin", "python")
 
-    # Include databases if they seem user-started (not system)
-    if port in [3306, 5432, 27017, 6379] and 'service' not in cmdline:
-        return True
+    def list_templates(self) -> List[str]:
+        """List the names of the stored template snapshots."""
+        if not self.templates_dir.is_dir():
+            return []
+        return sorted(item.name for item in self.templates_dir.iterdir()
+                      if (item / "pyvenv.cfg").exists())
 
-    return False
+    def _run(self, step: str, command: List[str]):
+        """Run a command streaming its output to the log and record its duration."""
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        for line in process.stdout:
+            self.log(line)
+        process.wait()
+        self.timings.append((step, time.perf_counter() - start))
+        if process.returncode != 0:
+            raise RuntimeError(f"{step} fallito (codice: {process.returncode})")
+
+    def _pip_wheel(self) -> Optional[str]:
+        """Find a local pip wheel (wheelhouse first, then ensurepip's bundled one)."""
+        candidates = sorted(self.wheelhouse.glob("pip-*.whl")) if self.wheelhouse.is_dir() else []
+        if not candidates:
+            try:
+                import ensurepip
+                candidates = sorted(Path(ensurepip.__file__).parent.glob("_bundled/pip-*.whl"))
+            except ImportError:
+                pass
+        return str(candidates[-1]) if candidates else None
 
+    def create(self, path: str, template: Optional[str] = None,
+               packages: Optional[List[str]] = None, with_pip: bool = True) -> str:
+        """
+        Create a new venv.
 
-class ProcessViewer(ctk.CTkToplevel):
-    """Window for viewing and managing localhost processes."""
+        Args:
+            path: Destination path of the new environment
+            template: Name of a template snapshot to start from
+            packages: Additional requirement specifiers to install
+            with_pip: Seed pip into the environment
 
-    def __init__(self, parent):
+        Returns:
+            Name of the strategy used ("template", "uv" or "venv")
+        """
+        self.timings = []
+        if os.path.exists(path):
+            raise FileExistsError(path)
+
+        if template:
+            start = time.perf_counter()
+            stats = VenvCloner(str(self.templates_dir / template), path).clone()
+            self.timings.append((f"template '{template}'", time.perf_counter() - start))
+            self.log(f"Template '{template}' copiato ({format_bytes(stats['bytes'])}, "
+                     f"{stats['hardlinked'] + stats['reflinked']} file condivisi)\n")
+            strategy = "template"
+        elif self.find_uv():
+            command = [self.find_uv(), "venv", "--python", sys.executable, path]
+            if with_pip:
+                command.insert(2, "--seed")
+            if self.offline:
+                command.insert(2, "--offline")
+            self._run("uv venv", command)
+            strategy = "uv"
+        else:
+            self._run("venv", [sys.executable, "-m", "venv", "--without-pip", path])
+            pip_wheel = self._pip_wheel() if with_pip else None
+            if pip_wheel:
+                # Run pip straight from its wheel: same as ensurepip, minus byte-compilation
+                self._run("pip (wheel locale)", [
+                    self.python_path(path), os.path.join(pip_wheel, "pip"), "install",
+                    "--no-index", "--no-compile", "--disable-pip-version-check", "--quiet", pip_wheel
+                ])
+            elif with_pip:
+                self._run("ensurepip", [self.python_path(path), "-m", "ensurepip", "--upgrade"])
+            strategy = "venv"
+
+        if packages:
+            self.install(path, packages)
+        return strategy
+
+    def install(self, path: str, packages: List[str]):
+        """Install packages into a venv through the shared wheelhouse."""
+        python = self.python_path(path)
+        self.wheelhouse.mkdir(parents=True, exist_ok=True)
+        uv = self.find_uv()
+        if uv:
+            command = [uv, "pip", "install", "--python", python, "--find-links", str(self.wheelhouse)]
+            if self.offline:
+                command.append("--offline")
+            self.log(f"uv usa le wheel di {self.wheelhouse} ma salva i nuovi download nella propria cache\n")
+            self._run("uv pip install", command + packages)
+            return
+        if not self.offline:
+            # Build/download every wheel once; later installs are local
+            self._run("pip wheel", [python, "-m", "pip", "wheel", "--disable-pip-version-check",
+                                    "--find-links", str(self.wheelhouse), "-w", str(self.wheelhouse)] + packages)
+        self._run("pip install", [python, "-m", "pip", "install", "--disable-pip-version-check",
+                                  "--no-index", "--find-links", str(self.wheelhouse)] + packages)
+
+    def save_template(self, name: str, venv_path: str) -> Dict[str, int]:
+        """Store an existing venv as a template snapshot."""
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        stats = VenvCloner(venv_path, str(self.templates_dir / name)).clone()
+        self.timings = [(f"snapshot '{name}'", time.perf_counter() - start)]
+        return stats
+
+    def format_timings(self) -> str:
+        """Format the recorded step timings for the console."""
+        total = sum(seconds for _, seconds in self.timings)
+        steps = ", ".join(f"{step}: {seconds:.2f}s" for step, seconds in self.timings)
+        return f"⏱ Tempo totale {total:.2f}s ({steps})\n"
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count in a human readable form."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+class LibraryViewer(ctk.CTkToplevel):
+    """Window showing the installed distributions of an environment as a sortable table."""
+
+    COLUMNS = [
+        ("name", "Nome", 200),
+        ("version", "Versione", 100),
+        ("size", "Dimensione", 90),
+        ("requires", "Dipendenze", 80),
+        ("required_by", "Richiesto da", 90),
+    ]
+
+    def __init__(self, parent, title: str, packages: List[Dict]):
         super().__init__(parent)
         self.parent = parent
-        self.title("Processi Localhost")
-        self.geometry("800x600")
+        self.title(title)
+        self.geometry("800x550")
+        self.packages = packages
+        self.by_key = {p["key"]: p for p in packages}
+        self.sort_column = "name"
+        self.sort_reverse = False
 
         # Make window modal
         self.transient(parent)
@@ -289,87 +5085,237 @@ class ProcessViewer(ctk.CTkToplevel):
         filter_frame = ctk.CTkFrame(self)
         filter_frame.pack(pady=5, padx=10, fill="x")
 
-        self.show_app_only = ctk.BooleanVar(value=True)
-        app_filter_cb = ctk.CTkCheckBox(filter_frame, text="Mostra solo servizi app",
-                                       variable=self.show_app_only,
-                                       command=self.load_processes)
-        app_filter_cb.pack(side="left", padx=5)
-
-        # Refresh button
-        refresh_btn = ctk.CTkButton(filter_frame, text="Aggiorna", command=self.load_processes)
-        refresh_btn.pack(side="right", padx=5)
-
-        # Scrollable frame for process list
-        self.process_frame = ctk.CTkScrollableFrame(self)
-        self.process_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        self.load_processes()
-
-    def load_processes(self):
-        """Load and display localhost processes in table format."""
-        # Clear existing widgets
-        for widget in self.process_frame.winfo_children():
-            widget.destroy()
-
-        # Configure grid
-        self.process_frame.grid_columnconfigure(3, weight=1)  # Command column expands
-
-        # Get processes
-        filter_type = "app_services" if self.show_app_only.get() else "all"
-        processes = get_localhost_processes(filter_type)
-
-        if not processes:
-            label = ctk.CTkLabel(self.process_frame, text="Nessun processo localhost trovato")
-            label.grid(row=0, column=0, columnspan=5, pady=20)
+        ctk.CTkLabel(filter_frame, text="Filtro:").pack(side="left", padx=5)
+        self.filter_entry = ctk.CTkEntry(filter_frame, width=250, placeholder_text="nome o descrizione")
+        self.filter_entry.pack(side="left", padx=5)
+        self.filter_entry.bind("<KeyRelease>", lambda event: self.populate())
+
+        total_size = sum(p["size"] for p in packages)
+        self.summary_label = ctk.CTkLabel(filter_frame, text=f"{len(packages)} pacchetti, {format_bytes(total_size)}")
+        self.summary_label.pack(side="right", padx=5)
+
+        # Table
+        table_frame = ctk.CTkFrame(self)
+        table_frame.pack(pady=5, padx=10, fill="both", expand=True)
+
+        self.tree = ttk.Treeview(table_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, header, width in self.COLUMNS:
+            self.tree.heading(key, text=header, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width, anchor="w" if key == "name" else "e")
+        scrollbar = ctk.CTkScrollbar(table_frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", self.show_details)
+
+        # Details of the selected package (dependency edges)
+        self.details = ctk.CTkTextbox(self, height=110, wrap="word", state="disabled")
+        self.details.pack(pady=5, padx=10, fill="x")
+
+        self.populate()
+
+    def sort_by(self, column: str):
+        """Sort the table by a column (clicking twice reverses the order)."""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = column in ("size", "requires", "required_by")
+        self.populate()
+
+    def _sort_key(self, package: Dict):
+        """Return the sort key of a package for the current column."""
+        if self.sort_column == "name":
+            return package["key"]
+        if self.sort_column == "version":
+            try:
+                return (0, Version(package["version"]))
+            except InvalidVersion:
+                return (1, package["version"])
+        if self.sort_column in ("requires", "required_by"):
+            return len(package[self.sort_column])
+        return package[self.sort_column]
+
+    def populate(self):
+        """Fill the table applying filter and sort order."""
+        text = self.filter_entry.get().strip().lower()
+        rows = [p for p in self.packages
+                if not text or text in p["key"] or text in p["summary"].lower()]
+        rows.sort(key=self._sort_key, reverse=self.sort_reverse)
+        self.tree.delete(*self.tree.get_children())
+        for package in rows:
+            self.tree.insert("", "end", iid=package["key"], values=(
+                package["name"], package["version"], format_bytes(package["size"]),
+                len(package["requires"]), len(package["required_by"])
+            ))
+
+    def show_details(self, event=None):
+        """Show summary and dependency edges of the selected package."""
+        selection = self.tree.selection()
+        if not selection:
             return
+        package = self.by_key[selection[0]]
+        lines = [f"{package['name']} {package['version']} — {package['summary']}",
+                 f"Posizione: {package['location']}",
+                 "Dipendenze: " + (", ".join(package["requires"]) or "nessuna"),
+                 "Richiesto da: " + (", ".join(package["required_by"]) or "nessuno")]
+        missing = [dep for dep in package["requires"] if dep not in self.by_key]
+        if missing:
+            lines.append("Non installate: " + ", ".join(missing))
+        self.details.configure(state="normal")
+        self.details.delete("1.0", "end")
+        self.details.insert("1.0", "\n".join(lines))
+        self.details.configure(state="disabled")
+
+
+class ImportProfileViewer(ctk.CTkToplevel):
+    """Window showing an import-time profile as a cumulative tree."""
+
+    def __init__(self, parent, target: str, result: Dict, previous: Optional[Dict] = None):
+        super().__init__(parent)
+        self.parent = parent
+        self.title(f"Profilo Import - {Path(target).name}")
+        self.geometry("800x600")
 
-        # Headers
-        headers = ["Porta", "PID", "Nome", "Comando", "Azione"]
-        for col, header in enumerate(headers):
-            hdr_label = ctk.CTkLabel(self.process_frame, text=header, font=("Arial", 12, "bold"))
-            hdr_label.grid(row=0, column=col, padx=5, pady=5, sticky="w")
-
-        # Data rows
-        for row, proc in enumerate(processes, start=1):
-            # Port
-            port_label = ctk.CTkLabel(self.process_frame, text=str(proc['port']))
-            port_label.grid(row=row, column=0, padx=5, pady=2, sticky="w")
-
-            # PID
-            pid_label = ctk.CTkLabel(self.process_frame, text=str(proc['pid']))
-            pid_label.grid(row=row, column=1, padx=5, pady=2, sticky="w")
-
-            # Name
-            name_label = ctk.CTkLabel(self.process_frame, text=proc['name'])
-            name_label.grid(row=row, column=2, padx=5, pady=2, sticky="w")
+        # Summary
+        summary = f"Tempo totale import: {result['total_us'] / 1000:.1f} ms (processo: {result['wall_s']:.2f}s)"
+        if previous:
+            delta = (result["total_us"] - previous["total_us"]) / 1000
+            summary += f" | precedente ({previous['time']}): {previous['total_us'] / 1000:.1f} ms ({delta:+.1f} ms)"
+        ctk.CTkLabel(self, text=summary, font=("Arial", 12, "bold")).pack(pady=5, padx=10, anchor="w")
+
+        # Cumulative tree
+        tree_frame = ctk.CTkFrame(self)
+        tree_frame.pack(pady=5, padx=10, fill="both", expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=("cumulative", "self"), show="tree headings")
+        self.tree.heading("#0", text="Modulo")
+        self.tree.heading("cumulative", text="Cumulativo (ms)")
+        self.tree.heading("self", text="Proprio (ms)")
+        self.tree.column("#0", width=420)
+        self.tree.column("cumulative", width=120, anchor="e")
+        self.tree.column("self", width=120, anchor="e")
+        scrollbar = ctk.CTkScrollbar(tree_frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self._insert_nodes("", sorted(result["tree"], key=lambda n: n["cumulative_us"], reverse=True))
+
+        # Slowest imports, regressions and errors
+        text = ctk.CTkTextbox(self, height=150, wrap="word")
+        text.pack(pady=5, padx=10, fill="x")
+        text.insert("end", "Import più lenti (cumulativo):\n")
+        for node in ImportProfiler.slowest(result["tree"], 15):
+            text.insert("end", f"  {node['cumulative_us'] / 1000:8.1f} ms  {node['name']}\n")
+        if previous:
+            regressions = ImportProfiler.regressions(result, previous)
+            text.insert("end", f"\nRegressioni rispetto al {previous['time']}: {len(regressions)}\n")
+            for name, before, after in regressions:
+                text.insert("end", f"  {name}: {before / 1000:.1f} ms → {after / 1000:.1f} ms\n")
+        if result["errors"]:
+            text.insert("end", "\nErrori di import:\n")
+            for error in result["errors"]:
+                text.insert("end", f"  {error}\n")
+        text.configure(state="disabled")
+
+    def _insert_nodes(self, parent_id: str, nodes: List[Dict]):
+        """Insert nodes (and their children, slowest first) into the tree."""
+        for node in nodes:
+            item = self.tree.insert(parent_id, "end", text=node["name"], values=(
+                f"{node['cumulative_us'] / 1000:.2f}", f"{node['self_us'] / 1000:.2f}"))
+            if node["children"]:
+                self._insert_nodes(item, sorted(node["children"], key=lambda n: n["cumulative_us"], reverse=True))
+
+
+class BenchmarkWindow(ctk.CTkToplevel):
+    """Window running CPU benchmarks in the active environment and comparing environments."""
+
+    def __init__(self, parent, python_command: List[str], env_name: str):
+        super().__init__(parent)
+        self.parent = parent
+        self.python_command = python_command
+        self.env_name = env_name
+        self.benchmark = EnvBenchmark(python_command)
+        self.title("Benchmark CPU")
+        self.geometry("900x600")
+
+        # Controls
+        controls = ctk.CTkFrame(self)
+        controls.pack(pady=5, padx=10, fill="x")
+
+        self.run_btn = ctk.CTkButton(controls, text=f"Esegui su '{env_name}'", fg_color="green",
+                                     command=self.run_benchmark)
+        self.run_btn.pack(side="left", padx=5)
+
+        ctk.CTkLabel(controls, text="Thread max:").pack(side="left", padx=5)
+        self.threads_entry = ctk.CTkEntry(controls, width=60)
+        self.threads_entry.insert(0, str(psutil.cpu_count(logical=False) or os.cpu_count() or 1))
+        self.threads_entry.pack(side="left", padx=5)
+
+        ctk.CTkLabel(controls, text=platform_cpu_description(), text_color="gray").pack(side="right", padx=5)
+
+        # Side-by-side comparison of all stored environments
+        table_frame = ctk.CTkFrame(self)
+        table_frame.pack(pady=5, padx=10, fill="both", expand=True)
+        self.table = ttk.Treeview(table_frame, show="headings")
+        self.table.pack(side="left", fill="both", expand=True)
+        scrollbar = ctk.CTkScrollbar(table_frame, command=self.table.xview, orientation="horizontal")
+        self.table.configure(xscrollcommand=scrollbar.set)
+        scrollbar.pack(side="bottom", fill="x")
+
+        self.console = ctk.CTkTextbox(self, height=120, state="disabled")
+        self.console.pack(pady=5, padx=10, fill="x")
+
+        self.show_comparison()
+
+    def show_comparison(self):
+        """Fill the comparison table with the stored results."""
+        results = self.benchmark.load_all()
+        columns = ["metric"] + [f"env{i}" for i in range(len(results))]
+        self.table.delete(*self.table.get_children())
+        self.table.configure(columns=columns)
+        self.table.heading("metric", text="Metrica")
+        self.table.column("metric", width=150, anchor="w")
+        for i, result in enumerate(results):
+            self.table.heading(f"env{i}", text=f"{result.get('env', '?')} ({result.get('time', '')[:10]})")
+            self.table.column(f"env{i}", width=170, anchor="e")
+        for metric, values in EnvBenchmark.comparison_rows(results):
+            self.table.insert("", "end", values=[metric] + values)
+
+    def run_benchmark(self):
+        """Run the suite in a thread."""
+        try:
+            max_threads = max(1, int(self.threads_entry.get()))
+        except ValueError:
+            max_threads = None
+        self.run_btn.configure(state="disabled")
+        q = queue.Queue()
 
-            # Command (truncated)
-            cmd_text = proc['cmdline'][:50] + "..." if len(proc['cmdline']) > 50 else proc['cmdline']
-            cmd_label = ctk.CTkLabel(self.process_frame, text=cmd_text)
-            cmd_label.grid(row=row, column=3, padx=5, pady=2, sticky="w")
+        def worker():
+            try:
+                result = self.benchmark.run(self.env_name, max_threads=max_threads, log_callback=q.put)
+                q.put(f"✓ Benchmark completato ({result['time']})\n")
+            except Exception as e:
+                q.put(f"✗ Errore benchmark: {str(e)}\n")
+            finally:
+                q.put(None)
 
-            # Kill button
-            kill_btn = ctk.CTkButton(self.process_frame, text="Termina", fg_color="red", width=80,
-                                   command=lambda p=proc: self.kill_process(p))
-            kill_btn.grid(row=row, column=4, padx=5, pady=2)
+        threading.Thread(target=worker, daemon=True).start()
+        self._monitor(q)
 
-    def kill_process(self, proc):
-        """Kill a process with confirmation."""
-        if not messagebox.askyesno("Conferma Terminazione",
-                                 f"Terminare il processo '{proc['name']}' (PID: {proc['pid']})?"):
+    def _monitor(self, q: queue.Queue):
+        """Show benchmark progress and refresh the table when done."""
+        if not self.winfo_exists():
             return
-
         try:
-            psutil.Process(proc['pid']).terminate()
-            messagebox.showinfo("Successo", f"Processo {proc['pid']} terminato")
-            self.load_processes()  # Refresh list
-        except psutil.AccessDenied:
-            messagebox.showerror("Errore", "Accesso negato. Eseguire come amministratore.")
-        except psutil.NoSuchProcess:
-            messagebox.showinfo("Info", "Processo già terminato")
-            self.load_processes()
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile terminare processo: {e}")
+            while True:
+                line = q.get_nowait()
+                if line is None:
+                    self.run_btn.configure(state="normal")
+                    self.show_comparison()
+                    return
+                log_to_console(self.console, line)
+        except queue.Empty:
+            self.after(200, lambda: self._monitor(q))
 
 
 class EnvManagerWindow(ctk.CTkToplevel):
@@ -403,6 +5349,9 @@ class EnvManagerWindow(ctk.CTkToplevel):
         # Refresh environment lists
         self.refresh_venv_list()
         self.refresh_conda_list()
+
+        # Environments left in the trash by an interrupted deletion
+        threading.Thread(target=self.purge_trash, daemon=True).start()
     
     def setup_venv_tab(self):
         """Setup the Venv management tab."""
@@ -436,6 +5385,24 @@ class EnvManagerWindow(ctk.CTkToplevel):
         
         create_btn = ctk.CTkButton(input_frame, text="Crea", command=self.create_venv)
         create_btn.pack(side="left", padx=5)
+
+        # Provisioning options: template snapshot, extra packages, offline mode
+        options_frame = ctk.CTkFrame(tab)
+        options_frame.pack(pady=5, padx=10, fill="x")
+
+        ctk.CTkLabel(options_frame, text="Template:").pack(side="left", padx=5)
+        self.venv_template_menu = ctk.CTkOptionMenu(options_frame, values=["(nessuno)"], width=150)
+        self.venv_template_menu.pack(side="left", padx=5)
+
+        ctk.CTkLabel(options_frame, text="Pacchetti:").pack(side="left", padx=5)
+        self.venv_packages_entry = ctk.CTkEntry(options_frame, width=200, placeholder_text="es. numpy==1.26.4 requests")
+        self.venv_packages_entry.pack(side="left", padx=5)
+
+        self.venv_offline_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(options_frame, text="Offline", variable=self.venv_offline_var).pack(side="left", padx=5)
+        if EnvProvisioner.find_uv():
+            ctk.CTkLabel(options_frame, text="(cache wheel riempita solo da pip; uv usa la propria)",
+                         text_color="gray").pack(side="left", padx=5)
         
         # Progress bar for environment creation
         self.venv_progress_frame = ctk.CTkFrame(tab)
@@ -490,6 +5457,9 @@ class EnvManagerWindow(ctk.CTkToplevel):
         self.python_version.set("3.11")
         self.python_version.pack(side="left", padx=5)
         
+        self.conda_offline_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(input_frame, text="Offline", variable=self.conda_offline_var).pack(side="left", padx=5)
+
         create_btn = ctk.CTkButton(input_frame, text="Crea", command=self.create_conda)
         create_btn.pack(side="left", padx=5)
         
@@ -516,6 +5486,12 @@ class EnvManagerWindow(ctk.CTkToplevel):
         # Clear existing widgets
         for widget in self.venv_list_frame.winfo_children():
             widget.destroy()
+
+        # Refresh available templates
+        templates = EnvProvisioner().list_templates()
+        self.venv_template_menu.configure(values=["(nessuno)"] + templates)
+        if self.venv_template_menu.get() not in templates:
+            self.venv_template_menu.set("(nessuno)")
         
         # Get list of venv environments
         venvs = self.list_venvs()
@@ -563,6 +5539,10 @@ class EnvManagerWindow(ctk.CTkToplevel):
                                   command=lambda: self.clone_venv(name, path))
         clone_btn.pack(side="left", padx=2)
 
+        template_btn = ctk.CTkButton(frame, text="Template", width=100, fg_color="teal",
+                                     command=lambda: self.save_venv_template(name, path))
+        template_btn.pack(side="left", padx=2)
+
         delete_btn = ctk.CTkButton(frame, text="Elimina", width=100, fg_color="red",
                                    command=lambda: self.delete_venv(name, path))
         delete_btn.pack(side="left", padx=2)
@@ -602,6 +5582,8 @@ class EnvManagerWindow(ctk.CTkToplevel):
         venvs_dir = Path(".venvs")
         if venvs_dir.exists() and venvs_dir.is_dir():
             for item in venvs_dir.iterdir():
+                if item.name.startswith(".trash"):
+                    continue  # Environments being deleted (or left by an interrupted deletion)
                 if item.is_dir() and self._is_valid_venv(item):
                     venvs.append((f".venvs/{item.name}", str(item.absolute())))
 
@@ -672,11 +5654,17 @@ class EnvManagerWindow(ctk.CTkToplevel):
         self.venv_progress_label.configure(text=f"Creazione '{name}' in corso...")
         self.venv_progress_bar.set(0.3)
         
+        template = self.venv_template_menu.get()
+        template = None if template == "(nessuno)" else template
+        packages = self.venv_packages_entry.get().split()
+        offline = self.venv_offline_var.get()
+
         self.log_to_venv_console(f"Creazione ambiente Venv '{name}' in corso...\n")
         
         # Create environment in a separate thread
         q = queue.Queue()
-        thread = threading.Thread(target=self._create_venv_worker, args=(name, str(venv_path), q))
+        thread = threading.Thread(target=self._create_venv_worker,
+                                  args=(name, str(venv_path), q, template, packages, offline))
         thread.daemon = True
         thread.start()
         
@@ -691,34 +5679,57 @@ class EnvManagerWindow(ctk.CTkToplevel):
         # Reset progress after 3 seconds
         self.after(3000, lambda: self._reset_venv_progress())
     
-    def _create_venv_worker(self, name: str, path: str, q: queue.Queue):
+    def _create_venv_worker(self, name: str, path: str, q: queue.Queue, template: Optional[str] = None,
+                            packages: Optional[List[str]] = None, offline: bool = False):
         """Worker thread to create venv environment."""
+        provisioner = EnvProvisioner(offline=offline, log_callback=q.put)
         try:
-            process = subprocess.Popen(
-                [sys.executable, "-m", "venv", path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-            
-            # Read output line by line
-            for line in process.stdout:
-                q.put(line)
-            
-            process.wait()
-            
-            if process.returncode == 0:
-                q.put(f"✓ Ambiente '{name}' creato con successo!\n")
-                q.put("PROGRESS:100")  # Signal 100% progress
-            else:
-                q.put(f"✗ Errore durante la creazione dell'ambiente (codice: {process.returncode})\n")
-                q.put("PROGRESS:0")  # Signal error
+            strategy = provisioner.create(path, template=template, packages=packages)
+            q.put(f"✓ Ambiente '{name}' creato con successo! (metodo: {strategy})\n")
+            q.put(provisioner.format_timings())
+            q.put("PROGRESS:100")  # Signal 100% progress
         except Exception as e:
             q.put(f"✗ Errore: {str(e)}\n")
+            if provisioner.timings:
+                q.put(provisioner.format_timings())
             q.put("PROGRESS:0")
         finally:
             q.put(None)  # Signal completion
+
+    def save_venv_template(self, name: str, path: str):
+        """Store a venv as a template snapshot for fast environment creation."""
+        template_name = simpledialog.askstring("Salva Template", f"Nome del template da '{name}':",
+                                               initialvalue=Path(path).name)
+        if not template_name or not template_name.strip():
+            return
+        template_name = template_name.strip()
+
+        provisioner = EnvProvisioner()
+        if template_name in provisioner.list_templates():
+            messagebox.showerror("Errore", f"Un template con nome '{template_name}' esiste già.")
+            return
+
+        self.log_to_venv_console(f"Salvataggio template '{template_name}' da '{name}'...\n")
+        self.venv_progress_label.configure(text=f"Salvataggio template '{template_name}'...")
+
+        def worker(q: queue.Queue):
+            try:
+                stats = provisioner.save_template(template_name, path)
+                q.put(f"✓ Template '{template_name}' salvato ({format_bytes(stats['bytes'])})\n")
+                q.put(provisioner.format_timings())
+                q.put("PROGRESS:100")
+            except Exception as e:
+                q.put(f"✗ Errore durante il salvataggio del template: {str(e)}\n")
+                q.put("PROGRESS:0")
+            finally:
+                q.put(None)
+
+        q = queue.Queue()
+        thread = threading.Thread(target=worker, args=(q,))
+        thread.daemon = True
+        thread.start()
+
+        self.monitor_queue(q, self.venv_console, lambda: self._on_venv_operation_complete())
     
     def create_conda(self):
         """Create a new conda environment."""
@@ -737,7 +5748,8 @@ class EnvManagerWindow(ctk.CTkToplevel):
         
         # Create environment in a separate thread
         q = queue.Queue()
-        thread = threading.Thread(target=self._create_conda_worker, args=(name, python_ver, q))
+        thread = threading.Thread(target=self._create_conda_worker,
+                                  args=(name, python_ver, q, self.conda_offline_var.get()))
         thread.daemon = True
         thread.start()
         
@@ -752,11 +5764,19 @@ class EnvManagerWindow(ctk.CTkToplevel):
         # Reset progress after 3 seconds
         self.after(3000, lambda: self._reset_conda_progress())
     
-    def _create_conda_worker(self, name: str, python_ver: str, q: queue.Queue):
+    def _create_conda_worker(self, name: str, python_ver: str, q: queue.Queue, offline: bool = False):
         """Worker thread to create conda environment."""
+        start = time.perf_counter()
+        # mamba is a drop-in replacement for conda create with a much faster solver
+        solver = "mamba" if shutil.which("mamba") else "conda"
+        command = [solver, "create", "--name", name, f"python={python_ver}", "-y"]
+        if offline:
+            # Use only the local package cache (packages are hardlinked from pkgs/)
+            command.append("--offline")
+        q.put(f"Eseguendo comando: {' '.join(command)}\n")
         try:
             process = subprocess.Popen(
-                ["conda", "create", "--name", name, f"python={python_ver}", "-y"],
+                command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
@@ -777,6 +5797,7 @@ class EnvManagerWindow(ctk.CTkToplevel):
             
             if process.returncode == 0:
                 q.put(f"✓ Ambiente '{name}' creato con successo!\n")
+                q.put(f"⏱ Tempo totale {time.perf_counter() - start:.2f}s ({solver} create)\n")
                 q.put("PROGRESS:100")
             else:
                 q.put(f"✗ Errore durante la creazione dell'ambiente (codice: {process.returncode})\n")
@@ -795,13 +5816,108 @@ class EnvManagerWindow(ctk.CTkToplevel):
         if not messagebox.askyesno("Conferma Eliminazione", f"Sei sicuro di voler eliminare l'ambiente Venv '{name}'?\nQuesta azione non può essere annullata."):
             return
 
+        # Move the environment out of the way first so it disappears from the list immediately
+        try:
+            trash_path = self._move_to_trash(path)
+        except OSError as e:
+            self.log_to_venv_console(f"✗ Errore durante l'eliminazione: {str(e)}\n")
+            return
+        self.refresh_venv_list()
+
         self.log_to_venv_console(f"Eliminazione ambiente '{name}'...\n")
+        self.venv_progress_label.configure(text=f"Eliminazione '{name}' in corso...")
+        self.venv_progress_bar.set(0)
+
+        q = queue.Queue()
+        thread = threading.Thread(target=self._delete_venv_worker, args=(name, trash_path, q))
+        thread.daemon = True
+        thread.start()
+
+        self.monitor_queue(q, self.venv_console, lambda: self._on_venv_operation_complete())
+
+    def _move_to_trash(self, path: str) -> str:
+        """
+        Atomically move a venv into .venvs/.trash and return its new path.
+
+        If the trash is on a different filesystem the environment is renamed
+        to a hidden sibling instead, which is still an atomic operation. The
+        new path is claimed for the caller in the same locked step, so
+        purge_trash never removes it from under the deletion worker.
+        """
+        stamp = f"{Path(path).name}-{int(time.time() * 1000)}"
+        trash_dir = Path(".venvs") / ".trash"
+        trash_dir.mkdir(parents=True, exist_ok=True)
+        with self._trash_lock:
+            try:
+                trash_path = str(Path(path).rename(trash_dir / stamp).absolute())
+            except OSError:
+                trash_path = str(Path(path).rename(Path(path).parent / f".trash-{stamp}").absolute())
+            self._trash_active.add(trash_path)
+        return trash_path
+
+    # Trash paths being removed by a worker, skipped by purge_trash
+    _trash_active = set()
+    _trash_lock = threading.Lock()
+    # Hidden sibling used when the trash is on another filesystem: .trash-<name>-<milliseconds>
+    TRASH_SIBLING = re.compile(r"\.trash-.+-\d{13}$")
+
+    @classmethod
+    def trash_leftovers(cls) -> List[str]:
+        """Return the environments left in the trash (absolute paths)."""
+        leftovers = []
+        trash_dir = Path(".venvs") / ".trash"
+        if trash_dir.is_dir():
+            leftovers += list(trash_dir.iterdir())
+        for parent in (Path(".venvs"), Path(".")):
+            if parent.is_dir():
+                leftovers += [item for item in parent.iterdir()
+                              if item.is_dir() and cls.TRASH_SIBLING.match(item.name)]
+        return [str(item.absolute()) for item in leftovers]
+
+    @classmethod
+    def purge_trash(cls) -> int:
+        """Remove the leftovers of interrupted deletions (worker thread). Return how many were removed."""
+        removed = 0
+        for path in cls.trash_leftovers():
+            with cls._trash_lock:
+                if path in cls._trash_active:
+                    continue
+                cls._trash_active.add(path)
+            try:
+                TreeRemover(path).remove()
+                removed += 1
+            except OSError:
+                pass
+            finally:
+                with cls._trash_lock:
+                    cls._trash_active.discard(path)
+        return removed
+
+    def _delete_venv_worker(self, name: str, trash_path: str, q: queue.Queue):
+        """
+        Worker thread to delete a venv environment moved to the trash, then the older leftovers.
+
+        trash_path was claimed by _move_to_trash and is released here.
+        """
+        def report(done_files, total_files, done_bytes, total_bytes):
+            q.put(f"PROGRESS:{int(done_files * 100 / total_files) if total_files else 100}")
+            q.put(f"STATUS:Eliminazione {done_files}/{total_files} file "
+                  f"({format_bytes(done_bytes)} / {format_bytes(total_bytes)})")
+
         try:
-            shutil.rmtree(path)
-            self.log_to_venv_console(f"✓ Ambiente '{name}' eliminato con successo!\n")
-            self.refresh_venv_list()
+            stats = TreeRemover(trash_path).remove(report)
+            q.put(f"✓ Ambiente '{name}' eliminato con successo! "
+                  f"({stats['files']} file, {format_bytes(stats['bytes'])} in {stats['elapsed']:.1f}s)\n")
+            purged = self.purge_trash()
+            if purged:
+                q.put(f"Rimossi {purged} ambienti rimasti nel cestino da eliminazioni interrotte\n")
         except Exception as e:
-            self.log_to_venv_console(f"✗ Errore durante l'eliminazione: {str(e)}\n")
+            q.put(f"✗ Errore durante l'eliminazione: {str(e)}\n")
+            q.put("PROGRESS:0")
+        finally:
+            with self._trash_lock:
+                self._trash_active.discard(trash_path)
+            q.put(None)
 
     def rename_venv(self, name: str, path: str):
         """Rename a venv environment."""
@@ -819,13 +5935,31 @@ class EnvManagerWindow(ctk.CTkToplevel):
             messagebox.showerror("Errore", f"Un ambiente con nome '{new_name}' esiste già.")
             return
 
-        # Rename
+        # Rename and relocate scripts in a separate thread
+        self.venv_progress_label.configure(text=f"Rinominazione '{name}' in corso...")
+        self.venv_progress_bar.set(0)
+
+        q = queue.Queue()
+        thread = threading.Thread(target=self._rename_venv_worker,
+                                  args=(name, new_name, path, str(new_path.absolute()), q))
+        thread.daemon = True
+        thread.start()
+
+        self.monitor_queue(q, self.venv_console, lambda: self._on_venv_operation_complete())
+
+    def _rename_venv_worker(self, name: str, new_name: str, path: str, new_path: str, q: queue.Queue):
+        """Worker thread to rename a venv environment and fix its absolute paths."""
         try:
-            Path(path).rename(new_path)
-            self.log_to_venv_console(f"✓ Ambiente rinominato da '{name}' a '{new_name}'\n")
-            self.refresh_venv_list()
+            os.rename(path, new_path)
+            q.put("PROGRESS:50")
+            rewritten = VenvCloner.relocate(new_path, os.path.abspath(path))
+            q.put(f"✓ Ambiente rinominato da '{name}' a '{new_name}' ({rewritten} file aggiornati)\n")
+            q.put("PROGRESS:100")
         except Exception as e:
-            self.log_to_venv_console(f"✗ Errore durante la rinominazione: {str(e)}\n")
+            q.put(f"✗ Errore durante la rinominazione: {str(e)}\n")
+            q.put("PROGRESS:0")
+        finally:
+            q.put(None)
 
     def clone_venv(self, name: str, path: str):
         """Clone a venv environment."""
@@ -843,14 +5977,40 @@ class EnvManagerWindow(ctk.CTkToplevel):
             messagebox.showerror("Errore", f"Un ambiente con nome '{new_name}' esiste già.")
             return
 
-        # Clone (copy directory)
+        # Clone in a separate thread (reflink/hardlink + path relocation)
         self.log_to_venv_console(f"Clonazione ambiente '{name}' in '{new_name}'...\n")
+        self.venv_progress_label.configure(text=f"Clonazione '{name}' in corso...")
+        self.venv_progress_bar.set(0)
+
+        q = queue.Queue()
+        thread = threading.Thread(target=self._clone_venv_worker, args=(name, path, str(new_path), q))
+        thread.daemon = True
+        thread.start()
+
+        self.monitor_queue(q, self.venv_console, lambda: self._on_venv_operation_complete())
+
+    def _clone_venv_worker(self, name: str, path: str, new_path: str, q: queue.Queue):
+        """Worker thread to clone a venv environment."""
+        def report(done, total):
+            q.put(f"PROGRESS:{int(done * 100 / total) if total else 100}")
+            q.put(f"STATUS:Clonazione {format_bytes(done)} / {format_bytes(total)}")
+
         try:
-            shutil.copytree(path, str(new_path))
-            self.log_to_venv_console(f"✓ Ambiente '{name}' clonato in '{new_name}'\n")
-            self.refresh_venv_list()
+            stats = VenvCloner(path, new_path).clone(report)
+            q.put(f"✓ Ambiente '{name}' clonato in '{Path(new_path).name}' "
+                  f"({format_bytes(stats['bytes'])} in {stats['elapsed']:.1f}s)\n")
+            q.put(f"  reflink: {stats['reflinked']}, hardlink: {stats['hardlinked']}, "
+                  f"copiati: {stats['copied']}, percorsi riscritti: {stats['rewritten']}\n")
         except Exception as e:
-            self.log_to_venv_console(f"✗ Errore durante la clonazione: {str(e)}\n")
+            q.put(f"✗ Errore durante la clonazione: {str(e)}\n")
+            q.put("PROGRESS:0")
+        finally:
+            q.put(None)
+
+    def _on_venv_operation_complete(self):
+        """Called when a background venv operation (clone, delete, ...) completes."""
+        self.refresh_venv_list()
+        self.after(3000, lambda: self._reset_venv_progress())
 
     def delete_conda(self, name: str):
         """Delete a conda environment."""
@@ -952,6 +6112,12 @@ class EnvManagerWindow(ctk.CTkToplevel):
                         self.venv_progress_bar.set(progress_val / 100.0)
                     elif console == self.conda_console:
                         self.conda_progress_bar.set(progress_val / 100.0)
+                elif line.startswith("STATUS:"):
+                    status_text = line.split(":", 1)[1]
+                    if console == self.venv_console:
+                        self.venv_progress_label.configure(text=status_text)
+                    elif console == self.conda_console:
+                        self.conda_progress_label.configure(text=status_text)
                 else:
                     self.log_to_console(console, line)
         except queue.Empty:
@@ -1490,9 +6656,17 @@ class App(ctk.CTk):
         self.env_name = None
         self.env_path = None
         self.conda_exe = None  # Path to conda executable
-        self.files = []  # List of {"name": str, "path": str, "process": subprocess.Popen, "status": str}
+        self.files = []  # List of {"name": str, "path": str, "instances": [{"process", "status", "port"}], ...}
         self.config_file = "config_STARTER_GUI.json"
+        # Service logs are archived next to the config, whatever the services' working directory
+        log_archive.base_dir = os.path.join(os.path.dirname(os.path.abspath(self.config_file)), "logs")
         self.current_tab = None  # Track current tab for change detection
+        self.stop_grace = {"interrupt": 2.0, "terminate": 3.0}  # Seconds per stop phase
+        self.active_profile = "default"  # Launch profile (see LAUNCH_PROFILES)
+        self.stop_results = queue.Queue()  # (file_entry, reaped) from the stop threads
+        self._reload_watcher: Optional[FileWatcher] = None  # Sources of the files with hot reload
+        self._reload_key = ((), ())  # (roots, patterns) of the running watcher
+        self._learning_ports = False  # A port learning scan is running in background
 
         # CORREZIONE: Trova la root del repo invece di usare la CWD
         repo_path = find_git_repo_root()
@@ -1514,7 +6688,19 @@ class App(ctk.CTk):
 
         # Monitor log queue
         self.monitor_log_queue()
+
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def on_closing(self):
+        """Stop the running process trees (bounded time) and close the window."""
+        pids = [slot["process"].pid for f in self.files for slot in self._instances(f)
+                if slot["process"] and slot["process"].poll() is None]
+        if pids:
+            self.get_stopper().stop(pids)
+        if self._reload_watcher:
+            self._reload_watcher.stop()
+        self.destroy()
+
     def setup_gui(self):
         """Setup the main GUI."""
         # Crea tabview principale con la command per il cambio tab
@@ -1563,10 +6749,26 @@ class App(ctk.CTk):
                                       command=self.test_cuda_pytorch)
         test_cuda_btn.pack(side="left", padx=5)
 
+        benchmark_btn = ctk.CTkButton(buttons_frame, text="Benchmark CPU",
+                                      command=self.open_benchmark)
+        benchmark_btn.pack(side="left", padx=5)
+
+        import_profile_btn = ctk.CTkButton(buttons_frame, text="Profilo Import",
+                                           command=self.profile_module_imports)
+        import_profile_btn.pack(side="left", padx=5)
+
         process_btn = ctk.CTkButton(buttons_frame, text="Processi Localhost",
                                    command=self.show_process_viewer)
         process_btn.pack(side="left", padx=5)
 
+        load_test_btn = ctk.CTkButton(buttons_frame, text="Load Test", command=self.open_load_test)
+        load_test_btn.pack(side="left", padx=5)
+
+        # Progress of dependency installation (per package)
+        self.install_progress_bar = ctk.CTkProgressBar(env_frame)
+        self.install_progress_bar.grid(row=2, column=0, columnspan=2, padx=5, pady=(0, 5), sticky="ew")
+        self.install_progress_bar.set(0)
+
         # Files section
         files_label = ctk.CTkLabel(main_tab, text="File da Avviare:", font=("Arial", 14, "bold"))
         files_label.pack(pady=(10, 5), padx=10, anchor="w")
@@ -1576,13 +6778,26 @@ class App(ctk.CTk):
         self.files_frame.pack(pady=5, padx=10, fill="both", expand=True)
 
         # Add file button
-        add_file_btn = ctk.CTkButton(main_tab, text="➕ Aggiungi File", command=self.add_file)
-        add_file_btn.pack(pady=5)
+        add_frame = ctk.CTkFrame(main_tab, fg_color="transparent")
+        add_frame.pack(pady=5)
+        add_file_btn = ctk.CTkButton(add_frame, text="➕ Aggiungi File", command=self.add_file)
+        add_file_btn.pack(side="left", padx=5)
+        add_target_btn = ctk.CTkButton(add_frame, text="➕ Aggiungi Modulo/Comando", command=self.add_target)
+        add_target_btn.pack(side="left", padx=5)
 
         # Shell launch option
         self.shell_checkbox = ctk.CTkCheckBox(main_tab, text="Lancia in nuova shell")
         self.shell_checkbox.pack(pady=5)
 
+        # Launch profile selector
+        profile_frame = ctk.CTkFrame(main_tab, fg_color="transparent")
+        profile_frame.pack(pady=5)
+        ctk.CTkLabel(profile_frame, text="Profilo di avvio:").pack(side="left", padx=5)
+        self.profile_selector = ctk.CTkSegmentedButton(profile_frame, values=list(LAUNCH_PROFILES),
+                                                       command=self.set_active_profile)
+        self.profile_selector.set("default")
+        self.profile_selector.pack(side="left", padx=5)
+
         # Control buttons
         control_frame = ctk.CTkFrame(main_tab)
         control_frame.pack(pady=10, padx=10, fill="x")
@@ -1600,8 +6815,19 @@ class App(ctk.CTk):
         save_btn.pack(side="left", padx=5, expand=True, fill="x")
 
         # Log output section
-        log_label = ctk.CTkLabel(main_tab, text="Log Output:", font=("Arial", 14, "bold"))
-        log_label.pack(pady=(10, 5), padx=10, anchor="w")
+        log_header = ctk.CTkFrame(main_tab, fg_color="transparent")
+        log_header.pack(pady=(10, 5), padx=10, fill="x")
+        log_label = ctk.CTkLabel(log_header, text="Log Output:", font=("Arial", 14, "bold"))
+        log_label.pack(side="left")
+        # Filters use the fields parsed by the reader threads (see LogBuffer)
+        archive_btn = ctk.CTkButton(log_header, text="🗄 Archivio", width=90, command=self.open_log_archive)
+        archive_btn.pack(side="right", padx=5)
+        self.log_service_menu = ctk.CTkOptionMenu(log_header, values=[self.ALL_SERVICES], width=160,
+                                                  command=lambda _: self.apply_log_filter())
+        self.log_service_menu.pack(side="right", padx=5)
+        self.log_level_menu = ctk.CTkOptionMenu(log_header, values=[self.ALL_LEVELS] + list(LOG_LEVELS), width=130,
+                                                command=lambda _: self.apply_log_filter())
+        self.log_level_menu.pack(side="right", padx=5)
 
         self.log_console = ctk.CTkTextbox(main_tab, height=150, state="disabled")
         self.log_console.pack(pady=5, padx=10, fill="both", expand=True)
@@ -1732,24 +6958,58 @@ con un supporto integrato per ambienti virtuali Python e Git.
 Ambiente Attivo:
 Mostra l'ambiente Python (Venv/Conda) attualmente selezionato.
 • Gestisci Ambienti: Apre una finestra per creare, eliminare, clonare e selezionare ambienti Venv o Conda.
+  I Venv possono essere salvati come "Template" e ricreati istantaneamente; con "Offline" si usano solo wheel e cache locali.
 • Installa Dipendenze: Installa le librerie da un file `requirements.txt` nell'ambiente attivo.
-• Verifica Librerie: Mostra un elenco di tutte le librerie installate nell'ambiente attivo.
+  Le dipendenze vengono risolte una volta, scaricate in parallelo nella cache locale (.venvs/.wheelhouse) e installate da lì.
+• Verifica Librerie: Mostra una tabella (ordinabile e filtrabile) delle librerie installate nell'ambiente attivo,
+  con versione, dimensione e dipendenze, letta direttamente dai metadati su disco.
 • Editor Requirements: Apre un semplice editor di testo per creare o modificare file `requirements.txt`.
+  "Installa" mostra prima le differenze con l'ambiente (da installare, da aggiornare, già soddisfatti, conflitti) e installa solo il delta.
 • Test CUDA/PyTorch: Esegue un test per verificare se PyTorch è installato e se rileva correttamente la GPU (CUDA).
+• Benchmark CPU: Misura GFLOPS di matmul NumPy/PyTorch (con scalabilità sui thread), banda di memoria e velocità di Python
+  nell'ambiente attivo; i risultati sono salvati per ambiente in `benchmarks_STARTER_GUI/` e confrontati affiancati.
+• Profilo Import: Misura con `-X importtime` il tempo di import di una lista di moduli nell'ambiente attivo.
 • Processi Localhost: Mostra i processi attivi sulla tua macchina che sono in ascolto su porte locali (es. web server).
+• Load Test: Invia richieste HTTP a un servizio avviato dalla lista (porta rilevata automaticamente) con N connessioni
+  keep-alive per la durata scelta; mostra richieste/s, errori, latenza p50/p90/p99 e CPU/RSS del servizio durante il test.
 
 File da Avviare:
 Elenco degli script che vuoi gestire.
 • ➕ Aggiungi File: Seleziona uno script Python (.py) o un eseguibile da aggiungere alla lista.
+• ➕ Aggiungi Modulo/Comando: Aggiunge un modulo (-m pacchetto.modulo), un entry point dell'ambiente
+  (es. uvicorn app:app) o un comando qualsiasi, con i suoi argomenti.
 • ▶ (Avvia): Esegue lo script selezionato. L'output verrà mostrato nella console "Log Output".
 • ⏹ (Ferma): Termina il processo dello script.
+• ⏱ (Profilo Import): Misura il tempo di import dello script e lo confronta con le esecuzioni precedenti.
+• 🔬 (Profila): Raccoglie N secondi di stack di un'istanza: con py-spy (se installato) senza fermarla, oppure
+  riavviandola sotto il campionatore integrato o cProfile. Il risultato si apre come flamegraph e tabella delle funzioni.
+• ⚙ (Impostazioni): Argomenti, cartella di lavoro, flag dell'interprete (es. -X importtime, -O) e variabili d'ambiente,
+  per il profilo "default" o come differenze per un profilo specifico.
+  Con "Metriche dai log di accesso" sotto il file compaiono richieste/s, p50/p95/p99 della latenza e la quota
+  di errori 5xx, ricavati dai log di uvicorn, Flask, gunicorn o JSON senza modificare il servizio.
+  Con "Traccia memoria (tracemalloc)" il servizio viene avviato con tracemalloc: sotto il file compare la memoria
+  tracciata e la sua tendenza (MB/h); un clic apre i punti di allocazione che crescono di più.
+  Con "Hot reload" il servizio viene riavviato quando si salva un file .py della sua cartella (solo le istanze
+  in esecuzione, con arresto graduale; più salvataggi ravvicinati producono un solo riavvio).
+• − / + (Istanze): Cambia il numero di istanze avviate; {instance} e {port} negli argomenti e nelle variabili
+  vengono sostituiti per ogni istanza. I pallini mostrano lo stato di ciascuna istanza.
 • 🗑 (Rimuovi): Rimuove lo script dalla lista.
 • Lancia in nuova shell: Se spuntato, gli script verranno eseguiti in una nuova finestra del terminale anziché all'interno dell'app.
+• Profilo di avvio: Sceglie con un clic il profilo (default/dev/bench/prod) usato per i prossimi avvii.
 
 Controlli Globali:
 • Avvia Tutti / Ferma Tutti: Esegue o termina tutti gli script nella lista.
 • Salva Configurazione: Salva l'ambiente attivo e la lista di file nel file `config_STARTER_GUI.json` per caricarli al prossimo avvio.
 
+Log Output:
+• I log JSON, logfmt, del modulo logging e di uvicorn vengono riconosciuti: livello, orario e logger sono estratti
+  automaticamente (le righe di traceback ereditano il livello della riga precedente).
+• Filtri livello / servizio: Mostrano solo le righe dal livello scelto in su e/o di un solo file (tutte le istanze).
+  Gli ultimi 100.000 messaggi restano in memoria, la console ne mostra 5.000.
+• 🗄 Archivio: Tutto l'output viene salvato anche su disco in logs/<servizio>/ (segmenti compressi con gzip o zstd).
+  Mostra le ultime righe, parte da un orario (15m, 2h o una data) e cerca testo anche in ore di storico.
+  Da terminale: python universal_STARTER_GUI.py logs <servizio> [-n 200] [--since 2h] [--grep testo] [-f]
+
 --- Sezione Git Status ---
 
 Questa sezione fornisce un'interfaccia visuale per il tuo repository Git.
@@ -1923,8 +7183,48 @@ RIFERIMENTI RAPIDI:
         """Open the localhost process viewer window."""
         ProcessViewer(self)
 
-    def install_dependencies(self, req_file=None):
-        """Install dependencies from requirements.txt in the selected environment."""
+    @staticmethod
+    def load_test_targets(running: List[Tuple[str, int]]) -> List[Dict]:
+        """Return the listening ports of the running instances [(name, pid)] as load test targets."""
+        index = localhost_scanner.listening_addresses()
+        targets = []
+        for name, root in running:
+            addresses = set()
+            for pid in process_tree_pids(root):
+                addresses.update(index.get(pid, ()))
+            for port, ip in sorted(addresses):
+                host = "::1" if ip == "::" else "127.0.0.1" if ip in ("0.0.0.0", "") else ip
+                if any(t["port"] == port for t in targets):
+                    continue
+                targets.append({"label": f"{name} :{port}", "host": host, "port": port, "pid": root})
+        return targets
+
+    def open_load_test(self):
+        """Open the load test panel for the running services (the socket scan runs in background)."""
+        running = [(self.instance_name(file_entry, slot), slot["process"].pid)
+                   for file_entry in self.files for slot in self._instances(file_entry)
+                   if slot["process"] and slot["process"].poll() is None]
+        self.run_in_background(lambda: self.load_test_targets(running),
+                               lambda targets: LoadTestWindow(self, targets))
+
+    def open_benchmark(self):
+        """Open the CPU benchmark window for the active environment."""
+        if not self.env_type:
+            messagebox.showerror("Errore", "Selezionare un ambiente prima di eseguire il benchmark.")
+            return
+        command = self.get_python_command()
+        if not command:
+            messagebox.showerror("Errore", "Tipo ambiente non supportato.")
+            return
+        BenchmarkWindow(self, command, self.env_name)
+
+    def install_dependencies(self, req_file=None, delete_after: bool = False):
+        """
+        Install dependencies from requirements.txt in the selected environment.
+
+        If delete_after is True req_file is a temporary file removed once the
+        installation has finished.
+        """
         if not self.env_type:
             messagebox.showerror("Errore", "Selezionare un ambiente prima di installare dipendenze.")
             return
@@ -1940,33 +7240,89 @@ RIFERIMENTI RAPIDI:
 
         log_queue.put(f"Installazione dipendenze da {req_file} nell'ambiente {self.env_name}...\n")
 
-        # Build pip command
-        if self.env_type == "conda":
-            command = [self.conda_exe or "conda", "run", "-n", self.env_name, "pip", "install", "-r", req_file]
-        elif self.env_type == "venv":
-            if os.name == "nt":  # Windows
-                python_exe = os.path.join(self.env_path, "Scripts", "python.exe")
-            else:  # Unix-like
-                python_exe = os.path.join(self.env_path, "bin", "python")
-            command = [python_exe, "-m", "pip", "install", "-r", req_file]
-        else:
+        # Build interpreter command (pip is run through it by the install pipeline)
+        command = self.get_python_command()
+        if not command:
             log_queue.put("Errore: Tipo ambiente non supportato per installazione dipendenze.\n")
             return
 
-        # Validate command
-        if not self._validate_command(command):
+        # Validate command
+        if not self._validate_command(command):
+            return
+
+        # Log command
+        log_queue.put(f"Eseguendo: {' '.join(command)} -m pip (risoluzione, download parallelo, installazione)\n")
+        self.install_progress_bar.set(0)
+
+        # Run installation in a thread
+        q = queue.Queue()
+        thread = threading.Thread(target=run_install_pipeline, args=(command, req_file, q, delete_after, self.get_launch_env()))
+        thread.daemon = True
+        thread.start()
+
+        monitor_install_queue(q, self)
+
+    def get_activator(self) -> EnvActivator:
+        """Return the (cached) activation layer of the active environment."""
+        key = (self.env_type, self.env_name, self.env_path)
+        if getattr(self, "_activator_key", None) != key:
+            self._activator = EnvActivator(self.env_type, self.env_name, self.env_path,
+                                           self.conda_exe or self.find_conda_executable())
+            self._activator_key = key
+        return self._activator
+
+    def get_python_command(self) -> Optional[List[str]]:
+        """Return the command prefix running the interpreter of the active environment."""
+        if self.env_type == "conda" and self.env_name:
+            # Launch the env interpreter directly; conda run only if the prefix is unknown
+            python_exe = self.get_activator().python_executable()
+            if python_exe:
+                return [python_exe]
+            return [self.conda_exe or "conda", "run", "--no-capture-output", "-n", self.env_name, "python"]
+        elif self.env_type == "venv" and self.env_path:
+            if os.name == "nt":  # Windows
+                return [os.path.join(self.env_path, "Scripts", "python.exe")]
+            return [os.path.join(self.env_path, "bin", "python")]
+        return None
+
+    def get_launch_env(self, overrides: Optional[Dict[str, Optional[str]]] = None, instance: int = 0,
+                       port: Optional[int] = None) -> Dict[str, str]:
+        """
+        Return the activated environment variables for processes started in the active environment.
+
+        Per-file overrides are applied on top, with {instance} and {port}
+        replaced for the instance being launched.
+        """
+        activator = self.get_activator()
+        if activator.prefix and activator.snapshot(compute=False) is None:
+            # Never source the activation scripts on the GUI thread
+            log_queue.put("Snapshot di attivazione non ancora pronto: avvio con le variabili di base\n")
+            self.warm_activation_snapshot()
+        env = activator.environment(compute_snapshot=False)
+        if overrides:
+            apply_env_overrides(env, {key: None if value is None else expand_instance_template(value, instance, port)
+                                      for key, value in overrides.items()})
+        return env
+
+    def warm_activation_snapshot(self):
+        """Compute the activation snapshot of the active environment in background."""
+        activator = self.get_activator()
+        if not activator.prefix:
             return
 
-        # Log command
-        log_queue.put(f"Eseguendo comando: {' '.join(command)}\n")
+        def worker():
+            try:
+                variables = activator.snapshot()
+                if variables:
+                    log_queue.put(f"Snapshot attivazione pronto: {len(variables)} variabili da {activator.prefix}\n")
+            except Exception as e:
+                log_queue.put(f"Errore snapshot attivazione: {e}\n")
 
-        # Run installation in a thread
-        q = queue.Queue()
-        thread = threading.Thread(target=run_install_command, args=(command, q))
-        thread.daemon = True
-        thread.start()
+        threading.Thread(target=worker, daemon=True).start()
 
-        monitor_install_queue(q, self)
+    def get_env_prefix(self) -> Optional[str]:
+        """Return the prefix directory of the active environment, if it can be found on disk."""
+        return self.get_activator().prefix
 
     def verify_libraries(self):
         """Verify installed libraries in the selected environment."""
@@ -1974,6 +7330,18 @@ RIFERIMENTI RAPIDI:
             messagebox.showerror("Errore", "Selezionare un ambiente prima di verificare le librerie.")
             return
 
+        # Fast path: read the metadata directly from site-packages
+        prefix = self.get_env_prefix()
+        site_packages = find_site_packages(prefix) if prefix else []
+        if site_packages:
+            start = time.perf_counter()
+            packages = SitePackagesInspector(site_packages).packages()
+            log_queue.put(f"Verifica librerie: {len(packages)} pacchetti letti da "
+                          f"{', '.join(site_packages)} in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+            LibraryViewer(self, f"Librerie in {self.env_name}", packages)
+            return
+
+        # Fallback: ask pip in the environment
         # Create popup window
         popup = ctk.CTkToplevel(self)
         popup.title(f"Librerie in {self.env_name}")
@@ -1986,17 +7354,11 @@ RIFERIMENTI RAPIDI:
         text.pack(pady=10, padx=10, fill="both", expand=True)
 
         # Build command
-        if self.env_type == "conda":
-            command = [self.conda_exe or "conda", "run", "-n", self.env_name, "pip", "list"]
-        elif self.env_type == "venv":
-            if os.name == "nt":  # Windows
-                python_exe = os.path.join(self.env_path, "Scripts", "python.exe")
-            else:  # Unix-like
-                python_exe = os.path.join(self.env_path, "bin", "python")
-            command = [python_exe, "-m", "pip", "list"]
-        else:
+        python_command = self.get_python_command()
+        if not python_command:
             text.insert("end", "Tipo ambiente non supportato.\n")
             return
+        command = python_command + ["-m", "pip", "list"]
 
         # Validate command
         if not self._validate_command(command):
@@ -2008,14 +7370,14 @@ RIFERIMENTI RAPIDI:
 
         # Run command in thread
         q = queue.Queue()
-        thread = threading.Thread(target=self._run_verify_command, args=(command, q))
+        thread = threading.Thread(target=self._run_verify_command, args=(command, q, self.get_launch_env()))
         thread.daemon = True
         thread.start()
 
         # Monitor queue
         self._monitor_verify_queue(q, text)
 
-    def _run_verify_command(self, command: List[str], q: queue.Queue):
+    def _run_verify_command(self, command: List[str], q: queue.Queue, env: Optional[Dict[str, str]] = None):
         """Run the verify command and put output into queue."""
         try:
             process = subprocess.Popen(
@@ -2023,7 +7385,8 @@ RIFERIMENTI RAPIDI:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
-                bufsize=1
+                bufsize=1,
+                env=env
             )
 
             for line in process.stdout:
@@ -2110,18 +7473,12 @@ except Exception as e:
             temp_file = f.name
 
         # Build command
-        if self.env_type == "conda":
-            command = [self.conda_exe or "conda", "run", "-n", self.env_name, "python", temp_file]
-        elif self.env_type == "venv":
-            if os.name == "nt":  # Windows
-                python_exe = os.path.join(self.env_path, "Scripts", "python.exe")
-            else:  # Unix-like
-                python_exe = os.path.join(self.env_path, "bin", "python")
-            command = [python_exe, temp_file]
-        else:
+        python_command = self.get_python_command()
+        if not python_command:
             text.insert("end", "Tipo ambiente non supportato.\n")
             os.unlink(temp_file)
             return
+        command = python_command + [temp_file]
 
         # Validate command
         if not self._validate_command(command):
@@ -2134,14 +7491,15 @@ except Exception as e:
 
         # Run command in thread
         q = queue.Queue()
-        thread = threading.Thread(target=self._run_test_command, args=(command, temp_file, q))
+        thread = threading.Thread(target=self._run_test_command, args=(command, temp_file, q, self.get_launch_env()))
         thread.daemon = True
         thread.start()
 
         # Monitor queue
         self._monitor_verify_queue(q, text)
 
-    def _run_test_command(self, command: List[str], temp_file: str, q: queue.Queue):
+    def _run_test_command(self, command: List[str], temp_file: str, q: queue.Queue,
+                          env: Optional[Dict[str, str]] = None):
         """Run the test command and put output into queue, then clean up temp file."""
         try:
             process = subprocess.Popen(
@@ -2149,7 +7507,8 @@ except Exception as e:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
-                bufsize=1
+                bufsize=1,
+                env=env
             )
 
             for line in process.stdout:
@@ -2169,6 +7528,264 @@ except Exception as e:
             except:
                 pass
 
+    def wrapper_target(self, file_entry: Dict) -> Tuple[str, str]:
+        """
+        Return (launch type, target) of a file for the Python launch wrappers ("script" or "module").
+
+        Raises:
+            ValueError: If the file is not run by the Python interpreter
+        """
+        launch_type = file_entry.get("type", "script")
+        target = file_entry["path"]
+        if launch_type == "entry_point":
+            target = self.find_entry_point(target) or ""
+            if not self._is_python_script(target):
+                raise ValueError("Entry point non Python: usare py-spy")
+            return "script", target
+        if launch_type == "command" or (launch_type == "script" and not target.endswith(".py")):
+            raise ValueError("Profilo e tracemalloc sono possibili solo per script e moduli Python")
+        return launch_type, target
+
+    def profile_command(self, file_entry: Dict, interpreter_flags: List[str], args: List[str],
+                        profile: Dict) -> List[str]:
+        """Return the command relaunching a file under the profiling wrapper."""
+        launch_type, target = self.wrapper_target(file_entry)
+        return ServiceProfiler.wrap_command(self.python_launcher(), interpreter_flags, launch_type, target, args,
+                                            profile["mode"], profile["seconds"], profile["output"])
+
+    def get_memory_server(self) -> MemoryTraceServer:
+        """Return the endpoint of the tracemalloc reports, started on first use."""
+        if getattr(self, "_memory_server", None) is None:
+            self._memory_server = MemoryTraceServer()
+        return self._memory_server
+
+    def tracemalloc_command(self, file_entry: Dict, name: str, interpreter_flags: List[str],
+                            args: List[str]) -> List[str]:
+        """Return the command launching an instance with tracemalloc reporting to the launcher."""
+        launch_type, target = self.wrapper_target(file_entry)
+        settings = file_entry.get("tracemalloc")
+        interval = settings.get("interval", 10) if isinstance(settings, dict) else 10
+        config = self.get_memory_server().config(name, interval=interval)
+        return python_wrapper_command(TRACEMALLOC_WRAPPER_SCRIPT, self.python_launcher(), interpreter_flags,
+                                      launch_type, target, args, config)
+
+    def open_memory_window(self, index: int):
+        """Show the allocation sites growing the most in the instances of a file."""
+        file_entry = self.files[index]
+        names = [self.instance_name(file_entry, slot) for slot in self._instances(file_entry)]
+        MemoryWindow(self, self.get_memory_server(), names)
+
+    def update_memory_labels(self):
+        """Show traced memory and its trend for the files launched with tracemalloc."""
+        server = getattr(self, "_memory_server", None)
+        if server is None:
+            return
+        for file_entry in self.files:
+            label = file_entry.get("memory_label")
+            if label is None:
+                continue
+            current = 0
+            rates = []
+            for slot in self._instances(file_entry):
+                name = self.instance_name(file_entry, slot)
+                report = server.report(name)
+                if report and slot["process"]:
+                    current += report["current"]
+                    rate = server.growth_rate(name)
+                    if rate is not None:
+                        rates.append(rate)
+            if not current:
+                continue
+            text = f"🧠 tracciati {format_bytes(current)}"
+            if rates:
+                rate = sum(rates)
+                text += f" · {'+' if rate > 0 else ''}{format_bytes(rate)}/h"
+            label.configure(text=text)
+
+    def profile_running_file(self, index: int):
+        """Profile an instance of a file for N seconds: attach py-spy or relaunch it under a profiler."""
+        file_entry = self.files[index]
+        slots = self._instances(file_entry)
+        running = [slot for slot in slots if slot["process"] and slot["process"].poll() is None]
+        profiler = ServiceProfiler()
+        activator = self.get_activator()
+        py_spy = profiler.find_py_spy(activator.bin_dirs() if activator.prefix else None)
+        try:
+            # The relaunch modes need the wrapper command: check before anything is stopped
+            self.wrapper_target(file_entry)
+            relaunch_error = None
+        except ValueError as e:
+            relaunch_error = str(e)
+        modes = {key: label for key, label in ServiceProfiler.MODES.items()
+                 if (key == "py-spy" and py_spy and running) or (key != "py-spy" and relaunch_error is None)}
+        if not modes:
+            hint = "avviare il file per collegare py-spy" if py_spy else "py-spy non trovato"
+            messagebox.showerror("Profila", f"{relaunch_error} ({hint})")
+            return
+
+        popup = ctk.CTkToplevel(self)
+        popup.title(f"Profila - {file_entry['name']}")
+        popup.geometry("460x230")
+        popup.transient(self)
+        popup.grab_set()
+        form = ctk.CTkFrame(popup)
+        form.pack(fill="both", expand=True, padx=10, pady=10)
+        names = {self.instance_name(file_entry, slot): slot for slot in (running or slots[:1])}
+        instance_var = ctk.StringVar(value=next(iter(names)))
+        ctk.CTkLabel(form, text="Istanza:").grid(row=0, column=0, sticky="w", padx=5, pady=3)
+        ctk.CTkOptionMenu(form, variable=instance_var, values=list(names)).grid(row=0, column=1, sticky="ew", padx=5)
+        ctk.CTkLabel(form, text="Metodo:").grid(row=1, column=0, sticky="w", padx=5, pady=3)
+        mode_var = ctk.StringVar(value=next(iter(modes.values())))
+        ctk.CTkOptionMenu(form, variable=mode_var, values=list(modes.values())).grid(row=1, column=1, sticky="ew", padx=5)
+        ctk.CTkLabel(form, text="Secondi:").grid(row=2, column=0, sticky="w", padx=5, pady=3)
+        seconds_entry = ctk.CTkEntry(form, width=80)
+        seconds_entry.insert(0, "10")
+        seconds_entry.grid(row=2, column=1, sticky="w", padx=5)
+        note = "py-spy non trovato: i metodi con riavvio fermano e riavviano l'istanza" if not py_spy else \
+            "I metodi con riavvio fermano e riavviano l'istanza"
+        if relaunch_error:
+            note = f"Metodi con riavvio non disponibili: {relaunch_error}"
+        ctk.CTkLabel(form, text=note, text_color="gray", wraplength=420).grid(row=3, column=0, columnspan=2, pady=5)
+
+        def start():
+            try:
+                seconds = float(seconds_entry.get())
+                if seconds <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Errore", "Durata non valida", parent=popup)
+                return
+            mode = next(key for key, label in modes.items() if label == mode_var.get())
+            name = instance_var.get()
+            slot = names[name]
+            output = profiler.output_path(name, mode)
+            popup.destroy()
+            if mode == "py-spy":
+                self._profile_with_py_spy(name, py_spy, slot["process"].pid, seconds, output)
+            else:
+                self._profile_relaunch(index, slot, name, mode, seconds, output)
+
+        ctk.CTkButton(popup, text="Avvia", command=start).pack(pady=(0, 10))
+
+    def _profile_with_py_spy(self, name: str, py_spy: str, pid: int, seconds: float, output: str):
+        """Attach py-spy to a running process tree in background and show the result."""
+        log_queue.put(f"[{name}] py-spy: raccolta di {seconds:.0f} s di stack...\n")
+        command = ServiceProfiler.py_spy_command(py_spy, pid, seconds, output)
+
+        def worker():
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=seconds + 60)
+                error = None if result.returncode == 0 and os.path.exists(output) else \
+                    (result.stderr.strip() or f"py-spy terminato con codice {result.returncode}")
+            except (OSError, subprocess.TimeoutExpired) as e:
+                error = str(e)
+            if error:
+                log_queue.put(f"[{name}] py-spy: {error}\n"
+                              f"(su Linux può servire ptrace: sudo o kernel.yama.ptrace_scope=0; "
+                              f"in alternativa usare il campionatore con riavvio)\n")
+            else:
+                self.after(0, lambda: self.show_profile(name, output))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _profile_relaunch(self, index: int, slot: Dict, name: str, mode: str, seconds: float, output: str):
+        """Restart an instance under the profiling wrapper and wait for its result file."""
+        try:
+            self.wrapper_target(self.files[index])
+        except ValueError as e:
+            log_queue.put(f"[{name}] {e}\n")
+            return
+        slot["profile"] = {"mode": mode, "seconds": seconds, "output": output}
+        self._stop_instance(self.files[index], slot)
+        log_queue.put(f"[{name}] Riavvio con {ServiceProfiler.MODES[mode]}: {seconds:.0f} s di profilo\n")
+
+        def start_when_stopped():
+            if slot["status"] == "stopping":
+                self.after(200, start_when_stopped)
+                return
+            self.start_file(index, instances=[slot["instance"]], done=started)
+
+        def started():
+            if slot["process"] is None:
+                slot.pop("profile", None)
+                return
+            wait_result(time.time() + seconds + 30)
+
+        def wait_result(deadline: float):
+            if os.path.exists(output):
+                self.show_profile(name, output)
+            elif slot["process"] is None or time.time() > deadline:
+                log_queue.put(f"[{name}] Profilo non prodotto (processo terminato o tempo scaduto)\n")
+            else:
+                self.after(500, lambda: wait_result(deadline))
+
+        start_when_stopped()
+
+    def show_profile(self, name: str, output: str):
+        """Open the flamegraph/top functions window of a result file."""
+        try:
+            profile = StackProfile.load(output)
+        except (OSError, ValueError, EOFError) as e:
+            messagebox.showerror("Errore", f"Profilo non leggibile: {e}")
+            return
+        log_queue.put(f"[{name}] Profilo salvato in {output}\n")
+        ProfileWindow(self, profile, name)
+
+    def profile_file_imports(self, index: int):
+        """Profile the import time of a launched file in the active environment."""
+        file_entry = self.files[index]
+        if file_entry.get("type") == "module":
+            module = file_entry["path"]
+            self._run_import_profile(module, lambda profiler: profiler.profile([module]))
+            return
+        if file_entry.get("type", "script") != "script" or not file_entry["path"].endswith(".py"):
+            messagebox.showinfo("Info", "Il profilo degli import è disponibile solo per script Python e moduli.")
+            return
+        self._run_import_profile(file_entry["path"], lambda profiler: profiler.profile_script(file_entry["path"]))
+
+    def profile_module_imports(self):
+        """Profile the import time of a list of modules in the active environment."""
+        modules = simpledialog.askstring("Profilo Import", "Moduli da importare (separati da spazio o virgola):")
+        if not modules:
+            return
+        module_list = [m for m in modules.replace(",", " ").split() if m]
+        if not module_list:
+            return
+        self._run_import_profile(" ".join(module_list), lambda profiler: profiler.profile(module_list))
+
+    def _run_import_profile(self, target: str, run):
+        """Run an import profile in a thread and show the result."""
+        command = self.get_python_command() or [sys.executable]
+        env_name = self.env_name or "system"
+        log_queue.put(f"Profilo import di {target} in {env_name}...\n")
+
+        q = queue.Queue()
+
+        def worker():
+            try:
+                profiler = ImportProfiler(command)
+                result = run(profiler)
+                previous = profiler.record(target, env_name, result)
+                q.put(("ok", result, previous))
+            except Exception as e:
+                q.put(("error", str(e), None))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+        def wait():
+            try:
+                status, result, previous = q.get_nowait()
+            except queue.Empty:
+                self.after(100, wait)
+                return
+            if status == "error":
+                log_queue.put(f"Errore profilo import: {result}\n")
+                return
+            log_queue.put(f"Profilo import di {target}: {result['total_us'] / 1000:.1f} ms\n")
+            ImportProfileViewer(self, target, result, previous)
+
+        wait()
+
     def on_environment_selected(self, env_type: str, name: str, path: str = None):
         """Callback when an environment is selected."""
         self.env_type = env_type
@@ -2194,6 +7811,7 @@ except Exception as e:
         elif env_type == "conda":
             self.env_label.configure(text=f"Conda: {name}", text_color="blue")
         
+        self.warm_activation_snapshot()
         self.save_config()
     
     def add_file(self):
@@ -2213,14 +7831,42 @@ except Exception as e:
             file_entry = {
                 "name": file_name,
                 "path": file_path,
-                "process": None,
-                "status": "stopped"
+                "env": {}
             }
             
             self.files.append(file_entry)
             self.add_file_widget(len(self.files) - 1)
             self.save_config()
     
+    def add_target(self):
+        """Add a module (-m), console script entry point or command to the list."""
+        text = simpledialog.askstring(
+            "Aggiungi Modulo/Comando",
+            "Comando da avviare, es.:\n  -m http.server 8000\n  uvicorn app:app --port 8001\n  redis-server --port 6380")
+        if not text:
+            return
+        try:
+            launch_type, target, args = parse_launch_spec(text)
+        except ValueError as e:
+            messagebox.showerror("Errore", str(e))
+            return
+        if launch_type == "command" and self.find_entry_point(target):
+            launch_type = "entry_point"
+        if any(f["path"] == target and f.get("type", "script") == launch_type and f.get("args", []) == args
+               for f in self.files):
+            return
+
+        file_entry = {
+            "name": target if launch_type != "script" else Path(target).name,
+            "path": target,
+            "type": launch_type,
+            "args": args,
+            "env": {}
+        }
+        self.files.append(file_entry)
+        self.add_file_widget(len(self.files) - 1)
+        self.save_config()
+
     def add_file_widget(self, index: int):
         """Add a file widget to the GUI."""
         file_entry = self.files[index]
@@ -2241,9 +7887,72 @@ except Exception as e:
                                   font=("Arial", 12, "bold"), anchor="w")
         name_label.pack(fill="x")
         
-        path_label = ctk.CTkLabel(info_frame, text=file_entry["path"], 
+        launch_type = file_entry.get("type", "script")
+        path_text = file_entry["path"] if launch_type == "script" else f"[{LAUNCH_TYPES[launch_type]}] {file_entry['path']}"
+        path_label = ctk.CTkLabel(info_frame, text=path_text, 
                                   font=("Arial", 9), anchor="w", text_color="gray")
         path_label.pack(fill="x")
+
+        # Resource settings summary
+        try:
+            resources_text = ResourceLimits(file_entry.get("resources")).describe()
+        except (ValueError, TypeError) as e:
+            resources_text = f"Risorse non valide: {e}"
+        if resources_text:
+            resources_label = ctk.CTkLabel(info_frame, text=f"⚙ {resources_text}",
+                                           font=("Arial", 9), anchor="w", text_color="gray")
+            resources_label.pack(fill="x")
+
+        # Launch settings of the active profile
+        settings = resolve_launch_settings(file_entry, self.active_profile)
+        if settings["interpreter_flags"] or settings["args"] or settings["cwd"]:
+            launch_text = " ".join(settings["interpreter_flags"] + [file_entry["name"]] + settings["args"])
+            if settings["cwd"]:
+                launch_text += f"  (cwd: {settings['cwd']})"
+            launch_label = ctk.CTkLabel(info_frame, text=f"$ {launch_text}", font=("Arial", 9),
+                                        anchor="w", text_color="gray")
+            launch_label.pack(fill="x")
+
+        # Watched sources of the hot reload
+        if file_entry.get("hot_reload"):
+            reload_label = ctk.CTkLabel(info_frame, text=f"↻ hot reload: {', '.join(self.reload_roots(file_entry))}",
+                                        font=("Arial", 9), anchor="w", text_color="gray")
+            reload_label.pack(fill="x")
+
+        # Traced memory (tracemalloc launch mode); click for the allocation sites
+        if file_entry.get("tracemalloc"):
+            memory_label = ctk.CTkLabel(info_frame, text="🧠 tracemalloc attivo dal prossimo avvio", font=("Arial", 9),
+                                        anchor="w", text_color="gray", cursor="hand2")
+            memory_label.pack(fill="x")
+            memory_label.bind("<Button-1>", lambda _: self.open_memory_window(index))
+            file_entry["memory_label"] = memory_label
+        else:
+            file_entry.pop("memory_label", None)
+
+        # Request metrics from the access log
+        if file_entry.get("metrics"):
+            metrics_label = ctk.CTkLabel(info_frame, text="📈 in attesa di richieste", font=("Arial", 9),
+                                         anchor="w", text_color="gray")
+            metrics_label.pack(fill="x")
+            file_entry["metrics_label"] = metrics_label
+        else:
+            file_entry.pop("metrics_label", None)
+
+        # Instances: scale buttons and one status dot per instance
+        instances_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
+        instances_frame.pack(fill="x")
+        ctk.CTkButton(instances_frame, text="−", width=22, height=18,
+                      command=lambda: self.scale_file(index, -1)).pack(side="left")
+        replicas_label = ctk.CTkLabel(instances_frame, text="×1", width=30, font=("Arial", 10))
+        replicas_label.pack(side="left")
+        ctk.CTkButton(instances_frame, text="+", width=22, height=18,
+                      command=lambda: self.scale_file(index, 1)).pack(side="left")
+        strip = ctk.CTkFrame(instances_frame, fg_color="transparent")
+        strip.pack(side="left", padx=5)
+        file_entry["replicas_label"] = replicas_label
+        file_entry["instance_strip"] = strip
+        file_entry["instance_labels"] = []
+        self.update_file_status(index)
         
         # Control buttons
         start_btn = ctk.CTkButton(frame, text="▶", width=40, 
@@ -2256,35 +7965,419 @@ except Exception as e:
         stop_btn.pack(side="left", padx=2)
         file_entry["stop_btn"] = stop_btn
         
+        profile_btn = ctk.CTkButton(frame, text="⏱", width=40, fg_color="gray",
+                                    command=lambda: self.profile_file_imports(index))
+        profile_btn.pack(side="left", padx=2)
+
+        sampling_btn = ctk.CTkButton(frame, text="🔬", width=40, fg_color="gray",
+                                     command=lambda: self.profile_running_file(index))
+        sampling_btn.pack(side="left", padx=2)
+
+        settings_btn = ctk.CTkButton(frame, text="⚙", width=40, fg_color="gray",
+                                     command=lambda: self.edit_launch_settings(index))
+        settings_btn.pack(side="left", padx=2)
+
         remove_btn = ctk.CTkButton(frame, text="🗑", width=40, fg_color="darkred",
                                   command=lambda: self.remove_file(index))
         remove_btn.pack(side="left", padx=2)
+        self.update_log_service_menu()
     
-    def start_file(self, index: int):
-        """Start a file."""
+    def edit_launch_settings(self, index: int):
+        """Edit arguments, working directory, interpreter flags and environment of a file, per profile."""
         file_entry = self.files[index]
-        
-        if file_entry["process"] and file_entry["process"].poll() is None:
-            return  # Already running
-        
-        file_path = file_entry["path"]
-        
-        # Build command based on environment type
-        command = self.build_command(file_path)
 
+        popup = ctk.CTkToplevel(self)
+        popup.title(f"Impostazioni di avvio - {file_entry['name']}")
+        popup.geometry("600x600")
+        popup.transient(self)
+        popup.grab_set()
+
+        # Launch type is shared by all profiles
+        type_frame = ctk.CTkFrame(popup)
+        type_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkLabel(type_frame, text="Tipo di avvio:").pack(side="left", padx=5)
+        type_names = {label: key for key, label in LAUNCH_TYPES.items()}
+        type_var = ctk.StringVar(value=LAUNCH_TYPES[file_entry.get("type", "script")])
+        ctk.CTkOptionMenu(type_frame, variable=type_var, values=list(type_names)).pack(side="left", padx=5)
+        ctk.CTkLabel(type_frame, text=file_entry["path"], text_color="gray").pack(side="left", padx=5)
+        # Observability options, shared by all profiles
+        options_frame = ctk.CTkFrame(popup, fg_color="transparent")
+        options_frame.pack(fill="x", padx=10, pady=(5, 0))
+        metrics_var = ctk.BooleanVar(value=bool(file_entry.get("metrics")))
+        ctk.CTkCheckBox(options_frame, text="Metriche dai log di accesso", variable=metrics_var).pack(side="left", padx=5)
+        tracemalloc_var = ctk.BooleanVar(value=bool(file_entry.get("tracemalloc")))
+        ctk.CTkCheckBox(options_frame, text="Traccia memoria (tracemalloc)", variable=tracemalloc_var).pack(
+            side="left", padx=5)
+        hot_reload_var = ctk.BooleanVar(value=bool(file_entry.get("hot_reload")))
+        ctk.CTkCheckBox(options_frame, text="Hot reload", variable=hot_reload_var).pack(side="left", padx=5)
+
+        profile_frame = ctk.CTkFrame(popup)
+        profile_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkLabel(profile_frame, text="Profilo:").pack(side="left", padx=5)
+        profile_var = ctk.StringVar(value=self.active_profile)
+        ctk.CTkOptionMenu(profile_frame, variable=profile_var, values=self.profile_names(),
+                          command=lambda _: load()).pack(side="left", padx=5)
+        hint_label = ctk.CTkLabel(profile_frame, text="", text_color="gray")
+        hint_label.pack(side="left", padx=5)
+
+        form = ctk.CTkFrame(popup)
+        form.pack(fill="x", padx=10, pady=10)
+        form.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(form, text="Argomenti:").grid(row=0, column=0, sticky="w", padx=5, pady=3)
+        args_entry = ctk.CTkEntry(form, placeholder_text="--port {port} --workers 4")
+        args_entry.grid(row=0, column=1, columnspan=2, sticky="ew", padx=5, pady=3)
+        ctk.CTkLabel(form, text="Cartella di lavoro:").grid(row=1, column=0, sticky="w", padx=5, pady=3)
+        cwd_entry = ctk.CTkEntry(form)
+        cwd_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=3)
+
+        def browse_cwd():
+            folder = ctk.filedialog.askdirectory(parent=popup, initialdir=os.path.dirname(file_entry["path"]))
+            if folder:
+                cwd_entry.delete(0, "end")
+                cwd_entry.insert(0, folder)
+
+        ctk.CTkButton(form, text="...", width=30, command=browse_cwd).grid(row=1, column=2, padx=5, pady=3)
+        ctk.CTkLabel(form, text="Flag interprete:").grid(row=2, column=0, sticky="w", padx=5, pady=3)
+        flags_entry = ctk.CTkEntry(form, placeholder_text="-X importtime -O")
+        flags_entry.grid(row=2, column=1, columnspan=2, sticky="ew", padx=5, pady=3)
+
+        ctk.CTkLabel(popup, text="Variabili d'ambiente, una per riga: CHIAVE=valore ($VAR espande), -CHIAVE rimuove",
+                     anchor="w").pack(fill="x", padx=10)
+        env_text = ctk.CTkTextbox(popup, wrap="none")
+        env_text.pack(pady=5, padx=10, fill="both", expand=True)
+
+        def profile_values() -> Dict:
+            profile = profile_var.get()
+            if profile == "default":
+                return file_entry
+            return file_entry.get("profiles", {}).get(profile, {})
+
+        def load():
+            values = profile_values()
+            hint_label.configure(text="" if profile_var.get() == "default" else "campi vuoti = come default")
+            for entry, text in ((args_entry, shlex.join(values.get("args", []))), (cwd_entry, values.get("cwd") or ""),
+                                (flags_entry, shlex.join(values.get("interpreter_flags", [])))):
+                entry.delete(0, "end")
+                if text:
+                    entry.insert(0, text)
+            env_text.delete("1.0", "end")
+            env_text.insert("1.0", format_env_overrides(values.get("env", {})))
+
+        def save():
+            try:
+                values = {
+                    "args": shlex.split(args_entry.get()),
+                    "cwd": cwd_entry.get().strip(),
+                    "interpreter_flags": shlex.split(flags_entry.get()),
+                    "env": parse_env_overrides(env_text.get("1.0", "end")),
+                }
+            except ValueError as e:
+                messagebox.showerror("Errore", str(e), parent=popup)
+                return
+            if values["cwd"] and not os.path.isdir(values["cwd"].replace("{instance}", "0")):
+                messagebox.showerror("Errore", f"Cartella non trovata: {values['cwd']}", parent=popup)
+                return
+            launch_type = type_names[type_var.get()]
+            if tracemalloc_var.get():
+                try:
+                    self.wrapper_target(dict(file_entry, type=launch_type))
+                except ValueError as e:
+                    messagebox.showerror("Errore", str(e), parent=popup)
+                    return
+            if launch_type == "script":
+                file_entry.pop("type", None)
+            else:
+                file_entry["type"] = launch_type
+            for key, var in (("metrics", metrics_var), ("tracemalloc", tracemalloc_var), ("hot_reload", hot_reload_var)):
+                if not var.get():
+                    file_entry.pop(key, None)
+                elif not file_entry.get(key):
+                    file_entry[key] = True
+            profile = profile_var.get()
+            if profile == "default":
+                target = file_entry
+            else:
+                target = file_entry.setdefault("profiles", {}).setdefault(profile, {})
+            for key, value in values.items():
+                if value:
+                    target[key] = value
+                else:
+                    target.pop(key, None)
+            if profile != "default" and not target:
+                file_entry["profiles"].pop(profile)
+            self.save_config()
+            self.refresh_file_widgets()
+            popup.destroy()
+
+        buttons = ctk.CTkFrame(popup, fg_color="transparent")
+        buttons.pack(pady=(0, 10))
+        ctk.CTkButton(buttons, text="Salva", command=save).pack(side="left", padx=5)
+        ctk.CTkButton(buttons, text="Annulla", fg_color="gray", command=popup.destroy).pack(side="left", padx=5)
+        load()
+
+    def profile_names(self) -> List[str]:
+        """Return the built-in launch profiles plus the ones defined by the files."""
+        names = list(LAUNCH_PROFILES)
+        for file_entry in self.files:
+            names += [name for name in file_entry.get("profiles", {}) if name not in names]
+        return names
+
+    def set_active_profile(self, profile: str):
+        """Switch the launch profile used for the next starts."""
+        self.active_profile = profile
+        log_queue.put(f"Profilo di avvio: {profile} (applicato ai prossimi avvii)\n")
+        self.save_config()
+        self.refresh_file_widgets()
+
+    def refresh_file_widgets(self):
+        """Rebuild the file widgets (processes are not affected)."""
+        self.profile_selector.configure(values=self.profile_names())
+        self.profile_selector.set(self.active_profile)
+        for widget in self.files_frame.winfo_children():
+            widget.destroy()
+        for i in range(len(self.files)):
+            self.add_file_widget(i)
+
+    def expected_ports(self, file_entry: Dict) -> List[int]:
+        """Return the ports a file is expected to open: configured, or learned on previous runs."""
+        return file_entry.get("ports") or file_entry.get("learned_ports") or []
+
+    @staticmethod
+    def replica_count(file_entry: Dict) -> int:
+        """Return the number of instances configured for a file."""
+        return max(1, int(file_entry.get("replicas", 1)))
+
+    def _instances(self, file_entry: Dict) -> List[Dict]:
+        """Return the instance slots of a file, creating the missing ones."""
+        slots = file_entry.setdefault("instances", [])
+        while len(slots) < self.replica_count(file_entry):
+            slots.append({"instance": len(slots), "process": None, "status": "stopped", "port": None})
+        return slots
+
+    def instance_name(self, file_entry: Dict, slot: Dict) -> str:
+        """Return the log prefix of an instance."""
+        if self.replica_count(file_entry) == 1 and slot["instance"] == 0:
+            return file_entry["name"]
+        return f"{file_entry['name']}#{slot['instance']}"
+
+    @staticmethod
+    def instance_port(file_entry: Dict, instance: int) -> Optional[int]:
+        """Return the {port} of an instance: base_port (or the first configured port) + instance."""
+        base = file_entry.get("base_port") or (file_entry.get("ports") or [None])[0]
+        return int(base) + instance if base else None
+
+    def instance_expected_ports(self, file_entry: Dict, slot: Dict) -> List[int]:
+        """Return the ports an instance is expected to open."""
+        if self.replica_count(file_entry) > 1:
+            port = self.instance_port(file_entry, slot["instance"])
+            return [port] if port is not None else []
+        return self.expected_ports(file_entry)
+
+    def run_in_background(self, func, callback):
+        """Run func in a worker thread and pass its result to callback on the GUI thread."""
+        threading.Thread(target=lambda: self.after(0, callback, func()), daemon=True).start()
+
+    @staticmethod
+    def scan_port_owners() -> Dict[int, Dict]:
+        """Return the listening port owners, or {} if the socket table cannot be read (worker thread)."""
+        try:
+            return listening_port_owners()
+        except (psutil.Error, OSError) as e:
+            log_queue.put(f"Controllo porte non disponibile: {e}\n")
+            return {}
+
+    @staticmethod
+    def terminate_port_owners(conflicts: Dict[int, Dict]) -> Optional[str]:
+        """Terminate the processes holding the conflicting ports (worker thread). Return an error or None."""
+        stale = []
+        for owner in {owner["pid"]: owner for owner in conflicts.values()}.values():
+            try:
+                proc = psutil.Process(owner["pid"])
+                proc.terminate()
+                stale.append(proc)
+            except psutil.NoSuchProcess:
+                continue
+            except psutil.AccessDenied:
+                return f"Accesso negato per il PID {owner['pid']}."
+        _, alive = psutil.wait_procs(stale, timeout=3)
+        for proc in alive:
+            proc.kill()
+        return None
+
+    def ask_port_conflict(self, file_entry: Dict, conflicts: Dict[int, Dict], name: str) -> Optional[bool]:
+        """Ask how to resolve taken ports: True = terminate the owners, False = free port, None = cancel."""
+        port_env = file_entry.get("port_env", "PORT")
+        details = "\n".join(f"  {port}: {owner['name']} (PID {owner['pid']})" for port, owner in conflicts.items())
+        return messagebox.askyesnocancel(
+            "Porta occupata",
+            f"{name}: porte già in uso\n{details}\n\n"
+            f"Sì = termina il processo che le occupa\n"
+            f"No = avvia su una porta libera (variabile {port_env})\n"
+            f"Annulla = non avviare")
+
+    @staticmethod
+    def scan_tree_ports(roots: List[int]) -> Optional[List[List[int]]]:
+        """Return the listening ports of each process tree, or None if they cannot be read (worker thread)."""
+        try:
+            index = localhost_scanner.listening_ports()
+            return [sorted({port for pid in process_tree_pids(root) for port in index.get(pid, [])})
+                    for root in roots]
+        except (psutil.Error, OSError) as e:
+            log_queue.put(f"Errore rilevamento porte: {e}\n")
+            return None
+
+    def learn_ports(self):
+        """Record the ports opened by recently started files (one background scan for all of them)."""
+        if self._learning_ports:
+            return
+        now = time.time()
+        # With several instances the ports come from base_port, nothing to learn
+        learning = [f for f in self.files if self.replica_count(f) == 1 and self._instances(f)[0]["process"]
+                    and f.get("learn_until", 0) > now]
+        # (a launch on a substituted free port has no learn_until: its port is not the usual one)
+        if not learning:
+            return
+        roots = [self._instances(file_entry)[0]["process"].pid for file_entry in learning]
+        self._learning_ports = True
+        self.run_in_background(lambda: self.scan_tree_ports(roots),
+                               lambda found: self._apply_learned_ports(learning, found))
+
+    def _apply_learned_ports(self, learning: List[Dict], found: Optional[List[List[int]]]):
+        """Store the ports found by learn_ports (GUI thread)."""
+        self._learning_ports = False
+        if found is None:
+            return
+        changed = False
+        for file_entry, ports in zip(learning, found):
+            if ports and ports != file_entry.get("learned_ports"):
+                file_entry["learned_ports"] = ports
+                log_queue.put(f"[{file_entry['name']}] Porte in ascolto: {', '.join(map(str, ports))}\n")
+                changed = True
+        if changed:
+            self.save_config()
+
+    def start_file(self, index: int, owners: Optional[Dict[int, Dict]] = None, instances: Optional[List[int]] = None,
+                   done=None):
+        """
+        Start the stopped instances of a file.
+
+        The socket scan of the port preflight runs in a worker thread and the
+        launches continue on the GUI thread.
+
+        Args:
+            index: File index
+            owners: Port owners from a scan shared by start_all
+            instances: Only these instance numbers (default: all)
+            done: Called on the GUI thread once the launches are over
+        """
+        file_entry = self.files[index]
+        slots = [slot for slot in self._instances(file_entry)
+                 if (instances is None or slot["instance"] in instances)
+                 and not (slot["process"] and slot["process"].poll() is None)]  # Not already running
+        if owners is None and any(self.instance_expected_ports(file_entry, slot) for slot in slots):
+            self.run_in_background(self.scan_port_owners,
+                                   lambda result: self._start_slots(file_entry, slots, result, done))
+            return
+        self._start_slots(file_entry, slots, owners or {}, done)
+
+    def _start_slots(self, file_entry: Dict, slots: List[Dict], owners: Dict[int, Dict], done=None):
+        """
+        Launch instances in order after the port preflight.
+
+        Taken ports are resolved with the user: the owners are terminated in a
+        worker thread (the sequence resumes from the same instance when they
+        are gone), or the instance gets a free port through port_env.
+        """
+        if not any(f is file_entry for f in self.files):
+            return  # Removed meanwhile
+        for position, slot in enumerate(slots):
+            name = self.instance_name(file_entry, slot)
+            conflicts = find_port_conflicts(self.instance_expected_ports(file_entry, slot), owners)
+            free_port = None
+            if conflicts:
+                answer = self.ask_port_conflict(file_entry, conflicts, name)
+                if answer is None:
+                    log_queue.put(f"[{name}] Avvio annullato: porte occupate {sorted(conflicts)}\n")
+                    break
+                if answer:
+                    def resume(error, conflicts=conflicts, name=name, remaining=slots[position:]):
+                        if error:
+                            messagebox.showerror("Errore", error)
+                            self._update_entry_status(file_entry)
+                            return
+                        for port in conflicts:
+                            owners.pop(port, None)
+                        log_queue.put(f"[{name}] Terminati i processi sulle porte {sorted(conflicts)}\n")
+                        self._start_slots(file_entry, remaining, owners, done)
+
+                    self.run_in_background(lambda: self.terminate_port_owners(conflicts), resume)
+                    return
+                free_port = find_free_port()
+                log_queue.put(f"[{name}] Porta {min(conflicts)} occupata, avvio con "
+                              f"{file_entry.get('port_env', 'PORT')}={free_port}\n")
+            self._start_instance(file_entry, slot, free_port)
+        self._update_entry_status(file_entry)
+        if done:
+            done()
+
+    def _start_instance(self, file_entry: Dict, slot: Dict, free_port: Optional[int] = None):
+        """Launch one instance, on free_port (through port_env) if the usual port is taken."""
+        name = self.instance_name(file_entry, slot)
         try:
+            port = free_port or self.instance_port(file_entry, slot["instance"])
+            settings = resolve_launch_settings(file_entry, self.active_profile)
+            if port is None and uses_port_template(settings):
+                port = find_free_port()
+
+            env = self.get_launch_env(settings["env"], slot["instance"], port)
+            if free_port:
+                env[file_entry.get("port_env", "PORT")] = str(free_port)
+            args = [expand_instance_template(arg, slot["instance"], port) for arg in settings["args"]]
+            command = self.build_command(file_entry["path"], args, settings["interpreter_flags"],
+                                         file_entry.get("type", "script"))
+            profile = slot.pop("profile", None)
+            slot.pop("exited", None)
+            if profile:
+                command = self.profile_command(file_entry, settings["interpreter_flags"], args, profile)
+            elif file_entry.get("tracemalloc"):
+                try:
+                    command = self.tracemalloc_command(file_entry, name, settings["interpreter_flags"], args)
+                    env.update(self.get_memory_server().environment())
+                except ValueError as e:
+                    # e.g. an entry point no longer Python: launch normally
+                    log_queue.put(f"[{name}] tracemalloc non applicato: {e}\n")
+            # Ports opened in the first 30 s are recorded for the next preflight,
+            # unless the instance runs on a substituted free port
+            if free_port:
+                file_entry.pop("learn_until", None)
+            else:
+                file_entry["learn_until"] = time.time() + 30
+
+            limits = ResourceLimits(file_entry.get("resources"))
+            cgroup_procs = limits.prepare_cgroup()
+            if limits.cgroup and not cgroup_procs:
+                log_queue.put(f"[{name}] cgroup {limits.cgroup} non disponibile o non scrivibile\n")
+            launch_kwargs = dict(env=env, **new_session_kwargs())
+            if settings["cwd"]:
+                launch_kwargs["cwd"] = expand_instance_template(settings["cwd"], slot["instance"], port)
+            preexec_fn = limits.preexec_fn()
+            if preexec_fn:
+                launch_kwargs["preexec_fn"] = preexec_fn
+
             if self.shell_checkbox.get():
                 # Launch in external terminal
                 terminal_command = self.build_terminal_command(command)
+                for key, value in self.terminal_popen_kwargs().items():
+                    launch_kwargs[key] = launch_kwargs.get(key, 0) | value  # creationflags
                 process = subprocess.Popen(
                     terminal_command,
-                    shell=False  # Already handled in command
+                    shell=False,
+                    **launch_kwargs
                 )
-                file_entry["process"] = process
-                file_entry["status"] = "running"
-                self.update_file_status(index)
+                self._apply_resource_limits(name, limits, process, cgroup_procs)
+                slot.update(process=process, status="running", port=port)
                 # No output reading for external terminal
-                log_queue.put(f"[{file_entry['name']}] Avviato in terminale esterno\n")
+                log_queue.put(f"[{name}] Avviato in terminale esterno\n")
             else:
                 # Normal launch with output capture
                 process = subprocess.Popen(
@@ -2292,39 +8385,233 @@ except Exception as e:
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
                     text=True,
-                    shell=False
+                    shell=False,
+                    **launch_kwargs
                 )
-
-                file_entry["process"] = process
-                file_entry["status"] = "running"
-                self.update_file_status(index)
+                self._apply_resource_limits(name, limits, process, cgroup_procs)
+                slot.update(process=process, status="running", port=port)
 
                 # Start thread to read output
                 q = queue.Queue()
-                thread = threading.Thread(target=read_process_output, args=(process, q, file_entry["name"]))
+                metrics = None
+                if file_entry.get("metrics"):
+                    metrics = service_metrics.setdefault(name, ServiceMetrics())
+                thread = threading.Thread(target=read_process_output, args=(process, q, name, None, metrics))
                 thread.daemon = True
                 thread.start()
 
                 # Log handled by global log_queue
         except Exception as e:
-            log_queue.put(f"Errore avvio {file_entry['name']}: {e}\n")
-            file_entry["status"] = "error"
-            self.update_file_status(index)
-    
-    def stop_file(self, index: int):
-        """Stop a file."""
+            log_queue.put(f"Errore avvio {name}: {e}\n")
+            slot["status"] = "error"
+
+    def _apply_resource_limits(self, name: str, limits: ResourceLimits, process: subprocess.Popen,
+                               cgroup_procs: Optional[str] = None):
+        """Apply the post-launch resource settings and log the outcome."""
+        if limits.is_empty():
+            return
+        for warning in limits.apply_after_launch(process.pid, cgroup_procs):
+            log_queue.put(f"[{name}] Risorse: {warning}\n")
+        log_queue.put(f"[{name}] Risorse applicate: {limits.describe()}\n")
+
+    def get_stopper(self) -> ProcessStopper:
+        """Return a stop engine with the configured grace periods."""
+        return ProcessStopper(self.stop_grace["interrupt"], self.stop_grace["terminate"])
+
+    def stop_file(self, index: int, instances: Optional[List[int]] = None):
+        """Stop the instances of a file and their process trees without blocking the GUI."""
         file_entry = self.files[index]
-        
-        if file_entry["process"]:
-            try:
-                file_entry["process"].terminate()
-                file_entry["process"].wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                file_entry["process"].kill()
-            
-            file_entry["process"] = None
-            file_entry["status"] = "stopped"
+        for slot in self._instances(file_entry):
+            if instances is not None and slot["instance"] not in instances:
+                continue
+            self._stop_instance(file_entry, slot)
+        self.update_file_status(index)
+
+    def _stop_instance(self, file_entry: Dict, slot: Dict):
+        """Start stopping one instance in background."""
+        process = slot["process"]
+        if not process:
+            return
+        slot["process"] = None
+        slot["status"] = "stopping"
+        slot.pop("exited", None)
+
+        def done(reaped):
+            process.poll()  # Collect the exit status if psutil did not
+            self.stop_results.put((file_entry, slot, reaped))
+
+        self.get_stopper().stop_async([process.pid], done)
+
+    def _apply_stop_results(self):
+        """Report finished stops and mark the instances as stopped."""
+        try:
+            while True:
+                file_entry, slot, reaped = self.stop_results.get_nowait()
+                name = self.instance_name(file_entry, slot)
+                log_queue.put(f"[{name}] Fermato: {ProcessStopper.format_report(reaped)}\n")
+                if "survived" in reaped.values():
+                    log_queue.put(f"[{name}] ATTENZIONE: alcuni processi non sono terminati\n")
+                if slot["status"] == "stopping" and slot["process"] is None:
+                    slot["status"] = "stopped"
+                self._update_entry_status(file_entry)
+        except queue.Empty:
+            pass
+
+    # Minimum seconds between two hot reloads of the same file
+    RELOAD_COOLDOWN = 1.0
+
+    def reload_roots(self, file_entry: Dict) -> List[str]:
+        """Return the directories watched for the hot reload of a file: script folder, else working directory."""
+        settings = file_entry.get("hot_reload")
+        if isinstance(settings, dict) and settings.get("paths"):
+            return [os.path.abspath(path) for path in settings["paths"]]
+        if file_entry.get("type", "script") == "script" and os.path.isfile(file_entry["path"]):
+            return [os.path.dirname(os.path.abspath(file_entry["path"]))]
+        cwd = resolve_launch_settings(file_entry, self.active_profile)["cwd"]
+        if cwd and "{" not in cwd:
+            return [os.path.abspath(cwd)]
+        return [os.getcwd()]
+
+    def reload_affects(self, file_entry: Dict, path: str) -> bool:
+        """Return True if a change of path restarts a file (its roots, patterns and ignore globs)."""
+        settings = file_entry.get("hot_reload")
+        settings = settings if isinstance(settings, dict) else {}
+        return FileWatcher.filter_path(path, self.reload_roots(file_entry),
+                                       settings.get("patterns") or FileWatcher.PATTERNS,
+                                       FileWatcher.IGNORE + tuple(settings.get("ignore", ())))
+
+    def sync_reload_watcher(self):
+        """(Re)start the source watcher when the set of files with hot reload changes."""
+        roots, patterns = set(), set()
+        for file_entry in self.files:
+            settings = file_entry.get("hot_reload")
+            if settings:
+                roots.update(self.reload_roots(file_entry))
+                patterns.update((isinstance(settings, dict) and settings.get("patterns")) or FileWatcher.PATTERNS)
+        key = (tuple(sorted(roots)), tuple(sorted(patterns)))
+        if key == self._reload_key:
+            return
+        if self._reload_watcher:
+            self._reload_watcher.stop()
+        self._reload_key = key
+        self._reload_watcher = None
+        if roots:
+            # Batches come from the watcher thread; the restarts run on the GUI thread
+            self._reload_watcher = FileWatcher(key[0], lambda paths: self.after(0, self.on_sources_changed, paths),
+                                               patterns=key[1]).start()
+            log_queue.put(f"Hot reload: osservo {', '.join(key[0])}\n")
+
+    def on_sources_changed(self, paths: List[str]):
+        """Restart the files with hot reload affected by a batch of changed paths."""
+        watcher = self._reload_watcher
+        if watcher and watcher.error:
+            log_queue.put(f"Hot reload: inotify non disponibile ({watcher.error}), uso il polling\n")
+            watcher.error = None  # Reported once
+        for file_entry in self.files:
+            if file_entry.get("hot_reload"):
+                # A watched root itself is reported when inotify lost events
+                roots = self.reload_roots(file_entry)
+                changed = [path for path in paths if path in roots or self.reload_affects(file_entry, path)]
+                if changed:
+                    self.reload_file(file_entry, changed)
+
+    def reload_file(self, file_entry: Dict, changed: List[str]):
+        """
+        Restart the instances of a file after a change of its sources.
+
+        Only instances running, or exited on their own, are restarted. While a
+        restart is under way, or within RELOAD_COOLDOWN of the previous one,
+        further changes are coalesced into a single following restart.
+        """
+        state = file_entry.setdefault("reload_state", {"pending": [], "busy": False, "scheduled": False, "last": 0.0})
+        state["pending"] += [path for path in changed if path not in state["pending"]]
+        if state["busy"] or state["scheduled"]:
+            return
+        wait = state["last"] + self.RELOAD_COOLDOWN - time.monotonic()
+        if wait > 0:
+            state["scheduled"] = True
+            self.after(int(wait * 1000) + 1, self._run_reload, file_entry)
+            return
+        self._run_reload(file_entry)
+
+    def _run_reload(self, file_entry: Dict):
+        """Stop the instances to reload in background; _finish_reload starts them again."""
+        state = file_entry["reload_state"]
+        state["scheduled"] = False
+        changed, state["pending"] = state["pending"], []
+        if not any(f is file_entry for f in self.files):
+            return  # Removed meanwhile
+        slots = [slot for slot in self._instances(file_entry)
+                 if (slot["process"] and slot["process"].poll() is None) or slot.get("exited")]
+        if not slots:
+            return  # Stopped by the user: nothing to restart
+        names = ", ".join(os.path.basename(path) for path in changed[:3]) + (" …" if len(changed) > 3 else "")
+        log_queue.put(f"[{file_entry['name']}] ↻ Modificato {names}: riavvio\n")
+        state["busy"] = True
+        started = time.monotonic()
+        processes = [slot["process"] for slot in slots if slot["process"]]
+        for slot in slots:
+            slot.update(process=None, status="stopping")
+        self._update_entry_status(file_entry)
+
+        def done(reaped):
+            for process in processes:
+                process.poll()
+            self.after(0, self._finish_reload, file_entry, slots, reaped, started)
+
+        if processes:
+            self.get_stopper().stop_async([process.pid for process in processes], done)
+        else:
+            self._finish_reload(file_entry, slots, {}, started)
+
+    def _finish_reload(self, file_entry: Dict, slots: List[Dict], reaped: Dict[int, str], started: float):
+        """Start again the stopped instances and run the restart coalesced meanwhile, if any."""
+        state = file_entry["reload_state"]
+        state.update(busy=False, last=time.monotonic())
+        for slot in slots:
+            if slot["status"] == "stopping" and slot["process"] is None:
+                slot["status"] = "stopped"
+        index = next((i for i, f in enumerate(self.files) if f is file_entry), None)
+        if index is None:
+            return
+        if "survived" in reaped.values():
+            log_queue.put(f"[{file_entry['name']}] Hot reload annullato: alcuni processi non sono terminati\n")
             self.update_file_status(index)
+            return
+        def restarted():
+            log_queue.put(f"[{file_entry['name']}] ↻ Riavviato in {time.monotonic() - started:.2f} s\n")
+            if state["pending"]:
+                self.reload_file(file_entry, [])
+
+        self.start_file(index, instances=[slot["instance"] for slot in slots], done=restarted)
+
+    def _update_entry_status(self, file_entry: Dict):
+        """Refresh the status widgets of a file given by entry."""
+        for i, f in enumerate(self.files):
+            if f is file_entry:
+                self.update_file_status(i)
+
+    def scale_file(self, index: int, delta: int):
+        """Change the number of instances of a file, starting/stopping instances if it is running."""
+        file_entry = self.files[index]
+        slots = self._instances(file_entry)
+        old_count = self.replica_count(file_entry)
+        new_count = max(1, old_count + delta)
+        if new_count == old_count:
+            return
+        running = any(slot["status"] == "running" for slot in slots)
+        file_entry["replicas"] = new_count
+        if new_count > old_count:
+            self._instances(file_entry)
+            if running:
+                self.start_file(index, instances=list(range(old_count, new_count)))
+        else:
+            for slot in slots[new_count:]:
+                self._stop_instance(file_entry, slot)
+            del slots[new_count:]
+        log_queue.put(f"[{file_entry['name']}] Istanze: {old_count} → {new_count}\n")
+        self.update_file_status(index)
+        self.save_config()
     
     def remove_file(self, index: int):
         """Remove a file from the list."""
@@ -2335,64 +8622,150 @@ except Exception as e:
         self.files.pop(index)
         
         # Rebuild GUI
-        for widget in self.files_frame.winfo_children():
-            widget.destroy()
-        
-        for i in range(len(self.files)):
-            self.add_file_widget(i)
+        self.refresh_file_widgets()
         
         self.save_config()
     
     def start_all(self):
         """Start all files."""
-        for i in range(len(self.files)):
-            self.start_file(i)
+        def start(owners):
+            for i in range(len(self.files)):
+                self.start_file(i, owners)
+
+        # One socket-table scan (in background) for the preflight of every file
+        if any(self.instance_expected_ports(f, s) for f in self.files for s in self._instances(f)):
+            self.run_in_background(self.scan_port_owners, start)
+        else:
+            start({})
     
     def stop_all(self):
         """Stop all files."""
         for i in range(len(self.files)):
             self.stop_file(i)
     
-    def build_command(self, script_path: str) -> List[str]:
-        """Build the command to run a script based on the active environment."""
+    def python_launcher(self) -> List[str]:
+        """Return the command prefix starting the Python interpreter of the active environment."""
         if self.env_type == "conda" and self.env_name:
-            if self.conda_exe:
-                return [self.conda_exe, "run", "-n", self.env_name, "python", script_path]
+            python_exe = self.get_activator().python_executable()
+            if python_exe:
+                # Interpreter of the env launched directly with the activated variables
+                return [python_exe]
+            elif self.conda_exe:
+                return [self.conda_exe, "run", "--no-capture-output", "-n", self.env_name, "python"]
             else:
                 # Fallback to system if conda not found
-                return [sys.executable, script_path]
+                return [sys.executable]
         elif self.env_type == "venv" and self.env_path:
             if os.name == "nt":  # Windows
-                python_exe = os.path.join(self.env_path, "Scripts", "python.exe")
-            else:  # Unix-like
-                python_exe = os.path.join(self.env_path, "bin", "python")
-            return [python_exe, script_path]
-        else:
-            # System Python or executable
-            if script_path.endswith(".py"):
-                return [sys.executable, script_path]
-            else:
-                return [script_path]
+                return [os.path.join(self.env_path, "Scripts", "python.exe")]
+            return [os.path.join(self.env_path, "bin", "python")]
+        return [sys.executable]
+
+    def find_entry_point(self, name: str) -> Optional[str]:
+        """Return the console script `name` installed in the active environment, if any."""
+        activator = self.get_activator()
+        dirs = activator.bin_dirs() if activator.prefix else [os.path.dirname(sys.executable)]
+        suffixes = [".exe", "-script.py", ""] if os.name == "nt" else [""]
+        for directory in dirs:
+            for suffix in suffixes:
+                candidate = os.path.join(directory, name + suffix)
+                if os.path.isfile(candidate):
+                    return candidate
+        return None
+
+    @staticmethod
+    def _is_python_script(path: str) -> bool:
+        """Return True if path is a script run by a Python shebang (Unix console scripts)."""
+        try:
+            with open(path, "rb") as f:
+                first_line = f.readline(200)
+        except OSError:
+            return False
+        return first_line.startswith(b"#!") and b"python" in first_line
+
+    def build_command(self, target: str, args: Optional[List[str]] = None,
+                      interpreter_flags: Optional[List[str]] = None, launch_type: str = "script") -> List[str]:
+        """
+        Build the argv of a launch in the active environment (no shell involved).
+
+        Args:
+            target: Script path, module name, console script name or executable
+            args: Arguments passed to the target
+            interpreter_flags: Python options placed before the target (e.g. -X importtime, -O)
+            launch_type: One of LAUNCH_TYPES
+
+        Raises:
+            FileNotFoundError: If an entry point or command cannot be found
+        """
+        flags = list(interpreter_flags or [])
+        args = list(args or [])
+        if launch_type == "module":
+            return self.python_launcher() + flags + ["-m", target] + args
+        if launch_type == "entry_point":
+            entry_point = self.find_entry_point(target)
+            if not entry_point:
+                raise FileNotFoundError(f"Entry point '{target}' non trovato nell'ambiente attivo")
+            if flags and self._is_python_script(entry_point):
+                # Run the console script through the interpreter so the flags apply
+                return self.python_launcher() + flags + [entry_point] + args
+            return [entry_point] + args
+        if launch_type == "command":
+            activator = self.get_activator()
+            search_path = os.pathsep.join(activator.bin_dirs() + [os.environ.get("PATH", "")]) \
+                if activator.prefix else None
+            executable = shutil.which(target, path=search_path) or target
+            return [executable] + args
+        # Script: Python files through the interpreter, anything else executed directly
+        if target.endswith(".py") or self.env_type in ("conda", "venv"):
+            return self.python_launcher() + flags + [target] + args
+        return [target] + args
 
     def build_terminal_command(self, command: List[str]) -> List[str]:
-        """Build command to launch in external terminal."""
+        """
+        Build the argv running command in an external terminal.
+
+        The command is passed as an argument vector, never joined into a
+        shell string. On Windows the command itself is returned: it is given
+        its own console with terminal_popen_kwargs().
+        """
         if os.name == "nt":  # Windows
-            # Use 'start cmd /k' to open cmd window and keep it open
-            return ["cmd", "/c", "start", "cmd", "/k"] + [" ".join(command)]
-        else:  # Unix-like
-            # Try common terminals
-            terminals = ["xterm", "gnome-terminal", "konsole", "xfce4-terminal"]
-            for term in terminals:
-                if shutil.which(term):
-                    if term == "gnome-terminal":
-                        return [term, "--"] + command
-                    else:
-                        return [term, "-e"] + command
-            # Fallback to shell
-            return ["sh", "-c"] + [" ".join(command)]
+            return list(command)
+        # Terminals accepting the command as the remaining arguments. The terminal process must
+        # live as long as the command (stop, resource limits and port learning follow its tree):
+        # konsole and xfce4-terminal are kept from handing it to a running instance. gnome-terminal
+        # is not used: it always runs the command under its server, outside the launched tree.
+        terminals = [("xterm", ["-e"]), ("konsole", ["--nofork", "-e"]),
+                     ("xfce4-terminal", ["--disable-server", "-x"])]
+        for term, options in terminals:
+            if shutil.which(term):
+                return [term] + options + list(command)
+        # No terminal emulator: run the command directly, detached from the GUI output
+        return list(command)
+
+    @staticmethod
+    def terminal_popen_kwargs() -> Dict:
+        """Return extra Popen arguments for launches in an external terminal."""
+        if os.name == "nt":  # Windows
+            return {"creationflags": subprocess.CREATE_NEW_CONSOLE}
+        return {}
+
+    STATUS_ICONS = {
+        "running": ("🟢", "green"),
+        "stopping": ("🟡", "orange"),
+        "error": ("🔴", "red"),
+        "stopped": ("⚫", "gray"),
+    }
+
+    def file_status(self, file_entry: Dict) -> str:
+        """Return the overall status of a file from its instances."""
+        statuses = {slot["status"] for slot in self._instances(file_entry)}
+        for status in ("running", "stopping", "error"):
+            if status in statuses:
+                return status
+        return "stopped"
 
     def update_file_status(self, index: int):
-        """Update the status indicator for a file."""
+        """Update the status indicator and the per-instance strip of a file."""
         if index >= len(self.files):
             return
         
@@ -2402,23 +8775,70 @@ except Exception as e:
         if not status_label:
             return
         
-        if file_entry["status"] == "running":
-            status_label.configure(text="🟢", text_color="green")
-        elif file_entry["status"] == "error":
-            status_label.configure(text="🔴", text_color="red")
-        else:
-            status_label.configure(text="⚫", text_color="gray")
+        text, color = self.STATUS_ICONS[self.file_status(file_entry)]
+        status_label.configure(text=text, text_color=color)
+
+        # Instance strip: one dot per instance
+        slots = self._instances(file_entry)
+        strip = file_entry.get("instance_strip")
+        if strip is None:
+            return
+        file_entry["replicas_label"].configure(text=f"×{len(slots)}")
+        labels = file_entry.setdefault("instance_labels", [])
+        while len(labels) > len(slots):
+            labels.pop().destroy()
+        while len(labels) < len(slots):
+            label = ctk.CTkLabel(strip, text="●", width=12, font=("Arial", 12))
+            label.pack(side="left")
+            labels.append(label)
+        for label, slot in zip(labels, slots):
+            label.configure(text_color=self.STATUS_ICONS[slot["status"]][1])
     
+    def update_metrics_labels(self):
+        """Show RPS and latency percentiles of the files with metrics enabled (all instances together)."""
+        now = time.time()
+        for file_entry in self.files:
+            label = file_entry.get("metrics_label")
+            if label is None:
+                continue
+            names = [self.instance_name(file_entry, slot) for slot in self._instances(file_entry)]
+            summary = ServiceMetrics.summary([service_metrics[n] for n in names if n in service_metrics], now)
+            if summary is None:
+                continue
+            text = f"📈 {summary['rps']:.1f} req/s"
+            if summary["samples"]:
+                text += (f" · p50 {format_latency(summary['p50'])} · p95 {format_latency(summary['p95'])}"
+                         f" · p99 {format_latency(summary['p99'])}")
+            if summary["error_rate"]:
+                text += f" · 5xx {summary['error_rate']:.1%}"
+            label.configure(text=text, text_color="orange" if summary["error_rate"] else "gray")
+
     def update_process_status(self):
         """Periodically update the status of all processes."""
         for i, file_entry in enumerate(self.files):
-            if file_entry["process"]:
-                if file_entry["process"].poll() is not None:
+            changed = False
+            for slot in self._instances(file_entry):
+                if slot["process"] and slot["process"].poll() is not None:
                     # Process has terminated
-                    file_entry["process"] = None
-                    file_entry["status"] = "stopped"
-                    self.update_file_status(i)
+                    slot["process"] = None
+                    slot["status"] = "stopped"
+                    slot["exited"] = True  # Restarted by the hot reload, unlike a stop
+                    changed = True
+            if changed:
+                self.update_file_status(i)
         
+        self._apply_stop_results()
+        self.sync_reload_watcher()
+        self.update_metrics_labels()
+        self.update_memory_labels()
+        # Lines of idle services reach the disk within a second
+        log_archive.flush()
+
+        try:
+            self.learn_ports()
+        except Exception as e:
+            log_queue.put(f"Errore rilevamento porte: {e}\n")
+
         # Schedule next update
         self.after(1000, self.update_process_status)
 
@@ -2438,20 +8858,173 @@ except Exception as e:
                 return path
         return None
 
+    ALL_LEVELS = "Tutti i livelli"
+    ALL_SERVICES = "Tutti i servizi"
+    # Lines kept in the console; older ones stay in log_buffer
+    LOG_CONSOLE_LINES = 5000
+    # Name under which the launcher's own messages are stored in log_buffer
+    LOG_SELF_SERVICE = "starter"
+
+    def log_filter(self) -> Tuple[int, Optional[List[str]]]:
+        """Return the (minimum level, services) selected in the console filters."""
+        level = getattr(self, "log_level_menu", None)
+        service = getattr(self, "log_service_menu", None)
+        min_level = LOG_LEVELS.get(level.get(), 0) if level else 0
+        services = None if not service or service.get() == self.ALL_SERVICES else [service.get()]
+        return min_level, services
+
+    def update_log_service_menu(self):
+        """Offer the current files in the console service filter."""
+        if not hasattr(self, "log_service_menu"):
+            return
+        self.log_service_menu.configure(values=[self.ALL_SERVICES] + [f["name"] for f in self.files])
+
+    def apply_log_filter(self):
+        """Refill the console with the stored lines passing the filters."""
+        min_level, services = self.log_filter()
+        self._log_filter_key = None
+        lines = log_buffer.select(min_level, services, self.LOG_CONSOLE_LINES)
+        self.log_console.configure(state="normal")
+        self.log_console.delete("1.0", "end")
+        self.log_console.insert("end", "".join(lines))
+        self.log_console.see("end")
+        self.log_console.configure(state="disabled")
+
+    def _log_service_ids(self, services: Optional[List[str]]) -> Optional[set]:
+        """Return the buffer ids of the filtered services, recomputed only when new services appear."""
+        key = (tuple(services) if services else None, len(log_buffer.service_names))
+        if getattr(self, "_log_filter_key", None) != key:
+            self._log_filter_key = key
+            self._log_filter_ids = log_buffer.service_filter(services)
+        return self._log_filter_ids
+
     def monitor_log_queue(self):
         """Monitor the global log queue and update the console."""
+        min_level, services = self.log_filter()
+        service_ids = self._log_service_ids(services)
+        chunks = []
         try:
-            while True:
+            # Bounded batch so a chatty service cannot stall the GUI loop
+            while len(chunks) < self.LOG_CONSOLE_LINES:
                 message = log_queue.get_nowait()
-                if hasattr(self, 'log_console') and self.log_console:
-                    log_to_console(self.log_console, message)
+                if isinstance(message, str):
+                    seq = log_buffer.append(self.LOG_SELF_SERVICE, message, LEVEL_ALWAYS)
                 else:
-                    print(message.strip())
+                    seq = message
+                entry = log_buffer.get(seq)
+                if entry and log_buffer.matches(seq, min_level, service_ids):
+                    chunks.append(entry[1])
         except queue.Empty:
             pass
+        if chunks:
+            if hasattr(self, 'log_console') and self.log_console:
+                self.write_log_console("".join(chunks))
+            else:
+                print("".join(chunks).strip())
         # Schedule next check
         self.after(100, self.monitor_log_queue)
 
+    def open_log_archive(self):
+        """Browse the on-disk log archive: tail, seek to a time and search."""
+        popup = ctk.CTkToplevel(self)
+        popup.title("Archivio log")
+        popup.geometry("900x600")
+        popup.transient(self)
+
+        controls = ctk.CTkFrame(popup)
+        controls.pack(fill="x", padx=10, pady=(10, 0))
+        services = log_archive.services()
+        service_var = ctk.StringVar(value=services[0] if services else "")
+        ctk.CTkOptionMenu(controls, variable=service_var, values=services or [""], width=160).pack(side="left", padx=5)
+        ctk.CTkLabel(controls, text="Da:").pack(side="left")
+        since_entry = ctk.CTkEntry(controls, width=150, placeholder_text="15m, 2h o 2024-05-01 12:00")
+        since_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(controls, text="Cerca:").pack(side="left")
+        search_entry = ctk.CTkEntry(controls, width=180)
+        search_entry.pack(side="left", padx=5)
+        level_var = ctk.StringVar(value=self.ALL_LEVELS)
+        ctk.CTkOptionMenu(controls, variable=level_var, values=[self.ALL_LEVELS] + list(LOG_LEVELS),
+                          width=120).pack(side="left", padx=5)
+
+        options = ctk.CTkFrame(popup, fg_color="transparent")
+        options.pack(fill="x", padx=10, pady=5)
+        ctk.CTkLabel(options, text="Compressione segmenti chiusi:").pack(side="left", padx=5)
+        compression_var = ctk.StringVar(value=log_archive.compression)
+
+        def set_compression(value: str):
+            log_archive.compression = value
+            self.save_config()
+
+        ctk.CTkSegmentedButton(options, values=list(LogArchive.COMPRESSIONS), variable=compression_var,
+                               command=set_compression).pack(side="left", padx=5)
+        status_label = ctk.CTkLabel(options, text=os.path.abspath(log_archive.base_dir), text_color="gray")
+        status_label.pack(side="left", padx=10)
+
+        output = ctk.CTkTextbox(popup, wrap="none", font=("Consolas", 11))
+        output.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        limit = 2000
+
+        def query():
+            service = service_var.get()
+            if not service:
+                return
+            try:
+                since = parse_time_spec(since_entry.get()) if since_entry.get().strip() else None
+            except ValueError as e:
+                messagebox.showerror("Errore", str(e), parent=popup)
+                return
+            pattern = search_entry.get()
+            min_level = LOG_LEVELS.get(level_var.get(), 0)
+            status_label.configure(text="Lettura in corso...")
+
+            def worker():
+                start = time.perf_counter()
+                if since is None and not pattern and not min_level:
+                    records = log_archive.tail(service, limit)
+                else:
+                    records = log_archive.search(service, pattern, since=since, min_level=min_level, limit=limit)
+                elapsed = time.perf_counter() - start
+                text = "".join(LogArchive.format_record(r) for r in records)
+                popup.after(0, lambda: show(text, len(records), elapsed))
+
+            threading.Thread(target=worker, daemon=True).start()
+
+        def show(text: str, count: int, elapsed: float):
+            if not popup.winfo_exists():
+                return
+            output.delete("1.0", "end")
+            output.insert("1.0", text)
+            output.see("end")
+            more = f" (primi {limit})" if count >= limit else ""
+            status_label.configure(text=f"{count} righe{more} in {elapsed * 1000:.0f} ms")
+
+        ctk.CTkButton(controls, text="Mostra", width=80, command=query).pack(side="left", padx=5)
+        query()
+
+    def write_log_console(self, text: str):
+        """Append text to the console, dropping the oldest lines beyond LOG_CONSOLE_LINES."""
+        console = self.log_console
+        try:
+            console.configure(state="normal")
+            console.insert("end", text)
+            excess = int(console.index("end-1c").split(".")[0]) - self.LOG_CONSOLE_LINES
+            if excess > 0:
+                console.delete("1.0", f"{excess + 1}.0")
+            console.see("end")
+            console.configure(state="disabled")
+        except Exception as e:
+            print(f"Error logging to console: {e}")
+
+    # Per-file keys persisted in the config besides name and path
+    FILE_SETTINGS = ("type", "metrics", "tracemalloc", "hot_reload", "env", "ports", "port_env", "learned_ports", "resources", "replicas", "base_port", "args",
+                     "cwd", "interpreter_flags", "profiles")
+
+    def _file_settings(self, file_entry: Dict) -> Dict:
+        """Return the persisted part of a file entry."""
+        data = {"name": file_entry["name"], "path": file_entry["path"]}
+        data.update({key: file_entry[key] for key in self.FILE_SETTINGS if file_entry.get(key)})
+        return data
+
     def save_config(self):
         """Save configuration to JSON file."""
         config = {
@@ -2460,13 +9033,10 @@ except Exception as e:
                 "name": self.env_name,
                 "path": self.env_path
             },
-            "files": [
-                {
-                    "name": f["name"],
-                    "path": f["path"]
-                }
-                for f in self.files
-            ]
+            "stop": self.stop_grace,
+            "profile": self.active_profile,
+            "logs": {"compression": log_archive.compression},
+            "files": [self._file_settings(f) for f in self.files]
         }
         
         try:
@@ -2489,6 +9059,11 @@ except Exception as e:
             self.env_type = env.get("type")
             self.env_name = env.get("name")
             self.env_path = env.get("path")
+            self.stop_grace.update(config.get("stop", {}))
+            self.active_profile = config.get("profile", "default")
+            compression = config.get("logs", {}).get("compression")
+            if compression in LogArchive.COMPRESSIONS:
+                log_archive.compression = compression
             
             if self.env_type and self.env_name:
                 if self.env_type == "venv":
@@ -2503,11 +9078,15 @@ except Exception as e:
                 file_entry = {
                     "name": file_data["name"],
                     "path": file_data["path"],
-                    "process": None,
-                    "status": "stopped"
+                    "env": {}
                 }
+                file_entry.update({key: file_data[key] for key in self.FILE_SETTINGS if key in file_data})
                 self.files.append(file_entry)
                 self.add_file_widget(len(self.files) - 1)
+
+            self.profile_selector.configure(values=self.profile_names())
+            self.profile_selector.set(self.active_profile)
+            self.warm_activation_snapshot()
         except Exception as e:
             print(f"Error loading config: {e}")
 
@@ -2890,8 +9469,83 @@ except Exception as e:
             self._set_git_buttons_state("disabled")
 
 
+def logs_cli(argv: List[str]) -> int:
+    """
+    Headless access to the log archive.
+
+    Examples:
+        universal_STARTER_GUI.py logs                              # archived services
+        universal_STARTER_GUI.py logs api.py -n 200                # last 200 lines
+        universal_STARTER_GUI.py logs api.py --since 2h --grep timeout --level ERROR
+        universal_STARTER_GUI.py logs api.py -f                    # follow
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="universal_STARTER_GUI.py logs", description="Archivio log dei servizi")
+    parser.add_argument("service", nargs="?", help="Servizio (nome del file, con #N per le istanze)")
+    parser.add_argument("-n", "--lines", type=int, default=50, help="Ultime righe da mostrare (default 50)")
+    parser.add_argument("--since", help="Da quando: ISO (2024-05-01T12:00) o relativo (15m, 2h, 1d)")
+    parser.add_argument("--until", help="Fino a quando, stesso formato di --since")
+    parser.add_argument("--grep", default="", help="Testo da cercare")
+    parser.add_argument("--regex", action="store_true", help="--grep è un'espressione regolare")
+    parser.add_argument("--level", choices=list(LOG_LEVELS), help="Livello minimo")
+    parser.add_argument("-f", "--follow", action="store_true", help="Continua a mostrare le nuove righe")
+    parser.add_argument("--dir", default=log_archive.base_dir, help="Cartella dell'archivio")
+    args = parser.parse_args(argv)
+
+    archive = LogArchive(args.dir)
+    if not args.service:
+        for service in archive.services():
+            segments = archive.segments(service)
+            size = sum(os.path.getsize(path) for _, path in segments if os.path.exists(path))
+            first = datetime.fromtimestamp(segments[0][0]).strftime("%Y-%m-%d %H:%M") if segments else "-"
+            print(f"{service:30} {len(segments):4} segmenti {size / 1024 / 1024:8.1f} MB  dal {first}")
+        return 0
+    try:
+        since = parse_time_spec(args.since) if args.since else None
+        until = parse_time_spec(args.until) if args.until else None
+    except ValueError as e:
+        parser.error(str(e))
+    min_level = LOG_LEVELS.get(args.level, 0)
+
+    if since is None and until is None and not args.grep and not min_level:
+        records = archive.tail(args.service, args.lines)
+    else:
+        records = archive.search(args.service, args.grep, since, until, min_level,
+                                 limit=sys.maxsize, regex=args.regex)
+    # Time of the last printed record and how many were printed with that same time
+    last, seen = None, 0
+
+    def emit(record):
+        nonlocal last, seen
+        sys.stdout.write(LogArchive.format_record(record))
+        seen = seen + 1 if record[0] == last else 1
+        last = record[0]
+
+    for record in records:
+        emit(record)
+    if args.follow:
+        if last is None:
+            last, seen = time.time(), 0
+        try:
+            while True:
+                sys.stdout.flush()
+                time.sleep(0.5)
+                skip = seen
+                for record in archive.search(args.service, args.grep, last, None, min_level,
+                                             limit=sys.maxsize, regex=args.regex):
+                    if record[0] == last and skip:
+                        skip -= 1
+                        continue
+                    emit(record)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
 def main():
     """Main entry point."""
+    if len(sys.argv) > 1 and sys.argv[1] == "logs":
+        sys.exit(logs_cli(sys.argv[2:]))
     ctk.set_appearance_mode("dark")
     ctk.set_default_color_theme("blue")
     